@@ -0,0 +1,142 @@
+"""
+async_vs_sync.py
+
+Compare the sync article API under WSGI with its async version under ASGI.
+
+Starts gunicorn twice on the current settings and database: once with
+gthread workers serving news_project.wsgi and the DRF endpoints, once with
+uvicorn workers serving news_project.asgi and the ``/api/async/``
+endpoints. Each is loaded with loadtest.run() at every ``--concurrency``
+level over the article list, the article detail and a publisher's list,
+and the results are printed and optionally written as JSON.
+
+Run it from the project root against a database with some published
+articles (e.g. after ``generate_dataset`` or loading fixtures):
+
+    python benchmarks/async_vs_sync.py -c 8 32 64 -d 10 --json async_vs_sync.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import run  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": {
+        "app": "news_project.wsgi:application",
+        "worker_class": "gthread",
+        "prefix": "/api",
+    },
+    "asgi": {
+        "app": "news_project.asgi:application",
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "prefix": "/api/async",
+    },
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(base, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/api/articles/?page_size=1", timeout=2) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base} did not start within {timeout}s")
+
+
+def _start(server, workers, threads):
+    port = _free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads))
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", server["app"],
+            "-c", "gunicorn.conf.py",
+            "-k", server["worker_class"],
+            "-b", f"127.0.0.1:{port}",
+        ],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def _paths(prefix, sample):
+    article = sample["results"][0]
+    paths = [f"{prefix}/articles/", f"{prefix}/articles/{article['id']}/"]
+    if article.get("publisher"):
+        paths.append(f"{prefix}/publishers/{article['publisher']}/articles/")
+    return paths
+
+
+def benchmark(concurrency_levels, duration, workers, threads):
+    """
+    Load each server at each concurrency level.
+
+    Returns:
+        dict: ``{"wsgi": {concurrency: result}, "asgi": {...}}`` with the
+        results of loadtest.run().
+    """
+    results = {}
+    for name, server in SERVERS.items():
+        process, base = _start(server, workers, threads)
+        try:
+            sample = _wait_until_up(base)
+            if not sample["results"]:
+                raise RuntimeError("No published articles to benchmark with.")
+            paths = _paths(server["prefix"], sample)
+            results[name] = {
+                concurrency: run(base, paths, concurrency=concurrency, duration=duration)
+                for concurrency in concurrency_levels
+            }
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("-w", "--workers", type=int, default=2)
+    parser.add_argument("-t", "--threads", type=int, default=4, help="Threads per WSGI worker")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = benchmark(args.concurrency, args.duration, args.workers, args.threads)
+    print(
+        f"{'server':<6} {'clients':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    for name, levels in results.items():
+        for concurrency, result in levels.items():
+            latency = result["latency_ms"]
+            print(
+                f"{name:<6} {concurrency:>7} {result['requests_per_second']:>9.1f} "
+                f"{latency['p50'] or 0:>8.1f} {latency['p95'] or 0:>8.1f} "
+                f"{latency['p99'] or 0:>8.1f} {result['errors']:>7}"
+            )
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+loadtest.py
+
+Minimal HTTP load generator for comparing application server setups.
+
+Each of ``--concurrency`` client threads keeps one keep-alive connection
+open and requests the given paths in turn for ``--duration`` seconds.
+Throughput and latency percentiles are printed at the end, and written as
+JSON with ``--json`` so runs can be compared. Only the standard library is
+used, so it runs anywhere the project does.
+
+Usage:
+    python benchmarks/loadtest.py http://localhost:8000 /api/articles/ /
+    python benchmarks/loadtest.py http://localhost:8000 /api/articles/ -c 32 -d 30 --json out.json
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _client(base, paths, deadline, results, lock):
+    """Request ``paths`` round-robin over one connection until ``deadline``."""
+    split = urlsplit(base)
+    connection_class = (
+        http.client.HTTPSConnection if split.scheme == "https" else http.client.HTTPConnection
+    )
+    connection = None
+    latencies, errors, index = [], 0, 0
+    while time.monotonic() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.monotonic()
+        try:
+            if connection is None:
+                connection = connection_class(split.netloc, timeout=30)
+            connection.request("GET", path, headers={"Accept": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.monotonic() - started)
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if connection is not None:
+                connection.close()
+            connection = None
+    if connection is not None:
+        connection.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["errors"] += errors
+
+
+def run(base, paths, concurrency=16, duration=10.0):
+    """
+    Load ``base`` with ``concurrency`` clients for ``duration`` seconds.
+
+    Args:
+        base (str): Server root, e.g. "http://localhost:8000".
+        paths (list[str]): Paths requested round-robin by every client.
+        concurrency (int): Number of concurrent clients.
+        duration (float): Seconds to run for.
+
+    Returns:
+        dict: Request count, errors, requests per second and latency
+        percentiles in milliseconds.
+    """
+    results = {"latencies": [], "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    threads = [
+        threading.Thread(target=_client, args=(base.rstrip("/"), paths, deadline, results, lock))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = sorted(results["latencies"])
+    as_ms = lambda value: None if value is None else round(value * 1000, 2)  # noqa: E731
+    return {
+        "base": base,
+        "paths": paths,
+        "concurrency": concurrency,
+        "duration": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": results["errors"],
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": as_ms(statistics.fmean(latencies)) if latencies else None,
+            "p50": as_ms(_percentile(latencies, 0.50)),
+            "p95": as_ms(_percentile(latencies, 0.95)),
+            "p99": as_ms(_percentile(latencies, 0.99)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("base", help="Server root URL, e.g. http://localhost:8000")
+    parser.add_argument("paths", nargs="+", help="Paths to request round-robin")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    result = run(args.base, args.paths, args.concurrency, args.duration)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
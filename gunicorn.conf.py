@@ -0,0 +1,82 @@
+"""
+gunicorn.conf.py
+
+Production application server settings for the News App.
+
+Used by the ``web`` service in docker-compose.yml:
+
+    gunicorn news_project.wsgi:application -c gunicorn.conf.py
+
+or, to serve the async API views (news_app/async_views.py) under ASGI:
+
+    gunicorn news_project.asgi:application -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker
+
+Every setting can be tuned through the environment without rebuilding the
+image:
+
+- WEB_CONCURRENCY: Worker processes (default: 2 x CPU cores + 1).
+- GUNICORN_THREADS: Threads per worker (default: 4). Requests mostly wait
+  on MySQL and the cache, so threads add concurrency cheaply.
+- GUNICORN_WORKER_CLASS: "gthread" (default) for news_project.wsgi, or
+  "uvicorn_worker.UvicornWorker" for news_project.asgi (threads unused).
+- GUNICORN_BIND: Listen address (default: 0.0.0.0:8000).
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: Recycle a worker
+  after this many requests (default: 1000 +/- 100), bounding slow memory
+  growth; the jitter keeps workers from restarting all at once.
+- GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT: Seconds before a silent
+  worker is killed, and allowed to finish in-flight requests on restart.
+- GUNICORN_KEEPALIVE: Seconds to hold idle keep-alive connections from nginx.
+- GUNICORN_LOG_LEVEL: Log level (default: info).
+- DB_MAX_CONNECTIONS: Database connections this server may hold in total
+  (default: unlimited). Each thread keeps one persistent connection, so
+  threads per worker are capped at DB_MAX_CONNECTIONS // workers.
+"""
+
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = _env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int("GUNICORN_THREADS", 4)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Per-worker connection limit: with persistent connections every thread
+# holds its own, so keep workers x threads within the database's budget.
+db_max_connections = _env_int("DB_MAX_CONNECTIONS", 0)
+if db_max_connections:
+    threads = max(1, min(threads, db_max_connections // workers))
+
+# Import Django and the project once in the master; workers fork with the
+# code already loaded, so they start fast and share its memory pages.
+preload_app = True
+
+# Graceful recycling: a worker that has served max_requests finishes its
+# in-flight requests and is replaced by a fresh one.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# Keep worker heartbeat files off overlay filesystems in containers
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master after preloading,
+    so no two workers ever share a socket.
+    """
+    from django.db import connections
+
+    connections.close_all()
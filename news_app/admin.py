@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import CustomUser, Publisher, Article, Newsletter
+from .models import (
+    CustomUser, Publisher, Article, Newsletter, NewsletterDelivery, Notification, FanoutJob,
+    SearchTerm, TimelineEntry,
+)
 from django.contrib.auth.admin import UserAdmin
 
 
@@ -13,6 +16,70 @@ class CustomUserAdmin(UserAdmin):
     list_display = ["username", "email", "role", "is_staff"]  # Show these fields in admin list view
 
 
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the Notification outbox.
+    The table grows with every event, so the article is picked by ID and the
+    change list skips counting every row.
+    """
+    list_display = ["event", "recipient", "article", "status", "attempts", "next_attempt_at"]
+    list_select_related = ["article"]
+    raw_id_fields = ["article"]
+    show_full_result_count = False
+
+
+@admin.register(FanoutJob)
+class FanoutJobAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for FanoutJob.
+    There is one job per published article, so the article is picked by ID
+    and the change list skips counting every row.
+    """
+    list_display = ["article", "notify", "last_user_id", "created_at", "completed_at"]
+    list_select_related = ["article"]
+    raw_id_fields = ["article"]
+    show_full_result_count = False
+
+
+@admin.register(TimelineEntry)
+class TimelineEntryAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for TimelineEntry.
+    Timelines hold a row per reader and article, so both are picked by ID
+    and the change list skips counting every row.
+    """
+    list_display = ["reader", "article", "published_at"]
+    list_select_related = ["reader", "article"]
+    raw_id_fields = ["reader", "article"]
+    show_full_result_count = False
+
+
+@admin.register(NewsletterDelivery)
+class NewsletterDeliveryAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for NewsletterDelivery.
+    Every newsletter adds a row per follower, so the newsletter and
+    recipient are picked by ID and the change list skips counting every row.
+    """
+    list_display = ["newsletter", "email", "status", "attempts", "sent_at"]
+    list_select_related = ["newsletter"]
+    raw_id_fields = ["newsletter", "recipient"]
+    show_full_result_count = False
+
+
+@admin.register(SearchTerm)
+class SearchTermAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the SearchTerm dictionary.
+    Terms are searched by prefix, which the unique term index serves, and
+    the change list skips counting every row.
+    """
+    list_display = ["term", "document_count"]
+    search_fields = ["^term"]
+    show_full_result_count = False
+
+
 # Register remaining models so they appear in the Django admin site
 admin.site.register(Publisher)   # Manage publishers in the admin interface
 admin.site.register(Article)     # Manage articles in the admin interface
@@ -6,14 +6,23 @@ Defines the API endpoints for the News App using Django REST Framework.
 Endpoints:
 - /articles/ : List all approved and published articles
 - /articles/<id>/ : Retrieve details of a specific approved and published article
+- /articles/bulk/approve|publish|delete/ : Moderate many articles in one request
+- /articles/export/ : Stream every approved and published article as NDJSON or CSV
 - /drafts/ : List all drafts belonging to the logged-in journalist
 - /drafts/create/ : Create a new draft (journalists only)
 - /drafts/<id>/ : Update or delete a specific draft
 - /publishers/<id>/articles/ : List all approved and published articles under a specific publisher
+- /feed/ : Personalized feed of the logged-in reader
+- /search/?q=<terms> : Ranked full-text search over approved and published articles
+- /async/articles/, /async/articles/<id>/, /async/publishers/<id>/articles/ :
+  Async versions of the public article endpoints, for ASGI deployments
+- /newsletters/ : List newsletters, or write one (journalists only)
+- /newsletters/<id>/ : Retrieve a specific newsletter
+- /journalists/<id>/newsletters/ : Newsletter archive of a specific journalist
 """
 
 from django.urls import path
-from . import api_views
+from . import api_views, async_views
 
 app_name = "news_api"
 
@@ -24,6 +33,23 @@ urlpatterns = [
     # Get a single approved + published article by ID
     path("articles/<int:pk>/", api_views.ArticleDetailView.as_view(), name="api_article_detail"),
 
+    # Stream the whole archive: ?format=ndjson|csv&publisher=&since=&until=&after=
+    path("articles/export/", api_views.article_export, name="api_article_export"),
+
+    # Bulk moderation: POST {"ids": [...]}
+    path(
+        "articles/bulk/approve/", api_views.BulkModerationView.as_view(operation="approve"),
+        name="api_bulk_approve",
+    ),
+    path(
+        "articles/bulk/publish/", api_views.BulkModerationView.as_view(operation="publish"),
+        name="api_bulk_publish",
+    ),
+    path(
+        "articles/bulk/delete/", api_views.BulkModerationView.as_view(operation="delete"),
+        name="api_bulk_delete",
+    ),
+
     # List all drafts (unpublished) by the logged-in journalist
     path("drafts/", api_views.DraftListView.as_view(), name="api_drafts"),
 
@@ -35,4 +61,36 @@ urlpatterns = [
 
     # List all approved + published articles under a specific publisher
     path("publishers/<int:pk>/articles/", api_views.PublisherArticleListView.as_view(), name="api_publisher_articles"),
+
+    # Personalized feed of the logged-in reader
+    path("feed/", api_views.ReaderFeedView.as_view(), name="api_reader_feed"),
+
+    # Full-text search over approved + published articles
+    path("search/", api_views.ArticleSearchView.as_view(), name="api_article_search"),
+
+    # Async versions of the public article endpoints (same output)
+    path("async/articles/", async_views.article_list_async, name="api_articles_async"),
+    path(
+        "async/articles/<int:pk>/", async_views.article_detail_async,
+        name="api_article_detail_async",
+    ),
+    path(
+        "async/publishers/<int:pk>/articles/", async_views.publisher_articles_async,
+        name="api_publisher_articles_async",
+    ),
+
+    # List newsletters (GET) or write one (POST, journalists only)
+    path("newsletters/", api_views.NewsletterListCreateView.as_view(), name="api_newsletters"),
+
+    # Get a single newsletter by ID
+    path(
+        "newsletters/<int:pk>/", api_views.NewsletterDetailView.as_view(),
+        name="api_newsletter_detail",
+    ),
+
+    # Newsletter archive of a specific journalist
+    path(
+        "journalists/<int:pk>/newsletters/", api_views.JournalistNewsletterListView.as_view(),
+        name="api_journalist_newsletters",
+    ),
 ]
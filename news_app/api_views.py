@@ -1,45 +1,95 @@
 """
 api_views.py
 
-Defines API views for Articles in the News App using Django REST Framework.
+Defines API views for Articles and Newsletters in the News App using Django REST Framework.
 
 Views:
-- ArticleListView: List all approved and published articles.
+- ArticleListView: List approved and published articles (cursor-paginated).
+  List views render ArticleSummarySerializer and, like the detail view, accept
+  ``?fields=`` to select fields (see fieldsets.py). The public list and detail
+  views answer conditional GETs with 304 (see conditional.py) and may read
+  from a replica (see routers.py).
 - ArticleDetailView: Retrieve details of a single approved and published article.
 - DraftListView: List all drafts belonging to the logged-in journalist.
 - DraftCreateView: Create a new draft article.
 - DraftUpdateView: Update or delete a journalist's own draft.
-- PublisherArticleListView: List all approved and published articles for a specific publisher.
+- PublisherArticleListView: List approved and published articles for a specific publisher
+  (cursor-paginated).
+- ReaderFeedView: List the logged-in reader's personalized feed (cursor-paginated).
+- ArticleSearchView: Full-text search over approved and published articles.
+- BulkModerationView: Approve, publish or delete many articles in one request.
+- article_export: Stream every approved and published article as NDJSON or CSV
+  (see export.py).
+- NewsletterListCreateView: List newsletters (cursor-paginated) or write one (journalists only).
+- NewsletterDetailView: Retrieve a single newsletter.
+- JournalistNewsletterListView: A journalist's newsletter archive (cursor-paginated).
+  Newsletter lists are served from the feed cache, invalidated when a
+  newsletter is saved, and answer conditional GETs with 304.
 """
 
 from rest_framework import generics, permissions
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Article, Publisher
-from .serializers import ArticleSerializer
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition, require_safe
+from django.utils.http import urlencode
+from . import search
+from .moderation import BULK_ACTIONS
+from .cache import (
+    GLOBAL_FEED, NEWSLETTER_FEED, CachedFeedMixin, journalist_newsletters, publisher_feed,
+)
+from .conditional import article_etag, article_last_modified, feed_etag, feed_last_modified
+from .export import EXPORT_FORMATS, export_queryset, iter_articles, parse_bound, render_export
+from .fieldsets import SparseFieldsetMixin, narrow_queryset
+from .models import Article, CustomUser, Newsletter, Publisher
+from .pagination import ArticleCursorPagination, NewsletterPaginator
+from .routers import replica_reads
+from .serializers import (
+    ArticleSerializer, ArticleSummarySerializer, BulkArticleIdsSerializer, NewsletterSerializer,
+)
+from .timeline import TimelinePaginator, fallback_queryset
 
 
-class ArticleListView(generics.ListAPIView):
+@method_decorator(replica_reads, name="dispatch")
+@method_decorator(
+    condition(etag_func=feed_etag(GLOBAL_FEED), last_modified_func=feed_last_modified(GLOBAL_FEED)),
+    name="dispatch",
+)
+class ArticleListView(CachedFeedMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
-    API endpoint to list all approved and published articles.
+    API endpoint to list approved and published articles, cursor-paginated,
+    as summaries narrowed by ``?fields=``. Pages are served from the feed cache.
     """
     queryset = Article.objects.filter(approved=True, published=True)
-    serializer_class = ArticleSerializer
+    serializer_class = ArticleSummarySerializer
+    pagination_class = ArticleCursorPagination
+    always_load = ("id", "published_at")
 
 
-class ArticleDetailView(generics.RetrieveAPIView):
+@method_decorator(replica_reads, name="dispatch")
+@method_decorator(
+    condition(etag_func=article_etag(), last_modified_func=article_last_modified()),
+    name="dispatch",
+)
+class ArticleDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
     """
-    API endpoint to retrieve details of a single approved and published article by ID.
+    API endpoint to retrieve details of a single approved and published article by ID,
+    narrowed by ``?fields=``.
     """
     queryset = Article.objects.filter(approved=True, published=True)
     serializer_class = ArticleSerializer
     lookup_field = "pk"  # ensures /<id>/ works
 
 
-class DraftListView(generics.ListAPIView):
+class DraftListView(SparseFieldsetMixin, generics.ListAPIView):
     """
-    API endpoint to list all unpublished draft articles for the logged-in journalist.
+    API endpoint to list all unpublished draft articles for the logged-in journalist,
+    as summaries narrowed by ``?fields=``.
     """
-    serializer_class = ArticleSerializer
+    serializer_class = ArticleSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -86,11 +136,33 @@ class DraftUpdateView(generics.RetrieveUpdateDestroyAPIView):
         return Article.objects.none()
 
 
-class PublisherArticleListView(generics.ListAPIView):
+def _publisher_feed_name(request, pk):
+    return publisher_feed(pk)
+
+
+@method_decorator(replica_reads, name="dispatch")
+@method_decorator(
+    condition(
+        etag_func=feed_etag(_publisher_feed_name),
+        last_modified_func=feed_last_modified(_publisher_feed_name),
+    ),
+    name="dispatch",
+)
+class PublisherArticleListView(CachedFeedMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
-    API endpoint to list all approved and published articles under a specific publisher.
+    API endpoint to list approved and published articles under a specific publisher,
+    cursor-paginated, as summaries narrowed by ``?fields=``. Pages are served from
+    the publisher's feed cache.
     """
-    serializer_class = ArticleSerializer
+    serializer_class = ArticleSummarySerializer
+    pagination_class = ArticleCursorPagination
+    always_load = ("id", "published_at")
+
+    def get_feed_name(self):
+        """
+        Key the cache by this publisher's feed only.
+        """
+        return publisher_feed(self.kwargs["pk"])
 
     def get_queryset(self):
         """
@@ -98,6 +170,256 @@ class PublisherArticleListView(generics.ListAPIView):
         """
         publisher_id = self.kwargs["pk"]
         publisher = get_object_or_404(Publisher, pk=publisher_id)
-        return Article.objects.filter(
-            publisher=publisher, approved=True, published=True
+        return Article.objects.filter(publisher=publisher, approved=True, published=True)
+
+
+class ReaderFeedView(SparseFieldsetMixin, generics.ListAPIView):
+    """
+    API endpoint to list the logged-in user's personalized feed: published
+    articles from the publishers they subscribe to and the journalists they
+    follow, newest first, cursor-paginated and narrowed by ``?fields=``.
+    """
+    serializer_class = ArticleSummarySerializer
+    pagination_class = ArticleCursorPagination
+    always_load = ("id", "published_at")
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Return the articles merged into the feed at read time.
+        """
+        return fallback_queryset(self.request.user)
+
+    def get_keyset_paginator(self, page_size):
+        """
+        Page through the user's precomputed timeline, loading its articles
+        with the same narrowed columns as the read-time ones.
+        """
+        return TimelinePaginator(
+            self.request.user, page_size, articles=self.narrow(Article.objects.all())
+        )
+
+
+@method_decorator(replica_reads, name="dispatch")
+class ArticleSearchView(APIView):
+    """
+    API endpoint to search approved and published articles.
+
+    ``?q=`` holds the search terms; every term must match and ``term*``
+    matches by prefix. Results are ranked by relevance, paged with
+    ``?page=`` and rendered like the other lists, with an excerpt instead of
+    the full content.
+    """
+    page_size = 20
+
+    def get(self, request):
+        """
+        Return one page of ranked results and the URL of the next page.
+        """
+        query = request.query_params.get("q", "").strip()
+        try:
+            page = int(request.query_params.get("page", 1))
+        except ValueError:
+            raise ValidationError({"page": "Must be an integer."})
+        if page < 1:
+            raise ValidationError({"page": "Must be 1 or greater."})
+
+        # Fetch one extra row to learn whether another page exists
+        offset = (page - 1) * self.page_size
+        serializer = ArticleSummarySerializer()
+        articles = search.search(
+            query, limit=self.page_size + 1, offset=offset,
+            articles=narrow_queryset(Article.objects.all(), serializer),
         )
+        next_url = None
+        if len(articles) > self.page_size:
+            articles = articles[:self.page_size]
+            next_url = request.build_absolute_uri(
+                "?" + urlencode({"q": query, "page": page + 1})
+            )
+        return Response({
+            "query": query,
+            "next": next_url,
+            "results": ArticleSummarySerializer(articles, many=True).data,
+        })
+
+
+class BulkModerationView(APIView):
+    """
+    API endpoint to approve, publish or delete a list of articles at once.
+
+    POST ``{"ids": [...]}``. Articles the user may not moderate are skipped
+    and reported rather than failing the whole request; the response lists
+    the IDs that were updated, already in the target state, forbidden or
+    not found. ``operation`` is set per URL.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    operation = None
+
+    def post(self, request):
+        """
+        Apply the operation to every permitted article in the request.
+        """
+        serializer = BulkArticleIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = BULK_ACTIONS[self.operation](request.user, serializer.validated_data["ids"])
+        return Response(result.as_dict())
+
+
+# -----------------------
+# Export
+# -----------------------
+def _export_filters(params):
+    """
+    Parse the export query parameters.
+
+    Returns:
+        tuple[dict, dict]: export_queryset() arguments, and errors per parameter.
+    """
+    filters, errors = {}, {}
+    for name, key in (("publisher", "publisher_id"), ("after", "after_id")):
+        if params.get(name):
+            try:
+                filters[key] = int(params[name])
+            except ValueError:
+                errors[name] = "Must be an integer."
+    for name in ("since", "until"):
+        if params.get(name):
+            try:
+                filters[name] = parse_bound(params[name], end=name == "until")
+            except ValueError:
+                errors[name] = "Must be an ISO 8601 date or datetime."
+    return filters, errors
+
+
+@require_safe
+@replica_reads
+def article_export(request):
+    """
+    API endpoint streaming every approved and published article, in ID order.
+
+    Bulk reads of the whole archive are for staff and users granted the
+    ``news_app.export_article`` permission; anyone else gets a 403.
+
+    Query parameters:
+    - ``format``: ``ndjson`` (default, one JSON object per line) or ``csv``.
+    - ``publisher``: Only this publisher's articles.
+    - ``since`` / ``until``: Only articles published in this range (ISO
+      dates or datetimes; a date ``until`` includes that whole day).
+    - ``after``: Only articles with a greater ID, to resume an interrupted
+      export from the last ID received.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The export, read and sent in batches.
+    """
+    user = request.user
+    if not (user.is_staff or user.has_perm("news_app.export_article")):
+        return JsonResponse(
+            {"detail": "You do not have permission to export articles."}, status=403
+        )
+
+    format = request.GET.get("format", "ndjson")
+    filters, errors = _export_filters(request.GET)
+    if format not in EXPORT_FORMATS:
+        errors["format"] = f"Must be one of: {', '.join(EXPORT_FORMATS)}."
+    if errors:
+        return JsonResponse(errors, status=400)
+
+    articles = export_queryset(**filters)
+    # The rows are read while the response streams, after this view (and
+    # its replica scope) has returned, so pin the database chosen now
+    articles = articles.using(articles.db)
+    response = StreamingHttpResponse(
+        render_export(iter_articles(articles), format), content_type=EXPORT_FORMATS[format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="articles.{format}"'
+    return response
+
+
+# -----------------------
+# Newsletters
+# -----------------------
+@method_decorator(replica_reads, name="get")
+@method_decorator(
+    condition(
+        etag_func=feed_etag(NEWSLETTER_FEED),
+        last_modified_func=feed_last_modified(NEWSLETTER_FEED),
+    ),
+    name="get",
+)
+class NewsletterListCreateView(CachedFeedMixin, generics.ListCreateAPIView):
+    """
+    API endpoint to list newsletters, newest first and cursor-paginated, or
+    for journalists to write one. Pages are served from the newsletter feed
+    cache. New newsletters are sent to the journalist's followers by the
+    send_newsletters worker.
+    """
+    queryset = Newsletter.objects.all()
+    serializer_class = NewsletterSerializer
+    pagination_class = ArticleCursorPagination
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_feed_name(self):
+        return NEWSLETTER_FEED
+
+    def get_keyset_paginator(self, page_size):
+        return NewsletterPaginator(page_size)
+
+    def perform_create(self, serializer):
+        """
+        Assign the logged-in journalist as the author.
+        """
+        if self.request.user.role != "journalist":
+            raise PermissionDenied("Only journalists can write newsletters.")
+        serializer.save(journalist=self.request.user)
+
+
+@method_decorator(replica_reads, name="dispatch")
+class NewsletterDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint to retrieve a single newsletter by ID.
+    """
+    queryset = Newsletter.objects.all()
+    serializer_class = NewsletterSerializer
+
+
+def _journalist_newsletters_name(request, pk):
+    return journalist_newsletters(pk)
+
+
+@method_decorator(replica_reads, name="dispatch")
+@method_decorator(
+    condition(
+        etag_func=feed_etag(_journalist_newsletters_name),
+        last_modified_func=feed_last_modified(_journalist_newsletters_name),
+    ),
+    name="dispatch",
+)
+class JournalistNewsletterListView(CachedFeedMixin, generics.ListAPIView):
+    """
+    API endpoint to list a journalist's newsletter archive, newest first and
+    cursor-paginated. Pages are served from the archive's feed cache, so
+    browsing back-issues only reaches the database after a newsletter of the
+    journalist changes.
+    """
+    serializer_class = NewsletterSerializer
+    pagination_class = ArticleCursorPagination
+
+    def get_feed_name(self):
+        """
+        Key the cache by this journalist's archive only.
+        """
+        return journalist_newsletters(self.kwargs["pk"])
+
+    def get_keyset_paginator(self, page_size):
+        return NewsletterPaginator(page_size)
+
+    def get_queryset(self):
+        """
+        Return the newsletters of the given journalist ID.
+        """
+        journalist = get_object_or_404(CustomUser, pk=self.kwargs["pk"], role="journalist")
+        return Newsletter.objects.filter(journalist=journalist)
@@ -0,0 +1,164 @@
+"""
+async_views.py
+
+Async versions of the public, read-only article API endpoints, for serving
+under ASGI (see news_project/asgi.py).
+
+They return the same JSON as their DRF counterparts in api_views.py and
+support the same options: cursor pagination with ``?cursor=`` and
+``?page_size=``, ``?fields=`` selection, the feed cache, conditional GETs
+and replica reads. DRF views are synchronous, so these are plain Django
+async views: every query goes through the async ORM, and serializers only
+render rows that are already loaded. While one request waits on the
+database, its worker serves others.
+
+- article_list_async: List approved and published articles.
+- article_detail_async: Retrieve a single approved and published article.
+- publisher_articles_async: List a publisher's approved and published articles.
+"""
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import GLOBAL_FEED, aget_or_build, page_variant, publisher_feed
+from .conditional import (
+    aarticle_validators,
+    afeed_validators,
+    conditional_response,
+    set_validators,
+)
+from .fieldsets import narrow_queryset, parse_fields
+from .models import Article, Publisher
+from .pagination import ArticleCursorPagination, InvalidCursor, KeysetPaginator
+from .routers import replica_reads
+from .serializers import ArticleSerializer, ArticleSummarySerializer
+
+LIST_ALWAYS_LOAD = ("id", "published_at")
+
+
+class _NotFound(Exception):
+    """Raised inside a cached page build to answer 404."""
+
+
+def _not_found(detail="Not found."):
+    return JsonResponse({"detail": detail}, status=404)
+
+
+def _public_articles():
+    return Article.objects.filter(approved=True, published=True)
+
+
+async def _list_response(request, feed, queryset, check=None):
+    """
+    Build (or fetch from the cache) a cursor-paginated page of ``queryset``
+    and return it with the conditional GET headers of ``feed``.
+
+    Args:
+        request (HttpRequest): The request being answered.
+        feed (str): Feed the listed articles belong to.
+        queryset (QuerySet): Articles to list, unordered.
+        check (coroutine function | None): Awaited before the page is built;
+            raises _NotFound if the listing does not exist.
+
+    Returns:
+        HttpResponse: The page, a 304, a 400 for bad ``?fields=`` or a 404.
+    """
+    etag, last_modified = await afeed_validators(request, feed)
+    response = conditional_response(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    drf_request = Request(request)
+    pagination = ArticleCursorPagination()
+    try:
+        fields = parse_fields(drf_request, ArticleSummarySerializer())
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    url = request.build_absolute_uri()
+
+    async def build():
+        if check is not None:
+            await check()
+        serializer = ArticleSummarySerializer(fields=fields)
+        paginator = KeysetPaginator(pagination.get_page_size(drf_request))
+        page = await paginator.apaginate(
+            narrow_queryset(queryset, serializer, fields, LIST_ALWAYS_LOAD),
+            request.GET.get(pagination.cursor_query_param),
+        )
+
+        def link(cursor):
+            if cursor is None:
+                return None
+            return replace_query_param(url, pagination.cursor_query_param, cursor)
+
+        return {
+            "next": link(page.next_cursor),
+            "previous": link(page.previous_cursor),
+            "results": ArticleSummarySerializer(page.object_list, many=True, fields=fields).data,
+        }
+
+    try:
+        data = await aget_or_build(feed, page_variant(request), build)
+    except InvalidCursor:
+        return _not_found("Invalid cursor.")
+    except _NotFound:
+        return _not_found()
+    return set_validators(request, JsonResponse(data), etag, last_modified)
+
+
+@require_safe
+@replica_reads
+async def article_list_async(request):
+    """
+    Async API endpoint listing approved and published articles as
+    summaries, newest first. Same output as ArticleListView.
+    """
+    return await _list_response(request, GLOBAL_FEED, _public_articles())
+
+
+@require_safe
+@replica_reads
+async def article_detail_async(request, pk):
+    """
+    Async API endpoint retrieving a single approved and published article,
+    narrowed by ``?fields=``. Same output as ArticleDetailView.
+    """
+    etag, last_modified = await aarticle_validators(request, pk)
+    if etag is None:
+        return _not_found()
+    response = conditional_response(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    try:
+        fields = parse_fields(Request(request), ArticleSerializer())
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    serializer = ArticleSerializer(fields=fields)
+    article = await narrow_queryset(
+        _public_articles().filter(pk=pk), serializer, fields
+    ).afirst()
+    if article is None:
+        return _not_found()
+    data = ArticleSerializer(article, fields=fields).data
+    return set_validators(request, JsonResponse(data), etag, last_modified)
+
+
+@require_safe
+@replica_reads
+async def publisher_articles_async(request, pk):
+    """
+    Async API endpoint listing a publisher's approved and published
+    articles as summaries, newest first. Same output as
+    PublisherArticleListView.
+    """
+    async def check():
+        if not await Publisher.objects.filter(pk=pk).aexists():
+            raise _NotFound
+
+    return await _list_response(
+        request, publisher_feed(pk), _public_articles().filter(publisher_id=pk), check
+    )
@@ -0,0 +1,284 @@
+"""
+cache.py
+
+Versioned read-through cache for the published article and newsletter feeds.
+
+Every feed (the global feed, one per publisher and one per journalist, the
+newsletter list and one newsletter archive per journalist) has a generation
+counter
+kept in the cache. Cached pages are keyed by their feed's current generation,
+so bumping the counter from the model signals makes every stale page of that
+feed unreachable at once; nothing has to be deleted and no TTL has to guess
+how long a page stays fresh. While read replicas may still be catching up
+with a feed's latest change, pages built for it are served but not cached.
+
+- GLOBAL_FEED / publisher_feed / journalist_feed: Names of the cached article feeds.
+- article_feeds: The article feeds a public article appears in.
+- NEWSLETTER_FEED / journalist_newsletters: Names of the cached newsletter feeds.
+- get_generation / aget_generation: Current generation of a feed.
+- get_last_modified / aget_last_modified: When a feed last changed.
+- bump_generations: Invalidate every cached page of the given feeds.
+- get_or_build / aget_or_build: Read-through lookup of a cached feed page.
+- FEED_QUERY_PARAMS / page_variant: What a cached list page is keyed on.
+- CachedFeedMixin: Serves a DRF list view's paginated response from the cache.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .routers import replicas
+
+GLOBAL_FEED = "global"
+
+
+def publisher_feed(publisher_id):
+    """Return the feed name for a publisher's published articles."""
+    return f"publisher:{publisher_id}"
+
+
+def journalist_feed(journalist_id):
+    """Return the feed name for a journalist's published articles."""
+    return f"journalist:{journalist_id}"
+
+
+def article_feeds(publisher_id, journalist_id):
+    """
+    Return the names of the feeds a public article with these owners appears in.
+
+    Args:
+        publisher_id (int | None): The article's publisher, if any.
+        journalist_id (int | None): The article's journalist, if any.
+
+    Returns:
+        set[str]: Feed names.
+    """
+    feeds = {GLOBAL_FEED}
+    if publisher_id:
+        feeds.add(publisher_feed(publisher_id))
+    if journalist_id:
+        feeds.add(journalist_feed(journalist_id))
+    return feeds
+
+
+NEWSLETTER_FEED = "newsletters"
+
+
+def journalist_newsletters(journalist_id):
+    """Return the feed name for a journalist's newsletter archive."""
+    return f"newsletters:journalist:{journalist_id}"
+
+
+def _cache():
+    return caches[getattr(settings, "NEWS_FEED_CACHE_ALIAS", "default")]
+
+
+def _generation_key(feed):
+    return f"news_app:feed:{feed}:generation"
+
+
+def _modified_key(feed):
+    return f"news_app:feed:{feed}:modified"
+
+
+def _initial_generation():
+    # Counters start from the clock rather than 1 so that a counter evicted
+    # from the cache never restarts at a value older pages were stored under.
+    return int(time.time() * 1000)
+
+
+def get_generation(feed):
+    """
+    Return the current generation of ``feed``, creating the counter if needed.
+
+    Args:
+        feed (str): Feed name, e.g. GLOBAL_FEED or publisher_feed(1).
+
+    Returns:
+        int: The feed's generation.
+    """
+    cache = _cache()
+    key = _generation_key(feed)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(feed):
+    """Async version of get_generation(), using the cache's async methods."""
+    cache = _cache()
+    key = _generation_key(feed)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, _initial_generation(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def bump_generations(*feeds):
+    """
+    Invalidate every cached page of ``feeds`` by advancing their generations.
+
+    Args:
+        *feeds (str): Feed names to invalidate.
+    """
+    cache = _cache()
+    for feed in set(feeds):
+        key = _generation_key(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter missing or evicted: any fresh value orphans old pages.
+            cache.set(key, _initial_generation(), timeout=None)
+        cache.set(_modified_key(feed), timezone.now(), timeout=None)
+
+
+def get_last_modified(feed):
+    """
+    Return when ``feed`` last changed.
+
+    If that is unknown (the timestamp was evicted, or the feed has not changed
+    since the cache was emptied) the current time is recorded and returned:
+    later than any real change, so clients may revalidate once too often but
+    never keep a stale copy.
+
+    Args:
+        feed (str): Feed name.
+
+    Returns:
+        datetime: Time of the feed's last change.
+    """
+    cache = _cache()
+    key = _modified_key(feed)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, timezone.now(), timeout=None)
+        modified = cache.get(key)
+    return modified
+
+
+async def aget_last_modified(feed):
+    """Async version of get_last_modified(), using the cache's async methods."""
+    cache = _cache()
+    key = _modified_key(feed)
+    modified = await cache.aget(key)
+    if modified is None:
+        await cache.aadd(key, timezone.now(), timeout=None)
+        modified = await cache.aget(key)
+    return modified
+
+
+def _page_key(feed, generation, variant):
+    digest = hashlib.md5(variant.encode("utf-8")).hexdigest()
+    return f"news_app:feed:{feed}:{generation}:{digest}"
+
+
+def _page_timeout():
+    return getattr(settings, "NEWS_FEED_CACHE_TIMEOUT", 86400)
+
+
+def _store(feed, key, value):
+    if not _replicas_may_lag(feed):
+        _cache().set(key, value, timeout=_page_timeout())
+
+
+def get_or_build(feed, variant, build):
+    """
+    Return the cached value for ``variant`` of ``feed``, building it on a miss.
+
+    Args:
+        feed (str): Feed name the value belongs to.
+        variant (str): What distinguishes this value within the feed,
+            e.g. the request URL including its cursor.
+        build (callable): Produces the value on a cache miss. Exceptions
+            propagate and nothing is cached.
+
+    Returns:
+        object: The cached or freshly built value.
+    """
+    key = _page_key(feed, get_generation(feed), variant)
+    value = _cache().get(key)
+    if value is None:
+        value = build()
+        _store(feed, key, value)
+    return value
+
+
+async def aget_or_build(feed, variant, build):
+    """
+    Async version of get_or_build(); ``build`` is a coroutine function.
+
+    The cache is reached through its async methods (aget / aset / aadd),
+    so a slow or remote cache never blocks the event loop.
+    """
+    key = _page_key(feed, await aget_generation(feed), variant)
+    cache = _cache()
+    value = await cache.aget(key)
+    if value is None:
+        value = await build()
+        if not (replicas() and _lagging(await aget_last_modified(feed))):
+            await cache.aset(key, value, timeout=_page_timeout())
+    return value
+
+
+def _lagging(modified):
+    window = getattr(settings, "NEWS_REPLICA_STICKY_SECONDS", 10)
+    return (timezone.now() - modified).total_seconds() < window
+
+
+def _replicas_may_lag(feed):
+    """
+    Whether a value just built for ``feed`` may have been read from a replica
+    that has not caught up with the feed's latest change yet. Such values are
+    served but not cached, or they would outlive the lag under the new
+    generation.
+    """
+    return bool(replicas()) and _lagging(get_last_modified(feed))
+
+
+# Query parameters that shape a list page; any others (tracking tags, cache
+# busters) would only split one page into many cache entries
+FEED_QUERY_PARAMS = ("cursor", "page_size", "fields")
+
+
+def page_variant(request):
+    """
+    Return the cache variant of a list page: its URL without query string,
+    plus the FEED_QUERY_PARAMS present, in a fixed order. Scheme and host
+    are kept because the page's next / previous links are absolute.
+
+    Args:
+        request (HttpRequest): The request for the page.
+
+    Returns:
+        str: The variant to pass to get_or_build().
+    """
+    params = [(name, request.GET[name]) for name in FEED_QUERY_PARAMS if name in request.GET]
+    return f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+
+
+class CachedFeedMixin:
+    """
+    Mixin for DRF list views that serves the serialized page from the feed cache.
+
+    Subclasses may override get_feed_name() to key the cache by a narrower feed.
+    """
+
+    def get_feed_name(self):
+        """Return the name of the feed this view lists."""
+        return GLOBAL_FEED
+
+    def list(self, request, *args, **kwargs):
+        data = get_or_build(
+            self.get_feed_name(),
+            page_variant(request),
+            lambda: super(CachedFeedMixin, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
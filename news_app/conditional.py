@@ -0,0 +1,262 @@
+"""
+conditional.py
+
+Conditional GET support (ETag / Last-Modified) for the article endpoints.
+
+The functions here build ``etag_func`` / ``last_modified_func`` callables for
+Django's ``condition`` decorator. They answer from data that is cheap to get:
+a single-row lookup of an article's ``updated_at`` for detail pages, and the
+feed generation counters from cache.py, which cost no query at all. Detail
+pages also read the counters of the article's publisher and journalist
+feeds, as renaming either changes the page without touching the article.
+A client revalidating an unchanged resource gets a 304 before any template
+is rendered or serializer run.
+
+ETags also cover what else shapes the response: the full path (cursor,
+``?fields=`` and other parameters) and the Accept header, plus, for HTML
+pages that greet the user and embed a CSRF token, the user and their CSRF
+secret. Such personal pages send no Last-Modified, so a shared browser can
+never be told its cached copy of someone else's page is still good.
+
+Async views cannot use ``condition``, whose validator functions are
+synchronous; they compute both validators with aarticle_validators() or
+afeed_validators(), which reach the database and cache asynchronously, and
+apply them with conditional_response() and set_validators().
+
+- article_etag / article_last_modified: Validators for one article.
+- feed_etag / feed_last_modified: Validators for a feed listing.
+- aarticle_validators / afeed_validators: Both validators at once, for async views.
+- conditional_response / set_validators: Apply validators without ``condition``.
+"""
+
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import (
+    aget_generation, aget_last_modified, get_generation, get_last_modified, journalist_feed,
+    publisher_feed,
+)
+from .models import Article
+
+
+def _digest(*parts):
+    return hashlib.md5("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _variant(request, personal):
+    """Return what besides the data itself distinguishes one response from another."""
+    parts = [request.get_full_path(), request.META.get("HTTP_ACCEPT", "")]
+    if personal:
+        parts += [request.user.pk, request.META.get("CSRF_COOKIE", "")]
+    return parts
+
+
+def _settled(modified):
+    """
+    Return ``modified`` if it is safe to send as Last-Modified, else None.
+
+    HTTP dates have one-second resolution. While the current second is the
+    one of the last change, another change could follow within it and carry
+    the same date, so a client would wrongly be told its copy is current.
+    """
+    if modified is None or int(modified.timestamp()) >= int(timezone.now().timestamp()):
+        return None
+    return modified
+
+
+def _public_filter(articles, public_only):
+    return articles.filter(approved=True, published=True) if public_only else articles
+
+
+def _article_version(request, pk, public_only):
+    """
+    Return ``(updated_at, publisher_id, journalist_id)`` of article ``pk``,
+    or None if it does not exist (or is not public when ``public_only``).
+    Memoized on the request so the ETag and Last-Modified functions share
+    one query.
+    """
+    versions = request.__dict__.setdefault("_article_versions", {})
+    key = (int(pk), public_only)
+    if key not in versions:
+        articles = _public_filter(Article.objects.filter(pk=pk), public_only)
+        versions[key] = articles.values_list(
+            "updated_at", "publisher_id", "journalist_id"
+        ).first()
+    return versions[key]
+
+
+def _owner_feeds(version):
+    """Return the feeds of the publisher and journalist an article names."""
+    updated_at, publisher_id, journalist_id = version
+    feeds = [publisher_feed(publisher_id)] if publisher_id else []
+    if journalist_id:
+        feeds.append(journalist_feed(journalist_id))
+    return feeds
+
+
+def _article_tag(request, pk, version, generations, personal):
+    return _digest(
+        "article", pk, version[0].isoformat(), generations, *_variant(request, personal)
+    )
+
+
+def _article_modified(version, feed_modified):
+    # Owner renames bump their feeds, so the latest of those changes counts too
+    return _settled(max([version[0], *feed_modified]))
+
+
+def article_etag(public_only=True, personal=False):
+    """
+    Build an ``etag_func`` for views taking an article ``pk``.
+
+    The publisher and journalist feed generations are included because
+    renaming either changes the rendered article without touching its row.
+
+    Args:
+        public_only (bool): Whether the view only shows public articles.
+        personal (bool): Whether the response differs per user.
+
+    Returns:
+        callable: ``etag_func(request, pk, ...)`` for ``condition``.
+    """
+    def etag(request, pk, *args, **kwargs):
+        version = _article_version(request, pk, public_only)
+        if version is None:
+            return None  # Let the view answer 404
+        generations = tuple(get_generation(feed) for feed in _owner_feeds(version))
+        return _article_tag(request, pk, version, generations, personal)
+    return etag
+
+
+def article_last_modified(public_only=True):
+    """
+    Build a ``last_modified_func`` for views taking an article ``pk``.
+
+    The last change of the article's publisher and journalist feeds counts
+    as a change of the article, as for the ETag.
+
+    Args:
+        public_only (bool): Whether the view only shows public articles.
+
+    Returns:
+        callable: ``last_modified_func(request, pk, ...)`` for ``condition``.
+    """
+    def last_modified(request, pk, *args, **kwargs):
+        version = _article_version(request, pk, public_only)
+        if version is None:
+            return None
+        return _article_modified(version, map(get_last_modified, _owner_feeds(version)))
+    return last_modified
+
+
+def _feed_name(feed, request, args, kwargs):
+    return feed(request, *args, **kwargs) if callable(feed) else feed
+
+
+def feed_etag(feed, personal=False):
+    """
+    Build an ``etag_func`` for a view listing ``feed``.
+
+    Args:
+        feed (str | callable): Feed name, or a function of the view's
+            arguments returning it.
+        personal (bool): Whether the response differs per user.
+
+    Returns:
+        callable: ``etag_func`` for ``condition``.
+    """
+    def etag(request, *args, **kwargs):
+        name = _feed_name(feed, request, args, kwargs)
+        return _digest("feed", name, get_generation(name), *_variant(request, personal))
+    return etag
+
+
+def feed_last_modified(feed):
+    """
+    Build a ``last_modified_func`` for a view listing ``feed``.
+
+    Args:
+        feed (str | callable): Feed name, or a function of the view's
+            arguments returning it.
+
+    Returns:
+        callable: ``last_modified_func`` for ``condition``.
+    """
+    def last_modified(request, *args, **kwargs):
+        return _settled(get_last_modified(_feed_name(feed, request, args, kwargs)))
+    return last_modified
+
+
+async def aarticle_validators(request, pk, public_only=True, personal=False):
+    """
+    Return ``(etag, last_modified)`` for article ``pk`` using the async ORM.
+
+    Args:
+        request (HttpRequest): The request being answered.
+        pk (int): The article's primary key.
+        public_only (bool): Whether the view only shows public articles.
+        personal (bool): Whether the response differs per user.
+
+    Returns:
+        tuple: ETag and Last-Modified, both None if the article does not
+        exist (or is not public when ``public_only``).
+    """
+    articles = _public_filter(Article.objects.filter(pk=pk), public_only)
+    version = await articles.values_list("updated_at", "publisher_id", "journalist_id").afirst()
+    if version is None:
+        return None, None
+    feeds = _owner_feeds(version)
+    generations = tuple([await aget_generation(feed) for feed in feeds])
+    modified = [await aget_last_modified(feed) for feed in feeds]
+    return (
+        _article_tag(request, pk, version, generations, personal),
+        _article_modified(version, modified),
+    )
+
+
+async def afeed_validators(request, feed, personal=False):
+    """
+    Return ``(etag, last_modified)`` for a view listing ``feed``, reading
+    the feed's generation and last change with the cache's async methods.
+    """
+    etag = _digest("feed", feed, await aget_generation(feed), *_variant(request, personal))
+    return etag, _settled(await aget_last_modified(feed))
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Return the 304 (or 412) response the request's preconditions call for,
+    or None if the view should produce the full response.
+
+    Args:
+        request (HttpRequest): The request being answered.
+        etag (str | None): Unquoted ETag of the current representation.
+        last_modified (datetime | None): When it last changed.
+
+    Returns:
+        HttpResponse | None: The short-circuit response, if any.
+    """
+    return get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(request, response, etag, last_modified):
+    """
+    Add the ETag and Last-Modified headers to a full GET/HEAD ``response``,
+    as ``condition`` does.
+
+    Returns:
+        HttpResponse: ``response``.
+    """
+    if request.method in ("GET", "HEAD"):
+        if last_modified and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(int(last_modified.timestamp()))
+        if etag:
+            response.headers.setdefault("ETag", quote_etag(etag))
+    return response
@@ -0,0 +1,203 @@
+"""
+dashboard.py
+
+Data for the role-specific sections of the dashboard.
+
+Each role only sees the articles it can act on:
+
+- journalist: their own articles.
+- editor: the articles of the publishers they belong to, plus independent
+  articles awaiting approval (which any editor may approve).
+- publisher: approved, unpublished articles of their publishers.
+- reader: their personal feed (see timeline.py), or the latest public
+  articles while it is empty.
+
+Every section is paged, so a page costs the same however many articles the
+role can see. Staff sections use ``?<section>_page=N`` and fetch one row
+past the page instead of counting; the reader feed is keyset-paginated
+with ``?feed_cursor=``. The status counts shown above the staff sections
+come from a single aggregate query.
+
+- Section: One page of an offset-paged section.
+- FeedSection: One page of the reader's keyset-paginated feed.
+- status_counts: Article counts per moderation state in one query.
+- dashboard_context: Template context for a user's dashboard.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .membership import member_publisher_ids
+from .models import Article
+from .pagination import KeysetPaginator
+from .timeline import TimelinePaginator, fallback_queryset
+
+
+def _page_size():
+    return getattr(settings, "NEWS_DASHBOARD_PAGE_SIZE", 20)
+
+
+def _query(request, **params):
+    """Return the request's query string with ``params`` set."""
+    query = request.GET.copy()
+    for param, value in params.items():
+        query[param] = value
+    return query.urlencode()
+
+
+class Section:
+    """
+    One page of a dashboard section, addressed by ``?<name>_page=N``.
+
+    Args:
+        name (str): Section name, used for its query parameter.
+        queryset (QuerySet): Ordered articles of the section.
+        request (HttpRequest): The dashboard request.
+        page_size (int | None): Articles per page. Defaults to
+            ``settings.NEWS_DASHBOARD_PAGE_SIZE``.
+
+    Attributes:
+        object_list (list[Article]): Articles on this page.
+        number (int): Page number, from 1.
+        has_next / has_previous (bool): Whether neighbouring pages exist.
+        next_query / previous_query (str | None): Query strings linking to them.
+    """
+
+    def __init__(self, name, queryset, request, page_size=None):
+        page_size = page_size or _page_size()
+        param = f"{name}_page"
+        try:
+            number = max(int(request.GET.get(param, 1)), 1)
+        except ValueError:
+            number = 1
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset: offset + page_size + 1])
+
+        self.name = name
+        self.number = number
+        self.object_list = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        self.has_previous = number > 1
+        self.next_query = _query(request, **{param: number + 1}) if self.has_next else None
+        self.previous_query = _query(request, **{param: number - 1}) if self.has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class FeedSection:
+    """
+    One page of a reader's feed, addressed by ``?feed_cursor=``.
+
+    Falls back to the latest public articles while the reader's personal
+    feed is empty, e.g. before they subscribe to anything; pages of that
+    fallback carry ``?feed=latest``.
+
+    Attributes:
+        personal (bool): Whether this is the reader's own feed.
+        object_list, has_next, has_previous, next_query, previous_query:
+            As for Section.
+
+    Raises:
+        InvalidCursor: If ``?feed_cursor=`` cannot be decoded.
+    """
+
+    def __init__(self, reader, request, page_size=None):
+        page_size = page_size or _page_size()
+        cursor = request.GET.get("feed_cursor")
+        self.personal = request.GET.get("feed") != "latest"
+        if self.personal:
+            page = TimelinePaginator(reader, page_size).paginate(fallback_queryset(reader), cursor)
+            self.personal = bool(page.object_list or cursor)
+        if not self.personal:
+            latest = Article.objects.filter(approved=True, published=True)
+            page = KeysetPaginator(page_size).paginate(
+                latest.select_related("journalist", "publisher"), cursor
+            )
+
+        self.object_list = page.object_list
+        self.has_next = page.has_next
+        self.has_previous = page.has_previous
+        self.next_query = self._link(request, page.next_cursor)
+        self.previous_query = self._link(request, page.previous_cursor)
+
+    def _link(self, request, cursor):
+        if cursor is None:
+            return None
+        if self.personal:
+            return _query(request, feed_cursor=cursor)
+        return _query(request, feed_cursor=cursor, feed="latest")
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def status_counts(queryset):
+    """
+    Count ``queryset``'s articles per moderation state in one aggregate query.
+
+    Returns:
+        dict: ``total``, ``pending`` (not approved), ``awaiting_publication``
+        (approved, not published) and ``published`` (approved and published).
+    """
+    return queryset.aggregate(
+        total=Count("pk"),
+        pending=Count("pk", filter=Q(approved=False)),
+        awaiting_publication=Count("pk", filter=Q(approved=True, published=False)),
+        published=Count("pk", filter=Q(approved=True, published=True)),
+    )
+
+
+def dashboard_context(request):
+    """
+    Build the dashboard template context for ``request.user``'s role.
+
+    Args:
+        request (HttpRequest): The dashboard request.
+
+    Returns:
+        dict: Role flags, the role's sections and, for staff, ``counts``
+        from status_counts() and ``member_publisher_ids``.
+    """
+    user = request.user
+    role = user.role
+    context = {
+        "is_journalist": role == "journalist",
+        "is_editor": role == "editor",
+        "is_reader": role == "reader",
+        "is_publisher": role == "publisher",
+    }
+    # Related rows the template touches are loaded with the page
+    articles = Article.objects.select_related("journalist", "publisher")
+
+    if role == "journalist":
+        scope = articles.filter(journalist=user)
+        context["my_articles"] = Section("mine", scope.order_by("-created_at", "-id"), request)
+    elif role == "editor":
+        publisher_ids = member_publisher_ids(user)
+        scope = articles.filter(
+            Q(publisher_id__in=publisher_ids) | Q(publisher__isnull=True, approved=False)
+        )
+        context["all_articles"] = Section("articles", scope.order_by("-created_at", "-id"), request)
+        context["member_publisher_ids"] = publisher_ids
+    elif role == "publisher":
+        publisher_ids = member_publisher_ids(user)
+        scope = articles.filter(publisher_id__in=publisher_ids)
+        context["approved_articles"] = Section(
+            "approved",
+            scope.filter(approved=True, published=False).order_by("created_at", "id"),
+            request,
+        )
+        context["member_publisher_ids"] = publisher_ids
+    else:
+        context["published_articles"] = FeedSection(user, request)
+        return context
+
+    context["counts"] = status_counts(scope.select_related(None))
+    return context
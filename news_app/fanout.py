@@ -0,0 +1,206 @@
+"""
+fanout.py
+
+Fan-out of publishing events to subscribers.
+
+When an article is published, everyone subscribed to its publisher and
+everyone following its journalist hears about it. Recipients are resolved
+with a single set-based query (two indexed ``IN`` subqueries over the
+subscription tables, so a reader who does both appears once) and walked in
+primary-key chunks. A journalist with hundreds of thousands of followers is
+therefore never loaded into memory at once, and a FanoutJob interrupted
+part-way resumes from the last user it handled.
+
+Each chunk queues email notifications and, unless the audience exceeds
+``settings.NEWS_TIMELINE_MAX_FANOUT``, copies the article into every
+recipient's timeline (see timeline.py). Articles written in bulk rather
+than published one by one get jobs with ``notify`` off, which only fill in
+the timelines.
+
+- subscriber_queryset: All users who should hear about an article.
+- fan_out_chunk: Deliver one chunk of a FanoutJob.
+- run_pending_jobs: Advance unfinished FanoutJobs, notifying ones first, within a budget.
+- has_pending_jobs: Whether any FanoutJob is unfinished.
+- queue_silent_jobs: Queue timeline-only jobs for articles written in bulk.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FanoutJob, Notification, TimelineEntry
+from .notifications import enqueue, subject_line
+
+DEFAULT_CHUNK_SIZE = 1000
+# Unfinished jobs loaded per query by run_pending_jobs()
+JOB_BATCH_SIZE = 100
+
+
+def subscriber_queryset(article):
+    """
+    Return the users subscribed to ``article``'s publisher or following its journalist.
+
+    Args:
+        article (Article): The published article.
+
+    Returns:
+        QuerySet: Distinct CustomUser rows, unordered.
+    """
+    User = get_user_model()
+    conditions = []
+    if article.publisher_id:
+        subscriptions = User.subscriptions_publishers.through.objects.filter(
+            publisher_id=article.publisher_id
+        )
+        conditions.append(Q(id__in=subscriptions.values("customuser_id")))
+    if article.journalist_id:
+        follows = User.subscriptions_journalists.through.objects.filter(
+            to_customuser_id=article.journalist_id
+        )
+        conditions.append(Q(id__in=follows.values("from_customuser_id")))
+    if not conditions:
+        return User.objects.none()
+
+    condition = conditions[0]
+    for other in conditions[1:]:
+        condition |= other
+    return User.objects.filter(condition)
+
+
+def _deliver(job, recipients):
+    """
+    Enqueue deliveries of ``job``'s article for one chunk of ``(user_id, email)`` rows.
+    """
+    article = job.article
+    if job.notify:
+        subject = subject_line(f"New article: {article.title}")
+        body = f"A new article, '{article.title}', has just been published."
+        enqueue(
+            Notification(
+                event=Notification.EVENT_ARTICLE_PUBLISHED,
+                dedupe_key=f"{Notification.EVENT_ARTICLE_PUBLISHED}:{article.pk}:{user_id}",
+                article=article,
+                recipient=email,
+                subject=subject,
+                body=body,
+            )
+            for user_id, email in recipients
+            if email
+        )
+    if job.materialize_timeline:
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(reader_id=user_id, article=article, published_at=article.published_at)
+                for user_id, _ in recipients
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def fan_out_chunk(job, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Deliver the next ``chunk_size`` subscribers of ``job``'s article.
+
+    The deliveries and the job's progress are committed together, so a crash
+    between chunks never loses or repeats a chunk.
+
+    Args:
+        job (FanoutJob): The job to advance.
+        chunk_size (int): Maximum subscribers handled in this call.
+
+    Returns:
+        int: Number of subscribers handled; 0 once the job is complete.
+    """
+    article = job.article
+    recipients = list(
+        subscriber_queryset(article)
+        .filter(id__gt=job.last_user_id)
+        .order_by("id")
+        .values_list("id", "email")[:chunk_size]
+    )
+
+    if job.last_user_id == 0 and len(recipients) == chunk_size:
+        # More than one chunk: decide once whether the audience is small
+        # enough to materialize the article into every reader's timeline.
+        limit = getattr(settings, "NEWS_TIMELINE_MAX_FANOUT", 10000)
+        job.materialize_timeline = subscriber_queryset(article).count() <= limit
+
+    with transaction.atomic():
+        if recipients:
+            _deliver(job, recipients)
+            job.last_user_id = recipients[-1][0]
+        if len(recipients) < chunk_size:
+            job.completed_at = timezone.now()
+        job.save(update_fields=["last_user_id", "materialize_timeline", "completed_at"])
+    return len(recipients)
+
+
+def run_pending_jobs(chunk_size=DEFAULT_CHUNK_SIZE, max_chunks=None):
+    """
+    Advance unfinished FanoutJobs in ID order, one chunk at a time.
+
+    Jobs that notify subscribers run before silent timeline-only ones, so a
+    bulk import's backfill from queue_silent_jobs() never delays publish
+    emails. With ``max_chunks`` the call returns once that many chunks are done,
+    so a worker can deliver the outbox between slices of a large backlog;
+    the next call resumes where this one stopped.
+
+    Args:
+        chunk_size (int): Subscribers handled per chunk.
+        max_chunks (int | None): Most chunks to run; None runs every job
+            to completion.
+
+    Returns:
+        int: Total number of subscribers handled.
+    """
+    handled = chunks = 0
+    pending = FanoutJob.objects.filter(completed_at__isnull=True).select_related("article")
+    for notify in (True, False):
+        jobs = pending.filter(notify=notify).order_by("id")
+        last_id = 0
+        while batch := list(jobs.filter(id__gt=last_id)[:JOB_BATCH_SIZE]):
+            for job in batch:
+                while job.completed_at is None:
+                    if max_chunks is not None and chunks >= max_chunks:
+                        return handled
+                    handled += fan_out_chunk(job, chunk_size)
+                    chunks += 1
+            last_id = batch[-1].pk
+    return handled
+
+
+def has_pending_jobs():
+    """Return whether any FanoutJob is still unfinished."""
+    return FanoutJob.objects.filter(completed_at__isnull=True).exists()
+
+
+def queue_silent_jobs(articles, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Queue a timeline-only FanoutJob (``notify`` off) for every public
+    article in ``articles`` that has none, e.g. after a bulk insert.
+
+    Until the worker completes them, these articles are read into reader
+    feeds on demand (see timeline.py).
+
+    Args:
+        articles (QuerySet): Articles to consider.
+        batch_size (int): Jobs inserted per query.
+
+    Returns:
+        int: Number of jobs queued.
+    """
+    ids = (
+        articles.filter(approved=True, published=True, fanout_job__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    queued = last_id = 0
+    while batch := list(ids.filter(id__gt=last_id)[:batch_size]):
+        FanoutJob.objects.bulk_create(
+            [FanoutJob(article_id=pk, notify=False) for pk in batch], ignore_conflicts=True
+        )
+        queued += len(batch)
+        last_id = batch[-1]
+    return queued
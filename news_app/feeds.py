@@ -0,0 +1,150 @@
+"""
+feeds.py
+
+RSS 2.0 and Atom syndication feeds of the latest published articles, for
+aggregators.
+
+There is one feed of every public article, one per publisher and one per
+journalist, each in both formats. A feed's XML is rendered once and kept in
+the versioned feed cache (see cache.py) under the generation of the article
+feed it lists, so it is only rendered again after an article enters, changes
+within or leaves that feed. The views serving it (see views.py) answer
+conditional GETs from the same generation without touching the database.
+
+- FORMATS: Feed generator per format name (``rss``, ``atom``).
+- ArticleFeed: Latest public articles.
+- PublisherArticleFeed / JournalistArticleFeed: Latest public articles of
+  one publisher or journalist.
+- render_feed: Cached XML of a feed.
+"""
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.text import Truncator
+
+from .cache import get_or_build
+from .fieldsets import EXCERPT_LENGTH
+from .models import Article, CustomUser, Publisher
+from .pagination import FEED_ORDERING
+
+FORMATS = {"rss": Rss201rev2Feed, "atom": Atom1Feed}
+
+SITE_NAME = "The Journal"
+
+
+class ArticleFeed(Feed):
+    """
+    The latest ``settings.NEWS_SYNDICATION_ITEMS`` public articles, newest
+    first, with an excerpt of each.
+
+    Args:
+        format (str): A key of FORMATS.
+    """
+
+    def __init__(self, format="rss"):
+        self.feed_type = FORMATS[format]
+
+    def get_object(self, request, pk=None):
+        return None
+
+    def articles(self, obj):
+        """Return the public articles this feed lists."""
+        return Article.objects.filter(approved=True, published=True)
+
+    def title(self, obj):
+        return SITE_NAME
+
+    def link(self, obj):
+        return reverse("news_app:article_list")
+
+    def description(self, obj):
+        return f"The latest articles on {SITE_NAME}."
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+    def items(self, obj):
+        limit = getattr(settings, "NEWS_SYNDICATION_ITEMS", 50)
+        return self.articles(obj).select_related("journalist").order_by(*FEED_ORDERING)[:limit]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.content).chars(EXCERPT_LENGTH)
+
+    def item_link(self, item):
+        return reverse("news_app:article_detail", args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.journalist.username if item.journalist else None
+
+
+class PublisherArticleFeed(ArticleFeed):
+    """The latest public articles of one publisher."""
+
+    def get_object(self, request, pk=None):
+        return get_object_or_404(Publisher, pk=pk)
+
+    def articles(self, obj):
+        return super().articles(obj).filter(publisher=obj)
+
+    def title(self, obj):
+        return f"{obj.name} | {SITE_NAME}"
+
+    def description(self, obj):
+        return f"The latest articles from {obj.name} on {SITE_NAME}."
+
+
+class JournalistArticleFeed(ArticleFeed):
+    """The latest public articles of one journalist."""
+
+    def get_object(self, request, pk=None):
+        return get_object_or_404(CustomUser, pk=pk, role="journalist")
+
+    def articles(self, obj):
+        return super().articles(obj).filter(journalist=obj)
+
+    def title(self, obj):
+        return f"{obj.username} | {SITE_NAME}"
+
+    def description(self, obj):
+        return f"The latest articles by {obj.username} on {SITE_NAME}."
+
+
+def render_feed(feed_class, feed_name, request, format, **kwargs):
+    """
+    Return the XML of a feed, rendering it only if ``feed_name`` changed
+    since it was last rendered.
+
+    The cached copy is keyed by the URL path without its query string, so
+    tracking parameters added by aggregators share it.
+
+    Args:
+        feed_class (type[ArticleFeed]): The feed to render.
+        feed_name (str): Name of the cached article feed it lists.
+        request (HttpRequest): The request being answered.
+        format (str): A key of FORMATS.
+        **kwargs: Passed on to the feed's get_object().
+
+    Returns:
+        dict: ``content`` (bytes) and ``content_type``.
+
+    Raises:
+        Http404: If the feed's publisher or journalist does not exist.
+    """
+    def build():
+        response = feed_class(format)(request, **kwargs)
+        return {"content": response.content, "content_type": response["Content-Type"]}
+
+    variant = f"syndication:{format}:{request.build_absolute_uri(request.path)}"
+    return get_or_build(feed_name, variant, build)
@@ -0,0 +1,125 @@
+"""
+fieldsets.py
+
+Sparse fieldsets for the article API.
+
+Clients may ask for a subset of a serializer's fields with
+``?fields=id,title,author``. Only those fields are rendered, and the queryset
+is narrowed to match: ``only()`` restricts the column list to what the
+fields read, relations nobody asked for are not joined, and computed fields
+such as the excerpt are annotated in SQL only when requested. Large columns
+like ``content`` therefore never leave the database unless they are needed.
+
+- EXCERPT_LENGTH: Characters of content shown in an article excerpt.
+- ANNOTATIONS: SQL expressions backing computed serializer fields.
+- parse_fields: Read and validate the ``?fields=`` query parameter.
+- narrow_queryset: Restrict a queryset to the columns a field set reads.
+- SparseFieldsetMixin: Applies both to a DRF generic view.
+"""
+
+from django.db.models.functions import Left
+from rest_framework.exceptions import ValidationError
+
+EXCERPT_LENGTH = 200
+
+# One extra character tells the serializer whether the excerpt was cut short
+ANNOTATIONS = {
+    "excerpt": lambda: Left("content", EXCERPT_LENGTH + 1),
+}
+
+
+def parse_fields(request, serializer, param="fields"):
+    """
+    Return the field names requested with ``?fields=``, in serializer order.
+
+    Args:
+        request (Request): The DRF request.
+        serializer (Serializer): An instance of the serializer being narrowed.
+        param (str): Name of the query parameter.
+
+    Returns:
+        list[str] | None: Requested field names, or None if the parameter is
+        absent (all fields).
+
+    Raises:
+        ValidationError: If an unknown field is requested.
+    """
+    raw = request.query_params.get(param)
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(serializer.fields)
+    if unknown:
+        raise ValidationError({param: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+    return [name for name in serializer.fields if name in requested]
+
+
+def narrow_queryset(queryset, serializer, fields=None, always=("id",)):
+    """
+    Restrict ``queryset`` to the columns and joins ``fields`` of ``serializer`` read.
+
+    Field sources map to columns: ``title`` loads the title column,
+    ``journalist`` the foreign key, and ``journalist.username`` joins the
+    journalist and loads only its username. Sources listed in ANNOTATIONS
+    are computed in SQL instead.
+
+    Args:
+        queryset (QuerySet): Queryset to narrow.
+        serializer (Serializer): An instance of the serializer that will render it.
+        fields (list[str] | None): Field names to keep; None keeps them all.
+        always (Iterable[str]): Columns loaded regardless, e.g. pagination keys.
+
+    Returns:
+        QuerySet: The narrowed queryset.
+    """
+    columns = set(always)
+    relations = set()
+    annotations = {}
+    for name in fields if fields is not None else serializer.fields:
+        source = serializer.fields[name].source
+        if source in ANNOTATIONS:
+            annotations[source] = ANNOTATIONS[source]()
+            continue
+        parts = source.split(".")
+        if len(parts) > 1:
+            relations.add("__".join(parts[:-1]))
+        columns.add("__".join(parts))
+
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin for DRF generic views that honours ``?fields=`` in both the
+    rendered output and the SQL that produces it.
+
+    Attributes:
+        always_load (tuple[str]): Columns loaded even when not requested,
+            such as the keys the paginator builds cursors from.
+    """
+
+    always_load = ("id",)
+
+    def get_requested_fields(self):
+        """Return the validated ``?fields=`` list, or None for all fields."""
+        if not hasattr(self, "_requested_fields"):
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            self._requested_fields = parse_fields(self.request, serializer)
+        return self._requested_fields
+
+    def narrow(self, queryset):
+        """Narrow ``queryset`` to the columns the response will read."""
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return narrow_queryset(queryset, serializer, self.get_requested_fields(), self.always_load)
+
+    def filter_queryset(self, queryset):
+        return self.narrow(super().filter_queryset(queryset))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
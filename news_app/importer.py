@@ -0,0 +1,311 @@
+"""
+importer.py
+
+Bulk import of articles from NDJSON or CSV, e.g. a new publisher's legacy
+archive.
+
+Rows are read as a stream and handled in batches of ``batch_size``:
+
+1. The batch's journalist usernames and publisher names not seen before are
+   resolved in one query each; every answer, misses included, is cached for
+   the rest of the import.
+2. Each row is validated in memory against the Article model's own field
+   rules. Invalid rows are rejected with their line number and error; the
+   rest of the batch is still imported.
+3. The valid rows are written with one ``bulk_create`` in a transaction.
+
+``bulk_create`` sends no per-row ``post_save`` signals, so none of the
+search, fan-out or feed-cache receivers run for imported rows. Once the
+import ends (or fails part-way), the side effects are applied once for
+everything written: the published articles are indexed in batches and each
+affected feed cache is invalidated once. Imported published articles get
+timeline-only fan-out jobs: the send_notifications worker adds them to
+readers' feeds, but migrating an archive emails nobody.
+
+Columns (NDJSON keys or CSV header):
+
+- ``title``, ``content``: Required.
+- ``journalist``: Username of a journalist; optional with a default.
+- ``publisher``: Publisher name; optional, else the default (or none).
+- ``published_at``: ISO date or datetime. Rows with it are imported
+  approved and published, rows without it as pending drafts.
+- ``created_at``: ISO date or datetime; defaults to ``published_at``.
+
+- IMPORT_FORMATS: Supported input formats.
+- read_rows: Parse an NDJSON or CSV stream into rows.
+- CachedLookup: Resolve names to IDs, caching every answer.
+- ImportResult: Outcome of an import.
+- import_articles: Validate and bulk-insert rows in batches.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import search
+from .cache import article_feeds, bump_generations
+from .export import parse_bound
+from .fanout import queue_silent_jobs
+from .models import Article, CustomUser, Publisher
+
+DEFAULT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+def read_rows(stream, format):
+    """
+    Parse ``stream`` as NDJSON (one JSON object per line) or CSV with a header.
+
+    Args:
+        stream (Iterable[str]): Text lines, e.g. an open file.
+        format (str): A member of IMPORT_FORMATS.
+
+    Yields:
+        tuple[int, dict | None, str]: Line number, the row and an error;
+        malformed rows come with ``None`` and the reason.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, ""
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if isinstance(row, dict):
+            yield number, row, ""
+        else:
+            yield number, None, "Expected a JSON object."
+
+
+class CachedLookup:
+    """
+    Resolves names (e.g. usernames) to primary keys. Names not seen before
+    are loaded in one query per call to load(); every answer is kept,
+    including names that match nothing or more than one row. Names match
+    as the database compares them, i.e. case-insensitively under MySQL's
+    default collations.
+
+    Args:
+        queryset (QuerySet): Rows names may refer to.
+        field (str): The name field.
+        label (str): What a name refers to, for error messages.
+    """
+
+    _AMBIGUOUS = object()
+
+    def __init__(self, queryset, field, label):
+        self.queryset = queryset
+        self.field = field
+        self.label = label
+        self._ids = {}
+
+    def load(self, names):
+        """Resolve every name in ``names`` not looked up yet."""
+        missing = {str(name) for name in names if name} - set(self._ids)
+        if not missing:
+            return
+        found = {}
+        rows = self.queryset.filter(**{f"{self.field}__in": missing}).values_list("pk", self.field)
+        for pk, name in rows:
+            key = name.casefold()
+            found[key] = self._AMBIGUOUS if key in found else pk
+        for name in missing:
+            self._ids[name] = found.get(name.casefold())
+
+    def get(self, name):
+        """
+        Return the primary key ``name`` refers to.
+
+        Raises:
+            ValueError: If it matches no row or several rows.
+        """
+        if str(name) not in self._ids:
+            self.load([name])
+        pk = self._ids[str(name)]
+        if pk is None:
+            raise ValueError(f"No {self.label} named {name!r}.")
+        if pk is self._AMBIGUOUS:
+            raise ValueError(f"More than one {self.label} is named {name!r}.")
+        return pk
+
+
+class ImportResult:
+    """
+    Outcome of an import.
+
+    Attributes:
+        created (int): Articles written (valid rows, in a dry run).
+        rejected (list[tuple[int, str]]): Line number and error per invalid row.
+        feeds (set[str]): Feed caches the written articles appear in.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.rejected = []
+        self.feeds = set()
+
+    @property
+    def processed(self):
+        return self.created + len(self.rejected)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _build_article(row, journalists, publishers, journalist_id, publisher_id, now):
+    """
+    Build an unsaved Article from ``row`` and validate it.
+
+    Raises:
+        ValidationError: If a field is invalid.
+        ValueError: If a journalist, publisher or date cannot be resolved.
+    """
+    journalist = _text(row, "journalist")
+    if journalist:
+        journalist_id = journalists.get(journalist)
+    elif journalist_id is None:
+        raise ValueError("journalist: This field is required.")
+    publisher = _text(row, "publisher")
+    if publisher:
+        publisher_id = publishers.get(publisher)
+
+    published_at = _text(row, "published_at")
+    created_at = _text(row, "created_at")
+    try:
+        published_at = parse_bound(published_at) if published_at else None
+        created_at = parse_bound(created_at) if created_at else published_at or now
+    except ValueError as exc:
+        raise ValueError(f"Invalid date: {exc}")
+
+    published = published_at is not None
+    article = Article(
+        title=_text(row, "title"),
+        content=_text(row, "content"),
+        journalist_id=journalist_id,
+        publisher_id=publisher_id,
+        approved=published,
+        published=published,
+        is_draft=not published,
+        published_at=published_at,
+        created_at=created_at,
+        updated_at=now,
+    )
+    # Field rules only: no queries for the foreign keys or uniqueness
+    article.full_clean(
+        exclude=["journalist", "publisher"], validate_unique=False, validate_constraints=False
+    )
+    return article
+
+
+def _error_message(exc):
+    if isinstance(exc, ValidationError) and hasattr(exc, "message_dict"):
+        return "; ".join(
+            f"{field}: {' '.join(messages)}" for field, messages in sorted(exc.message_dict.items())
+        )
+    return " ".join(getattr(exc, "messages", None) or [str(exc)])
+
+
+def _refresh(after_id, feeds, batch_size):
+    """
+    Index the published articles with IDs above ``after_id``, queue their
+    timeline-only fan-out jobs and invalidate ``feeds``, once for the whole
+    import.
+
+    Articles saved concurrently by the site may fall in the same ID range;
+    indexing them again is harmless, and they already have their own jobs.
+    """
+    articles = (
+        Article.objects.filter(id__gt=after_id, approved=True, published=True)
+        .only("id", "title", "content")
+        .order_by("id")
+    )
+    last_id = after_id
+    while batch := list(articles.filter(id__gt=last_id)[:batch_size]):
+        search.index_articles(batch)
+        last_id = batch[-1].pk
+    queue_silent_jobs(Article.objects.filter(id__gt=after_id), batch_size)
+    if feeds:
+        bump_generations(*feeds)
+
+
+def import_articles(
+    rows, batch_size=DEFAULT_BATCH_SIZE, journalist_id=None, publisher_id=None,
+    dry_run=False, progress=None,
+):
+    """
+    Validate ``rows`` and bulk-insert the valid ones, batch by batch.
+
+    Args:
+        rows (Iterable[tuple[int, dict | None, str]]): Rows from read_rows().
+        batch_size (int): Rows validated and inserted at a time.
+        journalist_id (int | None): Journalist of rows without one.
+        publisher_id (int | None): Publisher of rows without one.
+        dry_run (bool): Only validate; write nothing.
+        progress (callable | None): Called with the ImportResult after
+            every batch.
+
+    Returns:
+        ImportResult: What was imported and what was rejected.
+    """
+    result = ImportResult()
+    journalists = CachedLookup(
+        CustomUser.objects.filter(role="journalist"), "username", "journalist"
+    )
+    publishers = CachedLookup(Publisher.objects.all(), "name", "publisher")
+    # bulk_create does not return primary keys on MySQL, so the articles to
+    # index afterwards are found by ID range
+    after_id = Article.objects.aggregate(last=Max("id"))["last"] or 0
+    now = timezone.now()
+
+    try:
+        for batch in _batches(rows, batch_size):
+            journalists.load(_text(row, "journalist") for _, row, error in batch if row is not None)
+            publishers.load(_text(row, "publisher") for _, row, error in batch if row is not None)
+
+            articles = []
+            for number, row, error in batch:
+                if not error:
+                    try:
+                        articles.append(_build_article(
+                            row, journalists, publishers, journalist_id, publisher_id, now
+                        ))
+                        continue
+                    except (ValidationError, ValueError) as exc:
+                        error = _error_message(exc)
+                result.rejected.append((number, error))
+
+            if articles and not dry_run:
+                with transaction.atomic():
+                    Article.objects.bulk_create(articles, batch_size=batch_size)
+            result.created += len(articles)
+            if articles and not dry_run:
+                for article in articles:
+                    if article.published:
+                        result.feeds |= article_feeds(article.publisher_id, article.journalist_id)
+            if progress is not None:
+                progress(result)
+    finally:
+        if result.created and not dry_run:
+            _refresh(after_id, result.feeds, batch_size)
+    return result
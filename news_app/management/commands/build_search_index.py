@@ -0,0 +1,40 @@
+"""
+build_search_index.py
+
+Management command that rebuilds the article search index from scratch.
+
+The index is normally maintained incrementally by the Article signals; run
+this after the first deploy of search, after bulk imports that bypass the
+signals, or to repair a damaged index.
+
+Usage:
+    python manage.py build_search_index
+    python manage.py build_search_index --batch-size 1000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_app.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Re-index every approved and published article.
+    """
+
+    help = "Rebuild the article search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Articles indexed per batch (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        indexed = rebuild_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} articles in {time.monotonic() - started:.1f}s."
+        ))
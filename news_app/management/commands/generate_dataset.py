@@ -0,0 +1,315 @@
+"""
+generate_dataset.py
+
+Management command that fills the database with a large synthetic dataset
+for benchmarking (see run_benchmarks).
+
+Creates users in every role, publishers with editor, journalist and
+publisher members, articles in every moderation state spread over the past
+two years, and the reader subscription graph (publishers subscribed to and
+journalists followed). Rows are written with bulk_create in batches, so no
+per-row signals run; afterwards the feed caches are invalidated once, the
+published articles get timeline-only fan-out jobs (no emails) and, with
+``--index``, the search index is rebuilt. ``--fanout`` runs those jobs
+right away, so reader feeds are read from materialized timelines; without
+it the send_notifications worker does.
+
+Generated usernames start with ``bench_``; ``--clear`` deletes those users
+(and with them their articles) and the ``Bench`` publishers first. The same
+``--seed`` always produces the same dataset.
+
+Usage:
+    python manage.py generate_dataset --users 1000 --publishers 20 --articles 10000
+    python manage.py generate_dataset --clear --index --fanout
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from news_app.cache import GLOBAL_FEED, bump_generations, journalist_feed, publisher_feed
+from news_app.fanout import queue_silent_jobs, run_pending_jobs
+from news_app.models import Article, CustomUser, Publisher, TimelineEntry
+from news_app.search import rebuild_index
+from news_app.signals import mute_article_signals
+
+USERNAME_PREFIX = "bench_"
+PUBLISHER_PREFIX = "Bench "
+PASSWORD = "bench-password"
+
+# Share of users per role
+ROLE_WEIGHTS = {"reader": 0.85, "journalist": 0.10, "editor": 0.04, "publisher": 0.01}
+
+# Share of articles per state: (approved, published)
+STATE_WEIGHTS = {(True, True): 0.80, (True, False): 0.08, (False, False): 0.12}
+
+WORDS = (
+    "election market council storm league minister report budget court school "
+    "energy health police harbour festival science review transport weather "
+    "housing economy museum river coast rail airport strike talks season final "
+    "record growth climate vote policy study trial launch deal plan city region"
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Generate a synthetic dataset with bulk inserts.
+    """
+
+    help = "Generate a large synthetic dataset for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000, help="Users (default: 100000).")
+        parser.add_argument(
+            "--publishers", type=int, default=2_000,
+            help="Publishers (default: 2000).",
+        )
+        parser.add_argument(
+            "--articles", type=int, default=1_000_000,
+            help="Articles (default: 1000000).",
+        )
+        parser.add_argument(
+            "--subscriptions", type=int, default=5,
+            help="Publishers each reader subscribes to (default: 5).",
+        )
+        parser.add_argument(
+            "--follows", type=int, default=5,
+            help="Journalists each reader follows (default: 5).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5_000,
+            help="Rows per INSERT (default: 5000).",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42).")
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete a previously generated dataset first.",
+        )
+        parser.add_argument(
+            "--index", action="store_true",
+            help="Rebuild the search index afterwards.",
+        )
+        parser.add_argument(
+            "--fanout", action="store_true",
+            help="Fill the readers' timelines afterwards instead of leaving it to the worker.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = time.monotonic()
+
+        if options["clear"]:
+            self.clear()
+        users = self.create_users(options["users"])
+        publishers = self.create_publishers(options["publishers"])
+        memberships = self.create_memberships(users, publishers)
+        self.create_subscriptions(users, publishers, options["subscriptions"], options["follows"])
+        self.create_articles(users["journalist"], memberships, options["articles"])
+
+        bump_generations(
+            GLOBAL_FEED,
+            *(publisher_feed(pk) for pk in publishers),
+            *(journalist_feed(pk) for pk in users["journalist"]),
+        )
+        generated = Article.objects.filter(journalist__username__startswith=USERNAME_PREFIX)
+        self.step("Fan-out jobs", lambda: queue_silent_jobs(generated, self.batch_size))
+        if options["fanout"]:
+            self.step("Timeline entries", lambda: self.fan_out())
+        if options["index"]:
+            self.step("Search index", lambda: rebuild_index())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Dataset generated in {time.monotonic() - started:.1f}s."
+        ))
+
+    # -----------------------
+    # Helpers
+    # -----------------------
+    def step(self, label, func):
+        """Run ``func``, reporting how many rows it wrote and how fast."""
+        started = time.monotonic()
+        rows = func() or 0
+        elapsed = time.monotonic() - started
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        self.stdout.write(f"{label}: {rows:,} rows in {elapsed:.1f}s{rate}")
+        return rows
+
+    def bulk_insert(self, model, rows):
+        """
+        Insert the instances yielded by ``rows`` in batches, each in its own
+        transaction, without holding more than one batch in memory.
+
+        Returns:
+            int: Rows inserted.
+        """
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                total += self._flush(model, batch)
+                batch = []
+        if batch:
+            total += self._flush(model, batch)
+        return total
+
+    def _flush(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
+
+    def fan_out(self):
+        before = TimelineEntry.objects.count()
+        run_pending_jobs(chunk_size=self.batch_size)
+        return TimelineEntry.objects.count() - before
+
+    def clear(self):
+        def delete():
+            # Feeds are invalidated once the new dataset is in place
+            with mute_article_signals():
+                Publisher.objects.filter(name__startswith=PUBLISHER_PREFIX).delete()
+                users = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX)
+                deleted, _ = users.delete()
+            return deleted
+        self.step("Cleared previous dataset", delete)
+
+    # -----------------------
+    # Users and publishers
+    # -----------------------
+    def create_users(self, count):
+        """
+        Create ``count`` users split across the roles by ROLE_WEIGHTS.
+
+        Returns:
+            dict[str, list[int]]: User IDs per role.
+        """
+        password = make_password(PASSWORD)  # Hashing once keeps this fast
+        roles = self.random.choices(
+            list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()), k=count
+        )
+        now = timezone.now()
+
+        def rows():
+            for index, role in enumerate(roles):
+                username = f"{USERNAME_PREFIX}{role}_{index:07d}"
+                yield CustomUser(
+                    username=username, email=f"{username}@example.com", password=password,
+                    role=role, date_joined=now,
+                )
+
+        self.step("Users", lambda: self.bulk_insert(CustomUser, rows()))
+        users = {role: [] for role in ROLE_WEIGHTS}
+        generated = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX)
+        for pk, role in generated.values_list("id", "role").iterator(chunk_size=self.batch_size):
+            users[role].append(pk)
+        return users
+
+    def create_publishers(self, count):
+        """
+        Create ``count`` publishers.
+
+        Returns:
+            list[int]: Publisher IDs.
+        """
+        rows = (Publisher(name=f"{PUBLISHER_PREFIX}{index:05d}") for index in range(count))
+        self.step("Publishers", lambda: self.bulk_insert(Publisher, rows))
+        return list(
+            Publisher.objects.filter(name__startswith=PUBLISHER_PREFIX).values_list("id", flat=True)
+        )
+
+    def create_memberships(self, users, publishers):
+        """
+        Attach staff to publishers: most journalists belong to one, editors
+        to one or two, publisher-role users to one.
+
+        Returns:
+            dict[int, list[int]]: Publisher IDs per member journalist.
+        """
+        through = Publisher.members.through
+        journalist_publishers = {}
+        if not publishers:
+            return journalist_publishers
+
+        def rows():
+            for journalist in users["journalist"]:
+                if self.random.random() < 0.8:
+                    publisher = self.random.choice(publishers)
+                    journalist_publishers[journalist] = [publisher]
+                    yield through(customuser_id=journalist, publisher_id=publisher)
+            for editor in users["editor"]:
+                count = min(len(publishers), self.random.randint(1, 2))
+                for publisher in self.random.sample(publishers, count):
+                    yield through(customuser_id=editor, publisher_id=publisher)
+            for owner in users["publisher"]:
+                yield through(customuser_id=owner, publisher_id=self.random.choice(publishers))
+
+        self.step("Memberships", lambda: self.bulk_insert(through, rows()))
+        return journalist_publishers
+
+    def create_subscriptions(self, users, publishers, subscriptions, follows):
+        """Subscribe every reader to publishers and have them follow journalists."""
+        journalists = users["journalist"]
+        publisher_through = CustomUser.subscriptions_publishers.through
+        follow_through = CustomUser.subscriptions_journalists.through
+
+        subscriptions = min(subscriptions, len(publishers))
+        follows = min(follows, len(journalists))
+
+        def publisher_rows():
+            for reader in users["reader"]:
+                for publisher in self.random.sample(publishers, subscriptions):
+                    yield publisher_through(customuser_id=reader, publisher_id=publisher)
+
+        def follow_rows():
+            for reader in users["reader"]:
+                for journalist in self.random.sample(journalists, follows):
+                    yield follow_through(from_customuser_id=reader, to_customuser_id=journalist)
+
+        self.step(
+            "Publisher subscriptions", lambda: self.bulk_insert(publisher_through, publisher_rows())
+        )
+        self.step("Journalist follows", lambda: self.bulk_insert(follow_through, follow_rows()))
+
+    # -----------------------
+    # Articles
+    # -----------------------
+    def create_articles(self, journalists, memberships, count):
+        """
+        Create ``count`` articles by random journalists, under the
+        journalist's publisher if they have one, in states drawn from
+        STATE_WEIGHTS and published over the past two years.
+        """
+        if not journalists:
+            return
+        now = timezone.now()
+        span = timedelta(days=730).total_seconds()
+        states = list(STATE_WEIGHTS)
+        weights = list(STATE_WEIGHTS.values())
+
+        def rows():
+            for index in range(count):
+                journalist = self.random.choice(journalists)
+                publisher = self.random.choice(memberships.get(journalist, [None]))
+                approved, published = self.random.choices(states, weights=weights)[0]
+                created_at = now - timedelta(seconds=self.random.random() * span)
+                words = self.random.choices(WORDS, k=self.random.randint(60, 120))
+                yield Article(
+                    title=" ".join(words[:6]).capitalize(),
+                    content=" ".join(words),
+                    journalist_id=journalist,
+                    publisher_id=publisher,
+                    approved=approved,
+                    published=published,
+                    is_draft=not (approved or published),
+                    created_at=created_at,
+                    published_at=created_at + timedelta(hours=1) if published else None,
+                    updated_at=now,
+                )
+
+        self.step("Articles", lambda: self.bulk_insert(Article, rows()))
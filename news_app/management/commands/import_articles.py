@@ -0,0 +1,117 @@
+"""
+import_articles.py
+
+Management command that bulk-imports articles from NDJSON or CSV files,
+e.g. when onboarding a publisher with a legacy archive. See
+news_app/importer.py for the accepted columns and how rows are validated
+and written.
+
+Invalid rows are reported with their line number and skipped; the valid
+rows are still imported. Progress and throughput are reported after every
+batch.
+
+Usage:
+    python manage.py import_articles archive.ndjson --publisher "The Times"
+    python manage.py import_articles legacy.csv --journalist alice --dry-run
+    gunzip -c archive.ndjson.gz | python manage.py import_articles - --format ndjson
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news_app.importer import (
+    DEFAULT_BATCH_SIZE, IMPORT_FORMATS, CachedLookup, import_articles, read_rows,
+)
+from news_app.models import CustomUser, Publisher
+
+# Rejected rows listed individually; the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    """
+    Import articles in validated, bulk-inserted batches.
+    """
+
+    help = "Bulk-import articles from NDJSON or CSV files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Files to import; '-' reads standard input.")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension, else ndjson).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Rows validated and inserted per transaction (default: {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument("--publisher", help="Publisher (name or ID) of rows without one.")
+        parser.add_argument("--journalist", help="Journalist (username or ID) of rows without one.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        journalist_id = self.resolve(
+            options["journalist"], CustomUser.objects.filter(role="journalist"),
+            "username", "journalist",
+        )
+        publisher_id = self.resolve(
+            options["publisher"], Publisher.objects.all(), "name", "publisher",
+        )
+
+        started = time.monotonic()
+        created = rejected = 0
+        for path in options["paths"]:
+            done = created + rejected
+            format = options["format"] or ("csv" if path.lower().endswith(".csv") else "ndjson")
+            stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+            try:
+                result = import_articles(
+                    read_rows(stream, format),
+                    batch_size=options["batch_size"],
+                    journalist_id=journalist_id,
+                    publisher_id=publisher_id,
+                    dry_run=options["dry_run"],
+                    progress=lambda result: self.progress(path, result, started, done),
+                )
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+
+            for number, error in result.rejected[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(f"{path}:{number}: {error}")
+            if len(result.rejected) > MAX_REPORTED_ERRORS:
+                more = len(result.rejected) - MAX_REPORTED_ERRORS
+                self.stderr.write(f"{path}: ... and {more} more rejected rows.")
+            created, rejected = created + result.created, rejected + len(result.rejected)
+
+        elapsed = time.monotonic() - started
+        rows = created + rejected
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {created} articles, rejected {rejected}, in {elapsed:.1f}s{rate}."
+        ))
+
+    def resolve(self, value, queryset, field, label):
+        """Return the ID of the default ``label`` given by name or ID, or None."""
+        if not value:
+            return None
+        if value.isdigit() and queryset.filter(pk=int(value)).exists():
+            return int(value)
+        try:
+            return CachedLookup(queryset, field, label).get(value)
+        except ValueError as exc:
+            raise CommandError(exc)
+
+    def progress(self, path, result, started, earlier):
+        """Report the rows handled so far and the overall throughput."""
+        elapsed = time.monotonic() - started
+        rows = earlier + result.processed
+        rate = f", {rows / elapsed:,.0f} rows/s" if elapsed else ""
+        self.stdout.write(
+            f"{path}: {result.created} imported, {len(result.rejected)} rejected{rate}"
+        )
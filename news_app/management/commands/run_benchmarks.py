@@ -0,0 +1,306 @@
+"""
+run_benchmarks.py
+
+Management command that times the main pages and API endpoints against the
+current database, typically one filled by ``generate_dataset``.
+
+Each scenario is requested through Django's test client (the full
+middleware, view and template stack, without a network hop) a number of
+times. The command reports per scenario the latency percentiles, the SQL
+queries per request and the response size, and writes everything, with the
+dataset size and environment, as JSON so runs can be compared. Requests that
+change data run inside a transaction that is rolled back.
+
+Scenarios:
+- article_list / article_list_deep: Public API feed, first page and 50 pages in.
+- publisher_feed: API feed of the largest publisher.
+- dashboard_<role>: The dashboard of a user in each role.
+- drafts_api: A journalist's drafts through the API.
+- search / search_two_terms: Search API for the most common indexed term,
+  and for the two most common together.
+- approve / publish: An editor approving and publishing an article.
+
+Usage:
+    python manage.py run_benchmarks --iterations 20 --output bench.json
+    python manage.py run_benchmarks --scenarios article_list publisher_feed --cold
+    python manage.py run_benchmarks --compare previous.json
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from news_app.models import Article, CustomUser, Publisher, SearchTerm
+from news_app.pagination import FEED_ORDERING, KeysetPaginator
+
+DEEP_PAGES = 50
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Scenario:
+    """
+    One benchmarked request.
+
+    Args:
+        name (str): Scenario name used in the results.
+        method (str): "get" or "post".
+        url (str): URL to request.
+        user (CustomUser | None): User to log in as.
+        mutates (bool): Roll back each request's changes.
+    """
+
+    def __init__(self, name, method, url, user=None, mutates=False):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.user = user
+        self.mutates = mutates
+
+
+class Command(BaseCommand):
+    """
+    Time the article feeds, dashboards, drafts API, search and moderation flows.
+    """
+
+    help = "Benchmark the main views against the current database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=20,
+            help="Timed requests per scenario (default: 20).",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2,
+            help="Untimed requests per scenario first (default: 2).",
+        )
+        parser.add_argument("--scenarios", nargs="+", help="Only run these scenarios.")
+        parser.add_argument(
+            "--cold", action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument(
+            "--host", default="localhost",
+            help="Host header to send (default: localhost).",
+        )
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="Show changes against a previous results file.")
+
+    def handle(self, *args, **options):
+        scenarios = self.build_scenarios()
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(
+                    f"Unknown or unavailable scenario(s): {', '.join(sorted(unknown))}"
+                )
+            scenarios = [s for s in scenarios if s.name in options["scenarios"]]
+
+        client = Client(HTTP_HOST=options["host"])
+        results = {
+            "timestamp": timezone.now().isoformat(),
+            "revision": _git_revision(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "dataset": self.dataset_size(),
+            "options": {key: options[key] for key in ("iterations", "warmup", "cold")},
+            "scenarios": {},
+        }
+        for scenario in scenarios:
+            result = self.run_scenario(client, scenario, options)
+            results["scenarios"][scenario.name] = result
+            self.stdout.write(
+                f"{scenario.name:<24} p50 {result['p50_ms']:>8.1f} ms  "
+                f"p95 {result['p95_ms']:>8.1f} ms  "
+                f"{result['queries']:>4} queries  {result['bytes']:>8} bytes"
+            )
+
+        if options["compare"]:
+            self.compare(results, options["compare"])
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    # -----------------------
+    # Scenarios
+    # -----------------------
+    def dataset_size(self):
+        return {
+            "users": CustomUser.objects.count(),
+            "publishers": Publisher.objects.count(),
+            "articles": Article.objects.count(),
+            "public_articles": Article.objects.filter(approved=True, published=True).count(),
+        }
+
+    def build_scenarios(self):
+        """Pick users and articles from the database for every scenario it supports."""
+        scenarios = [Scenario("article_list", "get", reverse("news_api:api_articles"))]
+
+        deep_cursor = self.deep_cursor()
+        if deep_cursor:
+            scenarios.append(Scenario(
+                "article_list_deep", "get",
+                f"{reverse('news_api:api_articles')}?{urlencode({'cursor': deep_cursor})}",
+            ))
+
+        largest = (
+            Article.objects.filter(approved=True, published=True, publisher__isnull=False)
+            .values("publisher").annotate(total=Count("id")).order_by("-total").first()
+        )
+        if largest:
+            scenarios.append(Scenario(
+                "publisher_feed", "get",
+                reverse("news_api:api_publisher_articles", args=[largest["publisher"]]),
+            ))
+
+        dashboard = reverse("news_app:dashboard")
+        for role in ("reader", "journalist", "editor", "publisher"):
+            user = self.user_for(role)
+            if user:
+                scenarios.append(Scenario(f"dashboard_{role}", "get", dashboard, user))
+
+        journalist = self.user_for("journalist")
+        if journalist:
+            scenarios.append(
+                Scenario("drafts_api", "get", reverse("news_api:api_drafts"), journalist)
+            )
+
+        # The most common terms have the most postings to rank
+        terms = list(
+            SearchTerm.objects.filter(document_count__gt=0)
+            .order_by("-document_count", "id").values_list("term", flat=True)[:2]
+        )
+        search = reverse("news_api:api_article_search")
+        for name, count in (("search", 1), ("search_two_terms", 2)):
+            if len(terms) >= count:
+                query = urlencode({"q": " ".join(terms[:count])})
+                scenarios.append(Scenario(name, "get", f"{search}?{query}"))
+
+        for name, pending, view in (
+            ("approve", {"approved": False}, "news_app:article_approve"),
+            ("publish", {"approved": True, "published": False}, "news_app:article_publish"),
+        ):
+            article = (
+                Article.objects.filter(publisher__members__role="editor", **pending)
+                .values("id", "publisher__members__id").order_by("id").first()
+            )
+            if article:
+                editor = CustomUser.objects.get(pk=article["publisher__members__id"])
+                url = reverse(view, args=[article["id"]])
+                scenarios.append(Scenario(name, "post", url, editor, True))
+        return scenarios
+
+    def user_for(self, role):
+        """Return the user of ``role`` with the most articles to list."""
+        users = CustomUser.objects.filter(role=role)
+        if role == "journalist":
+            return users.annotate(total=Count("articles")).order_by("-total", "id").first()
+        if role in ("editor", "publisher"):
+            users = users.filter(publishers__isnull=False)
+        return users.order_by("id").first()
+
+    def deep_cursor(self):
+        """Return the cursor of the public feed page DEEP_PAGES pages in, if it exists."""
+        paginator = KeysetPaginator()
+        offset = paginator.page_size * DEEP_PAGES
+        boundary = (
+            Article.objects.filter(approved=True, published=True)
+            .order_by(*FEED_ORDERING).only("id", "published_at")[offset - 1: offset].first()
+        )
+        return paginator.encode_cursor(boundary) if boundary else None
+
+    # -----------------------
+    # Running and reporting
+    # -----------------------
+    def request(self, client, scenario, cold):
+        if cold:
+            cache.clear()
+        if not scenario.mutates:
+            return getattr(client, scenario.method)(scenario.url)
+        with transaction.atomic():
+            response = getattr(client, scenario.method)(scenario.url)
+            transaction.set_rollback(True)
+        return response
+
+    def run_scenario(self, client, scenario, options):
+        """
+        Request ``scenario`` ``--warmup`` times untimed, then ``--iterations``
+        times timed.
+
+        Returns:
+            dict: Status, latency percentiles in ms, median queries and size.
+        """
+        client.logout()
+        if scenario.user is not None:
+            client.force_login(scenario.user)
+        for _ in range(options["warmup"]):
+            self.request(client, scenario, options["cold"])
+
+        latencies, queries = [], []
+        for _ in range(max(options["iterations"], 1)):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.request(client, scenario, options["cold"])
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        latencies.sort()
+        return {
+            "url": scenario.url,
+            "status": response.status_code,
+            "iterations": len(latencies),
+            "min_ms": round(latencies[0], 2),
+            "p50_ms": round(_percentile(latencies, 0.50), 2),
+            "p95_ms": round(_percentile(latencies, 0.95), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "queries": int(statistics.median(queries)),
+            "bytes": len(response.content),
+        }
+
+    def compare(self, results, path):
+        """Print each scenario's p50 and query count change against ``path``."""
+        with open(path) as handle:
+            previous = json.load(handle)["scenarios"]
+        self.stdout.write(f"\nCompared with {path}:")
+        for name, result in results["scenarios"].items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            change = 0
+            if before["p50_ms"]:
+                change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+            self.stdout.write(
+                f"{name:<24} p50 {before['p50_ms']:.1f} -> {result['p50_ms']:.1f} ms "
+                f"({change:+.0f}%)  queries {before['queries']} -> {result['queries']}"
+            )
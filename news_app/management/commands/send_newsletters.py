@@ -0,0 +1,110 @@
+"""
+send_newsletters.py
+
+Management command that delivers newsletters to their journalist's followers.
+
+Without arguments every newsletter not completely sent yet is sent (or
+resumed where an earlier run stopped); with newsletter IDs only those are.
+See news_app/newsletters.py for how delivery works.
+
+Usage:
+    python manage.py send_newsletters                    # send everything unsent, then exit
+    python manage.py send_newsletters 12 --retry-failed  # resend newsletter 12's failures
+    python manage.py send_newsletters --loop             # keep polling as a worker
+
+With ``--loop`` an error (e.g. the mail server being down) is logged and
+the worker backs off, doubling its sleep up to MAX_BACKOFF seconds, instead
+of exiting; the unfinished newsletter is resumed on the next poll.
+"""
+
+import time
+import traceback
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news_app.models import Newsletter
+from news_app.newsletters import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_CONCURRENCY, send_newsletter, send_pending_newsletters,
+)
+
+# Longest sleep after repeated errors in --loop mode, in seconds
+MAX_BACKOFF = 300.0
+
+
+class Command(BaseCommand):
+    """
+    Send newsletters in chunks over a pool of mail connections.
+    """
+
+    help = "Send newsletters to the followers of their journalists."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "newsletter_ids", nargs="*", type=int, help="Only send these newsletters.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f"Recipients recorded and sent per chunk (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+            help=f"Mail connections and sending threads (default: {DEFAULT_CONCURRENCY}).",
+        )
+        parser.add_argument(
+            "--retry-failed", action="store_true",
+            help="Also resend deliveries that failed in an earlier run.",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep running and poll for new newsletters.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Seconds to sleep between polls (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        send_options = {
+            "chunk_size": options["chunk_size"],
+            "concurrency": options["concurrency"],
+            "retry_failed": options["retry_failed"],
+        }
+        started = time.monotonic()
+
+        if options["newsletter_ids"]:
+            newsletters = Newsletter.objects.filter(pk__in=options["newsletter_ids"]).order_by("id")
+            missing = set(options["newsletter_ids"]) - {newsletter.pk for newsletter in newsletters}
+            if missing:
+                raise CommandError(f"Unknown newsletter(s): {', '.join(map(str, sorted(missing)))}")
+            total_sent = total_failed = 0
+            for newsletter in newsletters:
+                sent, failed = send_newsletter(newsletter, **send_options)
+                self.stdout.write(f"{newsletter.title}: sent {sent}, failed {failed}.")
+                total_sent, total_failed = total_sent + sent, total_failed + failed
+        else:
+            total_sent = total_failed = 0
+            delay = options["interval"]
+            while True:
+                try:
+                    sent, failed = send_pending_newsletters(**send_options)
+                except Exception:
+                    if not options["loop"]:
+                        raise
+                    self.stderr.write(traceback.format_exc())
+                    self.stderr.write(f"Sending failed; retrying in {delay:.0f}s.")
+                    time.sleep(delay)
+                    delay = min(max(delay * 2, 1.0), MAX_BACKOFF)
+                    continue
+                delay = options["interval"]
+                total_sent, total_failed = total_sent + sent, total_failed + failed
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}.")
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+
+        elapsed = time.monotonic() - started
+        rate = f" ({total_sent / elapsed:,.0f} emails/s)" if total_sent and elapsed else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {total_sent} sent, {total_failed} failed in {elapsed:.1f}s{rate}."
+        ))
@@ -0,0 +1,92 @@
+"""
+send_notifications.py
+
+Management command that drains the notification outbox.
+
+Each pass first expands pending publish fan-outs into outbox rows, at most
+``--max-chunks`` chunks of them, then sends one batch of due notifications,
+so a large fan-out backlog never holds up the outbox. Passes follow each
+other without sleeping while either has work left.
+
+Usage:
+    python manage.py send_notifications            # send everything due, then exit
+    python manage.py send_notifications --loop     # keep polling as a worker
+"""
+
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from news_app.fanout import DEFAULT_CHUNK_SIZE, has_pending_jobs, run_pending_jobs
+from news_app.notifications import DEFAULT_MAX_ATTEMPTS, deliver_pending
+
+# Fan-out chunks between two outbox batches
+DEFAULT_MAX_CHUNKS = 20
+
+
+class Command(BaseCommand):
+    """
+    Deliver pending Notification rows in batches over one reused mail connection.
+    """
+
+    help = "Send pending email notifications from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Notifications sent per batch (default: 100).",
+        )
+        parser.add_argument(
+            "--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+            help=(
+                f"Attempts before a notification is marked failed "
+                f"(default: {DEFAULT_MAX_ATTEMPTS})."
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f"Subscribers enqueued per fan-out chunk (default: {DEFAULT_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--max-chunks", type=int, default=DEFAULT_MAX_CHUNKS,
+            help=f"Fan-out chunks run per pass (default: {DEFAULT_MAX_CHUNKS}).",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep running and poll for new notifications.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Seconds to sleep between polls when the outbox is empty (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total_sent = total_failed = 0
+
+        while True:
+            fanned_out = run_pending_jobs(
+                chunk_size=options["chunk_size"], max_chunks=options["max_chunks"],
+            )
+            if fanned_out:
+                self.stdout.write(f"Queued {fanned_out} subscriber notifications.")
+            sent, failed = deliver_pending(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+                connection=connection,
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+                continue
+            if has_pending_jobs():
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {total_sent} sent, {total_failed} failed."
+        ))
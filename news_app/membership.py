@@ -0,0 +1,91 @@
+"""
+membership.py
+
+Cached lookups of the publishers a user belongs to, for permission checks.
+
+A user's publisher IDs are read once from the membership table and then kept
+at two levels: on the user instance for the rest of the request, and in the
+cache across requests. The membership signal receivers (see signals.py)
+invalidate a user's entry whenever Publisher.members changes, so on the hot
+path a permission check costs no queries at all. Lookups always read the
+primary database: a lagging replica must never be able to cache a
+membership that was just revoked.
+
+The cross-request level is only used when ``NEWS_CACHE_SHARED`` says every
+process shares the cache (Redis). With a per-process cache an invalidation
+would reach one process only, and the others would keep granting revoked
+rights until the entry expired, so there lookups are cached per request.
+
+- member_publisher_ids: IDs of the publishers a user belongs to.
+- is_member: Whether a user belongs to a publisher.
+- invalidate_memberships: Drop the cached memberships of some users.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Publisher
+
+# Per-request copy, kept on the user instance (request.user)
+_ATTRIBUTE = "_news_publisher_ids"
+
+
+def _key(user_id):
+    return f"news_app:membership:{user_id}"
+
+
+def member_publisher_ids(user):
+    """
+    Return the IDs of the publishers ``user`` is a member of.
+
+    Args:
+        user (CustomUser | AnonymousUser): The user to look up.
+
+    Returns:
+        frozenset[int]: Publisher IDs; empty for anonymous users.
+    """
+    if user.pk is None:
+        return frozenset()
+    ids = getattr(user, _ATTRIBUTE, None)
+    if ids is None:
+        shared = getattr(settings, "NEWS_CACHE_SHARED", False)
+        ids = cache.get(_key(user.pk)) if shared else None
+        if ids is None:
+            ids = frozenset(
+                Publisher.members.through.objects.using(DEFAULT_DB_ALIAS)
+                .filter(customuser_id=user.pk)
+                .values_list("publisher_id", flat=True)
+            )
+            if shared:
+                cache.set(
+                    _key(user.pk), ids,
+                    timeout=getattr(settings, "NEWS_MEMBERSHIP_CACHE_TIMEOUT", 3600),
+                )
+        setattr(user, _ATTRIBUTE, ids)
+    return ids
+
+
+def is_member(user, publisher_id):
+    """Return whether ``user`` is a member of the publisher ``publisher_id``."""
+    return publisher_id in member_publisher_ids(user)
+
+
+def invalidate_memberships(user_ids, instance=None):
+    """
+    Drop the cached memberships of ``user_ids``.
+
+    The entries are dropped now and again once the surrounding transaction
+    commits, so a lookup made in between cannot cache the old memberships.
+
+    Args:
+        user_ids (Iterable[int]): Users whose memberships changed.
+        instance (CustomUser | None): A user instance whose per-request copy
+            should be dropped as well.
+    """
+    if instance is not None and hasattr(instance, _ATTRIBUTE):
+        delattr(instance, _ATTRIBUTE)
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,243 @@
+"""
+middleware.py
+
+Request instrumentation middleware for the News App.
+
+- DatabaseConnectionStatsMiddleware: Counts database connections opened
+  while handling each request.
+- ReplicaRoutingMiddleware: Scopes replica routing to a request and keeps a
+  user's reads on the primary right after they write.
+- RequestProfilingMiddleware: Times each request's SQL, templates and
+  serializers, and samples requests for cProfile.
+
+All are sync and async capable, so async views served under ASGI are not
+forced through a thread.
+"""
+
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .profiling import install_query_recorder, profile_request
+from .routers import STICKY_COOKIE, routing_state
+
+logger = logging.getLogger("news_app.db")
+profile_logger = logging.getLogger("news_app.profiling")
+
+_opened = ContextVar("news_app_connections_opened", default=None)
+
+
+def _count_connection(sender, connection, **kwargs):
+    counter = _opened.get()
+    if counter is not None:
+        counter[connection.alias] = counter.get(connection.alias, 0) + 1
+
+
+class DatabaseConnectionStatsMiddleware:
+    """
+    Report how many database connections each request had to open.
+
+    With persistent connections (CONN_MAX_AGE) this should be 0 for almost
+    every request; a steady 1 means connections are not being reused. The
+    count is sent as an ``X-DB-Connections-Opened`` response header and
+    logged to the ``news_app.db`` logger at DEBUG level, with a per-alias
+    breakdown when more than one database is used.
+
+    Enabled by ``settings.NEWS_DB_CONNECTION_STATS``.
+    """
+
+    header = "X-DB-Connections-Opened"
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "NEWS_DB_CONNECTION_STATS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(
+            _count_connection, dispatch_uid="news_app_count_db_connections"
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = {}
+        token = _opened.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            _opened.reset(token)
+        return self._report(request, response, counter)
+
+    async def __acall__(self, request):
+        counter = {}
+        token = _opened.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _opened.reset(token)
+        return self._report(request, response, counter)
+
+    def _report(self, request, response, counter):
+        opened = sum(counter.values())
+        response[self.header] = str(opened)
+        logger.debug(
+            "%s %s opened %d database connection(s) %s",
+            request.method, request.path, opened, counter or "",
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Give each request its own database routing state (see routers.py).
+
+    Requests carrying the sticky cookie read from the primary. Any request
+    with an unsafe method sets that cookie for
+    ``settings.NEWS_REPLICA_STICKY_SECONDS``, long enough for the replicas
+    to catch up with what the user just wrote.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS", "TRACE")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_state(pinned=STICKY_COOKIE in request.COOKIES):
+            response = self.get_response(request)
+        return self._stick(request, response)
+
+    async def __acall__(self, request):
+        with routing_state(pinned=STICKY_COOKIE in request.COOKIES):
+            response = await self.get_response(request)
+        return self._stick(request, response)
+
+    def _stick(self, request, response):
+        if request.method not in self.safe_methods:
+            response.set_cookie(
+                STICKY_COOKIE, "1",
+                max_age=getattr(settings, "NEWS_REPLICA_STICKY_SECONDS", 10),
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Measure where each request's time goes.
+
+    Records the wall time, the number of SQL queries and the time spent in
+    them, template rendering and DRF serialization (see profiling.py), and
+    reports them:
+
+    - as a ``Server-Timing`` header, shown by browser developer tools;
+    - as one structured line on the ``news_app.profiling`` logger, with the
+      values also attached to the log record as ``profile``;
+    - for a random ``settings.NEWS_PROFILING_SAMPLE_RATE`` fraction of sync
+      requests, as a cProfile dump in ``settings.NEWS_PROFILING_DIR``
+      (open with ``python -m pstats`` or snakeviz).
+
+    Only one request per process is run under cProfile at a time; others
+    selected meanwhile are skipped. Enabled by ``settings.NEWS_PROFILING``.
+    """
+
+    sync_capable = True
+    async_capable = True
+    metrics = ("db", "template", "serialize")
+
+    def __init__(self, get_response):
+        if not getattr(settings, "NEWS_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, "NEWS_PROFILING_SAMPLE_RATE", 0.0)
+        self.profile_dir = getattr(settings, "NEWS_PROFILING_DIR", "profiles")
+        self._profiler_lock = threading.Lock()
+        connection_created.connect(
+            install_query_recorder, dispatch_uid="news_app_profile_queries"
+        )
+
+    def _install_recorders(self):
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._install_recorders()
+        sampled = random.random() < self.sample_rate and self._profiler_lock.acquire(blocking=False)
+        with profile_request() as profile:
+            started = time.perf_counter()
+            if not sampled:
+                response = self.get_response(request)
+            else:
+                profiler = cProfile.Profile()
+                try:
+                    response = profiler.runcall(self.get_response, request)
+                finally:
+                    self._profiler_lock.release()
+            elapsed = time.perf_counter() - started
+        dump = self._dump(profiler, request, elapsed) if sampled else None
+        return self._report(request, response, profile, elapsed, dump)
+
+    async def __acall__(self, request):
+        self._install_recorders()
+        with profile_request() as profile:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            elapsed = time.perf_counter() - started
+        return self._report(request, response, profile, elapsed, None)
+
+    def _dump(self, profiler, request, elapsed):
+        """Write ``profiler``'s stats to the profile directory and return the path."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{slug[:80]}"
+            f"-{elapsed * 1000:.0f}ms.prof"
+        )
+        path = os.path.join(self.profile_dir, name)
+        profiler.dump_stats(path)
+        return path
+
+    def _report(self, request, response, profile, elapsed, dump):
+        timings = {"total": elapsed, **{metric: profile.timings[metric] for metric in self.metrics}}
+        response["Server-Timing"] = ", ".join(
+            f'{metric};dur={seconds * 1000:.1f}'
+            + (f';desc="{profile.queries} queries"' if metric == "db" else "")
+            for metric, seconds in timings.items()
+        )
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": profile.queries,
+            **{f"{metric}_ms": round(seconds * 1000, 1) for metric, seconds in timings.items()},
+            "cprofile": dump,
+        }
+        profile_logger.info(
+            " ".join(f"{key}={value}" for key, value in record.items() if value is not None),
+            extra={"profile": record},
+        )
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('approved', True), ('published', True)), fields=['published_at', 'id'], name='article_public_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('approved', True), ('published', True)), fields=['publisher', 'published_at', 'id'], name='article_publisher_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('published', False)), fields=['journalist', 'published', 'created_at'], name='article_journalist_draft_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('approved', False)), fields=['approved', 'created_at'], name='article_pending_idx'),
+        ),
+    ]
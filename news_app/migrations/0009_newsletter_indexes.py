@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0008_newsletter_delivery'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['created_at', 'id'], name='newsletter_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['journalist', 'created_at', 'id'], name='newsletter_archive_idx'),
+        ),
+    ]
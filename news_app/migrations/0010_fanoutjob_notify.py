@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:40
+
+from django.db import migrations, models
+
+
+def queue_backfill_jobs(apps, schema_editor):
+    # Articles published before fan-out existed get timeline-only jobs, so
+    # reader feeds never have to search for articles without one
+    Article = apps.get_model("news_app", "Article")
+    FanoutJob = apps.get_model("news_app", "FanoutJob")
+    ids = (
+        Article.objects.filter(approved=True, published=True, fanout_job__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    last_id = 0
+    while batch := list(ids.filter(id__gt=last_id)[:1000]):
+        FanoutJob.objects.bulk_create([FanoutJob(article_id=pk, notify=False) for pk in batch])
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0009_newsletter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fanoutjob',
+            name='notify',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(queue_backfill_jobs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='fanoutjob',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['completed_at'], name='fanout_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fanoutjob',
+            index=models.Index(condition=models.Q(('materialize_timeline', False)), fields=['materialize_timeline'], name='fanout_unmaterialized_idx'),
+        ),
+    ]
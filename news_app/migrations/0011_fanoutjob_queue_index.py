@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0010_fanoutjob_notify'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fanoutjob',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['notify', 'id'], name='fanout_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0011_fanoutjob_queue_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='searchposting',
+            index=models.Index(fields=['term', '-weight', '-article'], name='search_posting_impact_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 06:18
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0012_searchposting_impact_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='article',
+            options={'permissions': [('export_article', 'Can export the article archive')]},
+        ),
+    ]
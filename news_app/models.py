@@ -8,6 +8,11 @@ Models:
 - Publisher: Represents a publishing organization with members
 - Article: Represents articles written by journalists and managed by editors/publishers
 - Newsletter: Represents newsletters sent by journalists to readers
+- NewsletterDelivery: Delivery state of a newsletter to one recipient
+- Notification: Outbox of emails waiting to be delivered by the notification worker
+- FanoutJob: Progress of delivering a published article to its subscribers
+- TimelineEntry: Materialized per-reader feed row written by the fan-out
+- SearchTerm / SearchPosting: Inverted index used by article search
 """
 
 from django.db import models
@@ -70,8 +75,13 @@ class Publisher(models.Model):
         return self.members.filter(role="journalist")
 
     def has_member(self, user):
-        """Check if a user is part of this publisher (editor or journalist)."""
-        return self.members.filter(id=user.id).exists()
+        """
+        Check if a user is part of this publisher (editor or journalist).
+        Served from the membership cache (see membership.py).
+        """
+        from .membership import is_member
+
+        return is_member(user, self.pk)
 
     def __str__(self):
         return self.name
@@ -107,6 +117,46 @@ class Article(models.Model):
     is_draft = models.BooleanField(default=True)
     published_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Bumped on every save; bulk .update() calls must set it themselves.
+    # Drives Last-Modified / ETag on the article endpoints.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Every index is partial on the article state its query reads. MySQL
+        # has no partial indexes and builds the plain composite instead
+        # (models.W037 is silenced in settings), so the column lists are
+        # chosen to work either way: the public feeds are the bulk of the
+        # table and walk the sort key directly, while the small draft and
+        # pending slices lead with their state flag.
+        permissions = [
+            ("export_article", "Can export the article archive"),
+        ]
+        indexes = [
+            # Public feed: approved + published, newest first (keyset pagination)
+            models.Index(
+                fields=["published_at", "id"],
+                name="article_public_feed_idx",
+                condition=models.Q(approved=True, published=True),
+            ),
+            # Per-publisher public feed
+            models.Index(
+                fields=["publisher", "published_at", "id"],
+                name="article_publisher_feed_idx",
+                condition=models.Q(approved=True, published=True),
+            ),
+            # Journalist's unpublished drafts
+            models.Index(
+                fields=["journalist", "published", "created_at"],
+                name="article_journalist_draft_idx",
+                condition=models.Q(published=False),
+            ),
+            # Editor pending queue: unapproved articles, oldest first
+            models.Index(
+                fields=["approved", "created_at"],
+                name="article_pending_idx",
+                condition=models.Q(approved=False),
+            ),
+        ]
 
     def can_publish(self, user):
         """
@@ -115,13 +165,11 @@ class Article(models.Model):
         Publishers can always publish articles under their organization.
         Independent journalists can publish their own articles.
         """
-        if self.publisher:
-            return (
-                user.role == "publisher" and self.publisher.has_member(user)
-            ) or (
-                user.role == "editor" and self.publisher.has_member(user)
-            )
-        return user == self.journalist and user.role == "journalist"
+        from .membership import is_member
+
+        if self.publisher_id:
+            return user.role in ("publisher", "editor") and is_member(user, self.publisher_id)
+        return user.pk == self.journalist_id and user.role == "journalist"
 
     def __str__(self):
         return self.title
@@ -144,5 +192,264 @@ class Newsletter(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
 
+    # Delivery progress (see newsletters.py): followers are sent to in
+    # ascending user ID order, and ``last_recipient_id`` is the last one
+    # whose chunk has been recorded, so an interrupted send resumes there.
+    last_recipient_id = models.BigIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Newsletter list and per-journalist archives, newest first (keyset pagination)
+            models.Index(fields=["created_at", "id"], name="newsletter_list_idx"),
+            models.Index(fields=["journalist", "created_at", "id"], name="newsletter_archive_idx"),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class NewsletterDelivery(models.Model):
+    """
+    Delivery of a newsletter to one of its journalist's followers.
+
+    Rows are written as the recipients are reached and updated once their
+    email has been handed to the mail server, so resuming a send skips
+    everyone already sent to.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    newsletter = models.ForeignKey(
+        Newsletter,
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="newsletter_deliveries",
+    )
+    email = models.EmailField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["newsletter", "recipient"], name="newsletter_delivery_unique"
+            ),
+        ]
+        indexes = [
+            # Failed deliveries of a newsletter, for retries
+            models.Index(fields=["newsletter", "status"], name="newsletter_delivery_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.newsletter_id} -> {self.email} ({self.status})"
+
+
+class Notification(models.Model):
+    """
+    Outbox entry for an email notification.
+
+    Rows are written in the same transaction as the change that triggers them
+    and delivered later in batches by the ``send_notifications`` command.
+    ``dedupe_key`` is unique, so enqueueing the same event twice is a no-op.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    EVENT_ARTICLE_APPROVED = "article_approved"
+    EVENT_ARTICLE_PUBLISHED = "article_published"
+    EVENT_CHOICES = [
+        (EVENT_ARTICLE_APPROVED, "Article approved"),
+        (EVENT_ARTICLE_PUBLISHED, "Article published"),
+    ]
+
+    event = models.CharField(max_length=50, choices=EVENT_CHOICES)
+    dedupe_key = models.CharField(max_length=255, unique=True)
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        null=True,
+        blank=True,
+    )
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker queue: pending rows that are due, oldest first
+            models.Index(fields=["status", "next_attempt_at"], name="notification_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} -> {self.recipient} ({self.status})"
+
+
+class FanoutJob(models.Model):
+    """
+    Fan-out of a published article to its publisher's subscribers and its
+    journalist's followers.
+
+    Subscribers are processed in ascending user ID order and ``last_user_id``
+    records how far the job got, so an interrupted fan-out resumes where it
+    stopped instead of starting over.
+    """
+
+    article = models.OneToOneField(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="fanout_job",
+    )
+    last_user_id = models.BigIntegerField(default=0)
+    # False when the audience was too large to copy the article into every
+    # reader's timeline; reader feeds then pick it up at read time instead.
+    materialize_timeline = models.BooleanField(default=True)
+    # False for articles written in bulk (backfilled, generated or imported):
+    # their timelines are filled in without emailing anyone.
+    notify = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Partial like Article's; plain indexes on MySQL. The pending and
+        # unmaterialized slices are small, and reader feeds read their union
+        # (timeline.py).
+        indexes = [
+            # Unfinished jobs: the worker's queue
+            models.Index(
+                fields=["completed_at"],
+                name="fanout_pending_idx",
+                condition=models.Q(completed_at__isnull=True),
+            ),
+            # The worker's queue in run order: notifying jobs before a
+            # silent backfill, each by ID
+            models.Index(
+                fields=["notify", "id"],
+                name="fanout_queue_idx",
+                condition=models.Q(completed_at__isnull=True),
+            ),
+            # Articles too widely followed to copy into timelines
+            models.Index(
+                fields=["materialize_timeline"],
+                name="fanout_unmaterialized_idx",
+                condition=models.Q(materialize_timeline=False),
+            ),
+        ]
+
+    def __str__(self):
+        state = "done" if self.completed_at else f"after user {self.last_user_id}"
+        return f"Fan-out of {self.article_id} ({state})"
+
+
+class TimelineEntry(models.Model):
+    """
+    A published article in one reader's personal feed.
+
+    Written by the publish fan-out for each subscriber of the article's
+    publisher and follower of its journalist. ``published_at`` is copied from
+    the article so a reader's feed is one ordered range scan of this table.
+    """
+
+    reader = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["reader", "article"], name="timeline_entry_unique"),
+        ]
+        indexes = [
+            # A reader's feed, newest first (keyset pagination)
+            models.Index(
+                fields=["reader", "published_at", "article"], name="timeline_reader_feed_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} in feed of {self.reader_id}"
+
+
+class SearchTerm(models.Model):
+    """
+    A term in the article search dictionary.
+
+    ``document_count`` is the number of indexed articles containing the term
+    and is kept up to date incrementally; search uses it to weight rare terms
+    above common ones.
+    """
+
+    term = models.CharField(max_length=64, unique=True)
+    document_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.term
+
+
+class SearchPosting(models.Model):
+    """
+    Occurrence of a SearchTerm in an article, weighted by how often it
+    appears (title occurrences count extra).
+    """
+
+    term = models.ForeignKey(
+        SearchTerm,
+        on_delete=models.CASCADE,
+        related_name="postings",
+    )
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="search_postings",
+    )
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also serves as the (term, article) lookup index for queries
+            models.UniqueConstraint(fields=["term", "article"], name="search_posting_unique"),
+        ]
+        indexes = [
+            # A term's postings heaviest first: search's candidate set
+            models.Index(fields=["term", "-weight", "-article"], name="search_posting_impact_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.term_id} in {self.article_id} ({self.weight})"
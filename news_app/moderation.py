@@ -0,0 +1,219 @@
+"""
+moderation.py
+
+Bulk moderation of articles: approve, publish or delete many at once.
+
+Each operation checks permissions against the cached memberships, applies
+its state change with one UPDATE (or one cascading DELETE) and then performs
+the side effects the per-article signals would have had, once for the whole
+batch: approval emails are queued in one INSERT, newly public articles get
+their fan-out jobs and search postings in bulk, and each affected feed cache
+is invalidated once. The number of queries therefore does not grow with the
+number of articles.
+
+Permissions mirror the single-article views, scoped to the publishers the
+user belongs to:
+
+- approve: editors, for independent articles and their publishers' articles.
+- publish: editors and publishers for their publishers' articles; the
+  journalist for their own independent articles.
+- delete: the journalist for their own articles; editors as for approve.
+
+- BulkResult: Outcome of a bulk operation, per article ID.
+- bulk_approve / bulk_publish / bulk_delete: The bulk operations.
+- BULK_ACTIONS: Maps action names to the operations.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import search
+from .cache import article_feeds, bump_generations
+from .membership import member_publisher_ids
+from .models import Article, FanoutJob
+from .notifications import approval_notification, enqueue
+from .signals import mute_article_signals
+
+MAX_BULK_IDS = 5000
+
+
+class BulkResult:
+    """
+    Outcome of a bulk operation.
+
+    Attributes:
+        updated (list[int]): Articles the operation changed.
+        unchanged (list[int]): Permitted articles already in the target state.
+        forbidden (list[int]): Articles the user may not moderate.
+        not_found (list[int]): IDs matching no article.
+    """
+
+    def __init__(self):
+        self.updated = []
+        self.unchanged = []
+        self.forbidden = []
+        self.not_found = []
+
+    def as_dict(self):
+        """Return the result as a JSON-serializable dict of sorted ID lists."""
+        return {
+            "updated": sorted(self.updated),
+            "unchanged": sorted(self.unchanged),
+            "forbidden": sorted(self.forbidden),
+            "not_found": sorted(self.not_found),
+        }
+
+
+def _can_approve(user, article, publisher_ids):
+    if user.role != "editor":
+        return False
+    return article.publisher_id is None or article.publisher_id in publisher_ids
+
+
+def _can_publish(user, article, publisher_ids):
+    if article.publisher_id is None:
+        return article.journalist_id == user.id
+    return user.role in ("editor", "publisher") and article.publisher_id in publisher_ids
+
+
+def _can_delete(user, article, publisher_ids):
+    return article.journalist_id == user.id or _can_approve(user, article, publisher_ids)
+
+
+def _feeds(articles):
+    """Return every feed the public ``articles`` appear in."""
+    feeds = set()
+    for article in articles:
+        feeds |= article_feeds(article.publisher_id, article.journalist_id)
+    return feeds
+
+
+def _load(user, article_ids, can_moderate, queryset):
+    """
+    Load the requested articles and sort them into permitted and refused.
+
+    Returns:
+        tuple[list[Article], BulkResult]: Permitted articles and a result
+        with ``forbidden`` and ``not_found`` filled in.
+    """
+    result = BulkResult()
+    article_ids = set(article_ids)
+    publisher_ids = member_publisher_ids(user)
+    articles = list(queryset.filter(pk__in=article_ids))
+
+    result.not_found = list(article_ids - {article.pk for article in articles})
+    permitted = []
+    for article in articles:
+        if can_moderate(user, article, publisher_ids):
+            permitted.append(article)
+        else:
+            result.forbidden.append(article.pk)
+    return permitted, result
+
+
+def _went_public(articles):
+    """
+    Side effects of ``articles`` entering the public feeds: queue their
+    subscriber fan-out, index them for search and invalidate their feeds.
+    """
+    if not articles:
+        return
+    FanoutJob.objects.bulk_create(
+        [FanoutJob(article=article) for article in articles], ignore_conflicts=True
+    )
+    search.index_articles(articles)
+    bump_generations(*_feeds(articles))
+
+
+def bulk_approve(user, article_ids):
+    """
+    Approve every listed article the user may approve.
+
+    Args:
+        user (CustomUser): The acting editor.
+        article_ids (Iterable[int]): Articles to approve.
+
+    Returns:
+        BulkResult: What happened to each requested ID.
+    """
+    with transaction.atomic():
+        permitted, result = _load(
+            user, article_ids, _can_approve, Article.objects.select_related("journalist")
+        )
+        changed = [article for article in permitted if not article.approved]
+        result.unchanged = [article.pk for article in permitted if article.approved]
+        if changed:
+            # The approved=False condition keeps a concurrent approval from
+            # being applied twice.
+            Article.objects.filter(pk__in=[a.pk for a in changed], approved=False).update(
+                approved=True, is_draft=False, updated_at=timezone.now()
+            )
+            for article in changed:
+                article.approved = True
+                article.is_draft = False
+            enqueue(filter(None, (approval_notification(article) for article in changed)))
+            _went_public([article for article in changed if article.published])
+        result.updated = [article.pk for article in changed]
+    return result
+
+
+def bulk_publish(user, article_ids):
+    """
+    Publish every listed article the user may publish.
+
+    Args:
+        user (CustomUser): The acting editor, publisher or journalist.
+        article_ids (Iterable[int]): Articles to publish.
+
+    Returns:
+        BulkResult: What happened to each requested ID.
+    """
+    with transaction.atomic():
+        permitted, result = _load(user, article_ids, _can_publish, Article.objects.all())
+        changed = [article for article in permitted if not article.published]
+        result.unchanged = [article.pk for article in permitted if article.published]
+        if changed:
+            published_at = timezone.now()
+            Article.objects.filter(pk__in=[a.pk for a in changed], published=False).update(
+                published=True, is_draft=False, published_at=published_at,
+                updated_at=published_at,
+            )
+            for article in changed:
+                article.published = True
+                article.is_draft = False
+                article.published_at = published_at
+            _went_public([article for article in changed if article.approved])
+        result.updated = [article.pk for article in changed]
+    return result
+
+
+def bulk_delete(user, article_ids):
+    """
+    Delete every listed article the user may delete.
+
+    Args:
+        user (CustomUser): The acting journalist or editor.
+        article_ids (Iterable[int]): Articles to delete.
+
+    Returns:
+        BulkResult: What happened to each requested ID.
+    """
+    queryset = Article.objects.only("id", "journalist_id", "publisher_id", "approved", "published")
+    with transaction.atomic():
+        permitted, result = _load(user, article_ids, _can_delete, queryset)
+        if permitted:
+            ids = [article.pk for article in permitted]
+            public = [article for article in permitted if article.approved and article.published]
+            search.remove_articles(ids)
+            with mute_article_signals():
+                Article.objects.filter(pk__in=ids).delete()
+            bump_generations(*_feeds(public))
+        result.updated = [article.pk for article in permitted]
+    return result
+
+
+BULK_ACTIONS = {
+    "approve": bulk_approve,
+    "publish": bulk_publish,
+    "delete": bulk_delete,
+}
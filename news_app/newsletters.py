@@ -0,0 +1,257 @@
+"""
+newsletters.py
+
+Delivery of newsletters to their journalist's followers.
+
+A newsletter is rendered once (subject, text and HTML bodies); each
+recipient's email only differs in its ``To`` header. Followers are read
+from the follow table in ascending user ID order, one keyset batch per
+query (``id > last_recipient_id``), so a journalist with hundreds of
+thousands of followers is never loaded at once (MySQL's client cursor
+would buffer a whole ``iterator()`` result). Each batch is a chunk:
+
+1. A NewsletterDelivery row is recorded for every recipient in the chunk.
+2. The chunk's pending deliveries are sent by a bounded pool of worker
+   threads, each holding one of a fixed set of open mail connections.
+3. The outcomes and ``Newsletter.last_recipient_id`` are saved together.
+
+An interrupted send resumes after the last recorded chunk and skips every
+delivery already marked sent; only messages in flight when the process died
+can be sent twice. Failed deliveries are kept and can be retried.
+
+- recipient_queryset: The followers a newsletter is sent to.
+- render_newsletter: Render a newsletter's email once.
+- ConnectionPool: A fixed set of open mail connections shared by threads.
+- send_newsletter: Send (or resume sending) one newsletter.
+- send_pending_newsletters: Send every newsletter not sent yet.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Newsletter, NewsletterDelivery
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+
+
+def recipient_queryset(newsletter):
+    """
+    Return the followers of ``newsletter``'s journalist who have an email address.
+
+    Args:
+        newsletter (Newsletter): The newsletter to send.
+
+    Returns:
+        QuerySet: CustomUser rows, unordered.
+    """
+    User = get_user_model()
+    follows = User.subscriptions_journalists.through.objects.filter(
+        to_customuser_id=newsletter.journalist_id
+    )
+    return User.objects.filter(id__in=follows.values("from_customuser_id")).exclude(email="")
+
+
+def render_newsletter(newsletter):
+    """
+    Render ``newsletter``'s email once for all its recipients.
+
+    Returns:
+        dict: ``subject``, ``text`` and ``html``.
+    """
+    context = {"newsletter": newsletter, "journalist": newsletter.journalist}
+    return {
+        "subject": newsletter.title,
+        "text": render_to_string("news_app/newsletter_email.txt", context),
+        "html": render_to_string("news_app/newsletter_email.html", context),
+    }
+
+
+class ConnectionPool:
+    """
+    A fixed number of mail connections, opened once and shared by the
+    sending threads. A thread holds a connection for one message at a time.
+
+    Args:
+        size (int): Number of connections.
+        factory (callable): Returns a new email backend instance.
+    """
+
+    def __init__(self, size, factory=get_connection):
+        self._idle = queue.Queue()
+        self._connections = []
+        try:
+            for _ in range(size):
+                connection = factory()
+                connection.open()
+                self._connections.append(connection)
+                self._idle.put(connection)
+        except BaseException:
+            # Don't leak the connections opened before the failure
+            self.close()
+            raise
+
+    @contextmanager
+    def connection(self):
+        """Borrow an idle connection, waiting for one if all are in use."""
+        connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+
+def _send_one(pool, rendered, email):
+    """
+    Send the rendered newsletter to ``email``.
+
+    Returns:
+        str: Empty on success, else the error.
+    """
+    with pool.connection() as connection:
+        message = EmailMultiAlternatives(
+            subject=rendered["subject"],
+            body=rendered["text"],
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=connection,
+        )
+        message.attach_alternative(rendered["html"], "text/html")
+        try:
+            message.send()
+        except Exception as exc:  # noqa: BLE001 - recorded and retried later
+            # A failed SMTP session is reopened on the next send
+            connection.close()
+            return f"{type(exc).__name__}: {exc}"
+    return ""
+
+
+def _send_deliveries(deliveries, rendered, pool, executor):
+    """
+    Send ``deliveries`` concurrently and set their outcome (unsaved).
+
+    Returns:
+        tuple[int, int]: Number sent and failed.
+    """
+    sent = failed = 0
+    errors = executor.map(lambda delivery: _send_one(pool, rendered, delivery.email), deliveries)
+    for delivery, error in zip(deliveries, errors):
+        delivery.attempts += 1
+        delivery.last_error = error
+        if error:
+            failed += 1
+            delivery.status = NewsletterDelivery.STATUS_FAILED
+        else:
+            sent += 1
+            delivery.status = NewsletterDelivery.STATUS_SENT
+            delivery.sent_at = timezone.now()
+    return sent, failed
+
+
+def _save_deliveries(deliveries):
+    NewsletterDelivery.objects.bulk_update(
+        deliveries, ["status", "attempts", "last_error", "sent_at"]
+    )
+
+
+def send_newsletter(
+    newsletter, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=DEFAULT_CONCURRENCY,
+    retry_failed=False, connection_factory=get_connection,
+):
+    """
+    Send ``newsletter`` to every follower of its journalist not yet sent to.
+
+    Once a newsletter is completely sent, calling this again only retries
+    failed deliveries (with ``retry_failed``).
+
+    Args:
+        newsletter (Newsletter): The newsletter; resumed if partly sent.
+        chunk_size (int): Recipients recorded and sent per chunk.
+        concurrency (int): Mail connections and sending threads.
+        retry_failed (bool): Also resend deliveries that failed before.
+        connection_factory (callable): Returns a new email backend instance.
+
+    Returns:
+        tuple[int, int]: Number of emails sent and failed.
+    """
+    sent = failed = 0
+    rendered = render_newsletter(newsletter)
+    pool = None
+    try:
+        pool = ConnectionPool(concurrency, connection_factory)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if retry_failed:
+                # Walked by ID rather than iterator(): the rows change as they are retried
+                retries = newsletter.deliveries.filter(
+                    status=NewsletterDelivery.STATUS_FAILED
+                ).order_by("id")
+                last_id = 0
+                while chunk := list(retries.filter(id__gt=last_id)[:chunk_size]):
+                    chunk_sent, chunk_failed = _send_deliveries(chunk, rendered, pool, executor)
+                    _save_deliveries(chunk)
+                    sent, failed = sent + chunk_sent, failed + chunk_failed
+                    last_id = chunk[-1].pk
+
+            if newsletter.sent_at is not None:
+                # Finished: followers gained since are not sent old issues
+                return sent, failed
+            recipients = recipient_queryset(newsletter).order_by("id").values_list("id", "email")
+            # Keyset batches, resuming after the last recorded chunk
+            while chunk := list(
+                recipients.filter(id__gt=newsletter.last_recipient_id)[:chunk_size]
+            ):
+                NewsletterDelivery.objects.bulk_create(
+                    [
+                        NewsletterDelivery(newsletter=newsletter, recipient_id=user_id, email=email)
+                        for user_id, email in chunk
+                    ],
+                    ignore_conflicts=True,
+                )
+                # Rows of an interrupted chunk may already be sent
+                pending = list(newsletter.deliveries.filter(
+                    recipient_id__in=[user_id for user_id, _ in chunk],
+                    status=NewsletterDelivery.STATUS_PENDING,
+                ))
+                chunk_sent, chunk_failed = _send_deliveries(pending, rendered, pool, executor)
+                with transaction.atomic():
+                    _save_deliveries(pending)
+                    newsletter.last_recipient_id = chunk[-1][0]
+                    newsletter.save(update_fields=["last_recipient_id"])
+                sent, failed = sent + chunk_sent, failed + chunk_failed
+    finally:
+        if pool is not None:
+            pool.close()
+
+    newsletter.sent_at = timezone.now()
+    newsletter.save(update_fields=["sent_at"])
+    return sent, failed
+
+
+def send_pending_newsletters(**options):
+    """
+    Send every newsletter that has not been completely sent yet, oldest first.
+
+    Args:
+        **options: Passed on to send_newsletter().
+
+    Returns:
+        tuple[int, int]: Number of emails sent and failed.
+    """
+    sent = failed = 0
+    newsletters = Newsletter.objects.filter(sent_at__isnull=True).order_by("created_at", "id")
+    for newsletter in newsletters:
+        newsletter_sent, newsletter_failed = send_newsletter(newsletter, **options)
+        sent, failed = sent + newsletter_sent, failed + newsletter_failed
+    return sent, failed
@@ -0,0 +1,173 @@
+"""
+notifications.py
+
+Outbox-based email notifications for the News App.
+
+Request handlers and signals never talk to the mail server. They enqueue
+Notification rows inside the current transaction, and the
+``send_notifications`` management command drains the outbox in batches over
+a single reused SMTP connection, retrying failures with exponential backoff.
+Each batch is claimed in a short transaction and sent after it commits.
+
+- subject_line: Shorten a subject to fit the outbox column.
+- enqueue: Add notifications to the outbox, skipping duplicates.
+- approval_notification: Build the "article approved" email to its journalist.
+- notify_article_approved: Enqueue the "article approved" email to its journalist.
+- deliver_pending: Send one batch of due notifications.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .models import Notification
+
+# Retry delays grow as BASE_RETRY_DELAY * 2 ** (attempts - 1)
+BASE_RETRY_DELAY = timedelta(minutes=1)
+DEFAULT_MAX_ATTEMPTS = 5
+# How long a claimed batch is leased to its worker before it is due again
+CLAIM_TIMEOUT = timedelta(minutes=10)
+SUBJECT_MAX_LENGTH = Notification._meta.get_field("subject").max_length
+
+
+def subject_line(text):
+    """Shorten ``text`` to fit Notification.subject, with an ellipsis."""
+    return Truncator(text).chars(SUBJECT_MAX_LENGTH)
+
+
+def enqueue(notifications):
+    """
+    Add notifications to the outbox in one INSERT.
+
+    Rows whose ``dedupe_key`` already exists are silently skipped, so callers
+    may enqueue the same event as often as they like.
+
+    Args:
+        notifications (Iterable[Notification]): Unsaved Notification instances.
+    """
+    Notification.objects.bulk_create(list(notifications), ignore_conflicts=True)
+
+
+def approval_notification(article):
+    """
+    Build the unsaved "article approved" notification for ``article``'s journalist.
+
+    Args:
+        article (Article): The approved article.
+
+    Returns:
+        Notification | None: None if the journalist has no email address.
+    """
+    journalist = article.journalist
+    if not journalist or not journalist.email:
+        return None
+    return Notification(
+        event=Notification.EVENT_ARTICLE_APPROVED,
+        dedupe_key=f"{Notification.EVENT_ARTICLE_APPROVED}:{article.pk}:{journalist.email}",
+        article=article,
+        recipient=journalist.email,
+        subject=subject_line(f"Your article '{article.title}' was approved!"),
+        body="Congratulations! Your article has been approved by an editor.",
+    )
+
+
+def notify_article_approved(article):
+    """
+    Enqueue the approval email for ``article``'s journalist, once per article.
+
+    Args:
+        article (Article): The approved article.
+    """
+    notification = approval_notification(article)
+    if notification is not None:
+        enqueue([notification])
+
+
+def _record_failure(notification, exc, max_attempts):
+    """Reschedule ``notification`` with backoff, or give up on it."""
+    notification.last_error = f"{type(exc).__name__}: {exc}"
+    if notification.attempts >= max_attempts:
+        notification.status = Notification.STATUS_FAILED
+    else:
+        delay = BASE_RETRY_DELAY * 2 ** (notification.attempts - 1)
+        notification.next_attempt_at = timezone.now() + delay
+
+
+def deliver_pending(batch_size=100, max_attempts=DEFAULT_MAX_ATTEMPTS, connection=None):
+    """
+    Send one batch of due notifications over a single mail connection.
+
+    The batch is claimed in a short transaction: rows are locked with
+    ``SKIP LOCKED`` where the database supports it, their attempt is counted
+    and they are leased for CLAIM_TIMEOUT by moving ``next_attempt_at``
+    forward. The emails are sent after that commits, so no row lock is held
+    during SMTP I/O and several workers can drain the outbox concurrently
+    without double-sending. Rows of a worker that dies mid-batch become due
+    again once the lease expires.
+
+    A failed message, or the whole batch if the connection cannot be opened,
+    is rescheduled with exponential backoff and marked failed once it has
+    been tried ``max_attempts`` times.
+
+    Args:
+        batch_size (int): Maximum number of notifications to send.
+        max_attempts (int): Attempts before a notification is given up on.
+        connection: Optional email backend instance to reuse.
+
+    Returns:
+        tuple[int, int]: Number of notifications sent and failed in this batch.
+    """
+    sent = failed = 0
+    now = timezone.now()
+    from_email = settings.DEFAULT_FROM_EMAIL
+    connection = connection or get_connection()
+    fields = ["status", "attempts", "last_error", "next_attempt_at", "sent_at"]
+
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=Notification.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+        for notification in batch:
+            notification.attempts += 1
+            notification.next_attempt_at = now + CLAIM_TIMEOUT
+        Notification.objects.bulk_update(batch, ["attempts", "next_attempt_at"])
+
+    try:
+        connection.open()
+    except Exception as exc:  # noqa: BLE001 - the mail server may be down
+        for notification in batch:
+            _record_failure(notification, exc, max_attempts)
+        Notification.objects.bulk_update(batch, fields)
+        return sent, len(batch)
+
+    try:
+        for notification in batch:
+            message = EmailMessage(
+                subject=notification.subject,
+                body=notification.body,
+                from_email=from_email,
+                to=[notification.recipient],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:  # noqa: BLE001 - any transport error is retryable
+                failed += 1
+                _record_failure(notification, exc, max_attempts)
+            else:
+                sent += 1
+                notification.status = Notification.STATUS_SENT
+                notification.sent_at = timezone.now()
+                notification.last_error = ""
+    finally:
+        connection.close()
+        Notification.objects.bulk_update(batch, fields)
+    return sent, failed
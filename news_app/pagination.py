@@ -0,0 +1,323 @@
+"""
+pagination.py
+
+Keyset (cursor) pagination for the public article feeds.
+
+Pages are addressed by an opaque cursor holding the ``(published_at, id)`` of
+the row on the page boundary, so serving any page is a single range query on
+the feed ordering no matter how deep into the archive the reader has scrolled.
+
+- InvalidCursor: Raised when a cursor cannot be decoded.
+- KeysetPage: A single page of articles plus its next/previous cursors.
+- KeysetPaginator: Slices an article queryset by cursor.
+- NewsletterPaginator: Slices a newsletter queryset by ``(created_at, id)``.
+- ArticleCursorPagination: DRF pagination class built on KeysetPaginator.
+"""
+
+import base64
+from urllib.parse import parse_qs, urlencode
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Newest first; articles without a publish date sort after all dated ones.
+FEED_ORDERING = (F("published_at").desc(nulls_last=True), F("id").desc())
+FEED_ORDERING_REVERSED = (F("published_at").asc(nulls_first=True), F("id").asc())
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor string is malformed or tampered with."""
+
+
+class KeysetPage:
+    """
+    A page of articles returned by KeysetPaginator.
+
+    Attributes:
+        object_list (list): Articles on this page, in feed order.
+        next_cursor (str | None): Cursor for the following page, if any.
+        previous_cursor (str | None): Cursor for the preceding page, if any.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate an Article queryset on ``(published_at, id)`` descending.
+
+    Args:
+        page_size (int): Number of articles per page. Defaults to
+            ``settings.NEWS_FEED_PAGE_SIZE``.
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size or getattr(settings, "NEWS_FEED_PAGE_SIZE", 20)
+
+    # -----------------------
+    # Cursor encoding
+    # -----------------------
+    @staticmethod
+    def cursor_key(article):
+        """Return the ``(published_at, pk)`` that orders ``article`` in the feed."""
+        return article.published_at, article.pk
+
+    def encode_cursor(self, article, reverse=False):
+        """Build an opaque cursor pointing just past ``article``."""
+        published_at, pk = self.cursor_key(article)
+        published_at = published_at.isoformat() if published_at else ""
+        query = urlencode({"p": published_at, "i": pk, "r": int(reverse)})
+        return base64.urlsafe_b64encode(query.encode("ascii")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor into ``(published_at, id, reverse)``.
+
+        Raises:
+            InvalidCursor: If the cursor is not one we issued.
+        """
+        try:
+            query = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
+            params = parse_qs(query, keep_blank_values=True, strict_parsing=True)
+            raw_published_at = params["p"][0]
+            pk = int(params["i"][0])
+            reverse = bool(int(params["r"][0]))
+            # Well-formed but impossible dates raise ValueError
+            published_at = parse_datetime(raw_published_at) if raw_published_at else None
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise InvalidCursor(cursor)
+
+        if raw_published_at and published_at is None:
+            raise InvalidCursor(cursor)
+        return published_at, pk, reverse
+
+    # -----------------------
+    # Range filters
+    # -----------------------
+    @staticmethod
+    def _after(published_at, pk, date_field="published_at", id_field="id"):
+        """Rows that come after the boundary in feed order."""
+        if published_at is None:
+            return Q(**{f"{date_field}__isnull": True, f"{id_field}__lt": pk})
+        return (
+            Q(**{f"{date_field}__lt": published_at})
+            | Q(**{date_field: published_at, f"{id_field}__lt": pk})
+            | Q(**{f"{date_field}__isnull": True})
+        )
+
+    @staticmethod
+    def _before(published_at, pk, date_field="published_at", id_field="id"):
+        """Rows that come before the boundary in feed order."""
+        if published_at is None:
+            return (
+                Q(**{f"{date_field}__isnull": False})
+                | Q(**{f"{date_field}__isnull": True, f"{id_field}__gt": pk})
+            )
+        return (
+            Q(**{f"{date_field}__gt": published_at})
+            | Q(**{date_field: published_at, f"{id_field}__gt": pk})
+        )
+
+    def fetch_queryset(self, queryset, boundary, reverse):
+        """
+        Return ``queryset`` filtered past ``boundary`` and ordered in the
+        direction of travel.
+        """
+        if boundary is not None:
+            condition = self._before(*boundary) if reverse else self._after(*boundary)
+            queryset = queryset.filter(condition)
+        ordering = FEED_ORDERING_REVERSED if reverse else FEED_ORDERING
+        return queryset.order_by(*ordering)
+
+    def fetch(self, queryset, boundary, reverse, limit):
+        """
+        Return up to ``limit`` rows past ``boundary`` in the direction of travel.
+
+        Subclasses may override this to read from more than one source, as
+        long as the rows come back ordered by ``(published_at, pk)`` descending
+        (ascending when ``reverse``).
+
+        Args:
+            queryset (QuerySet): Articles to page through.
+            boundary (tuple | None): ``(published_at, pk)`` of the row the
+                cursor points past, or None for the start of the feed.
+            reverse (bool): Whether to walk towards newer articles.
+            limit (int): Maximum number of rows to return.
+
+        Returns:
+            list: Articles in direction-of-travel order.
+        """
+        return list(self.fetch_queryset(queryset, boundary, reverse)[:limit])
+
+    async def afetch(self, queryset, boundary, reverse, limit):
+        """Async version of fetch(), for async views."""
+        return [row async for row in self.fetch_queryset(queryset, boundary, reverse)[:limit]]
+
+    def paginate(self, queryset, cursor=None):
+        """
+        Return the KeysetPage addressed by ``cursor`` (the first page if empty).
+
+        Only ``page_size + 1`` rows are ever fetched; the extra row tells us
+        whether another page exists in the direction of travel.
+
+        Raises:
+            InvalidCursor: If ``cursor`` cannot be decoded.
+        """
+        boundary, reverse = self._parse(cursor)
+        rows = self.fetch(queryset, boundary, reverse, self.page_size + 1)
+        return self._page(rows, boundary, reverse)
+
+    async def apaginate(self, queryset, cursor=None):
+        """Async version of paginate(), for async views."""
+        boundary, reverse = self._parse(cursor)
+        rows = await self.afetch(queryset, boundary, reverse, self.page_size + 1)
+        return self._page(rows, boundary, reverse)
+
+    def _parse(self, cursor):
+        """Return the ``(boundary, reverse)`` addressed by ``cursor``."""
+        if not cursor:
+            return None, False
+        published_at, pk, reverse = self.decode_cursor(cursor)
+        return (published_at, pk), reverse
+
+    def _page(self, rows, boundary, reverse):
+        """Build the KeysetPage from up to ``page_size + 1`` fetched rows."""
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if boundary is None:
+            next_cursor = self.encode_cursor(rows[-1]) if has_more else None
+            return KeysetPage(rows, next_cursor=next_cursor)
+        if not rows:
+            return KeysetPage(rows)
+
+        if reverse:
+            rows = rows[::-1]
+            return KeysetPage(
+                rows,
+                next_cursor=self.encode_cursor(rows[-1]),
+                previous_cursor=self.encode_cursor(rows[0], reverse=True) if has_more else None,
+            )
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_more else None,
+            previous_cursor=self.encode_cursor(rows[0], reverse=True),
+        )
+
+
+class NewsletterPaginator(KeysetPaginator):
+    """
+    Paginate a Newsletter queryset on ``(created_at, id)`` descending, for
+    the newsletter list and the per-journalist archives.
+    """
+
+    @staticmethod
+    def cursor_key(newsletter):
+        return newsletter.created_at, newsletter.pk
+
+    def fetch_queryset(self, queryset, boundary, reverse):
+        if boundary is not None:
+            condition = (
+                self._before(*boundary, date_field="created_at")
+                if reverse
+                else self._after(*boundary, date_field="created_at")
+            )
+            queryset = queryset.filter(condition)
+        if reverse:
+            return queryset.order_by("created_at", "id")
+        return queryset.order_by("-created_at", "-id")
+
+
+class ArticleCursorPagination(BasePagination):
+    """
+    DRF pagination class for the public article feeds.
+
+    Responses have the shape ``{"next": url, "previous": url, "results": [...]}``.
+    Clients may request a smaller or larger page with ``?page_size=`` up to
+    ``max_page_size``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        """Return the requested page size, clamped to ``max_page_size``."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return None
+        return min(max(size, 1), self.max_page_size)
+
+    def get_keyset_paginator(self, request, view=None):
+        """
+        Return the KeysetPaginator to use, letting the view supply its own
+        through a ``get_keyset_paginator(page_size)`` method.
+        """
+        page_size = self.get_page_size(request)
+        if view is not None and hasattr(view, "get_keyset_paginator"):
+            return view.get_keyset_paginator(page_size)
+        return KeysetPaginator(page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = self.get_keyset_paginator(request, view)
+        try:
+            self.page = paginator.paginate(
+                queryset, request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise NotFound("Invalid cursor.")
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,146 @@
+"""
+profiling.py
+
+Per-request timing instrumentation used by RequestProfilingMiddleware.
+
+While a request is being profiled, a RequestProfile is bound to its context
+and the instrumented code adds to it: every SQL query (through a database
+execute wrapper), template rendering (through ProfiledDjangoTemplates) and
+DRF serialization (through ProfiledSerializerMixin). Outside a profiled
+request each hook costs one context variable lookup.
+
+- RequestProfile: Timings collected for one request.
+- profile_request: Bind a RequestProfile to the enclosed code.
+- timed: Add the time spent in a block to the current profile.
+- install_query_recorder: Time the queries run on a database connection.
+- ProfiledDjangoTemplates: Template backend that times rendering.
+- ProfiledSerializerMixin: Times a DRF serializer's output.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template.backends.django import DjangoTemplates
+
+_current = ContextVar("news_app_request_profile", default=None)
+
+
+class RequestProfile:
+    """
+    Timings collected while handling one request.
+
+    Attributes:
+        queries (int): SQL queries executed.
+        timings (dict[str, float]): Seconds spent per metric: ``db``,
+            ``template``, ``serialize``.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.timings = defaultdict(float)
+        self._running = set()
+
+
+def current_profile():
+    """Return the RequestProfile of the request being handled, or None."""
+    return _current.get()
+
+
+@contextmanager
+def profile_request():
+    """
+    Collect timings for the enclosed code.
+
+    Yields:
+        RequestProfile: The profile being filled in.
+    """
+    token = _current.set(RequestProfile())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(metric):
+    """
+    Add the time spent in the enclosed block to ``metric`` of the current
+    profile. Nested blocks timing the same metric are only counted once.
+    """
+    profile = _current.get()
+    if profile is None or metric in profile._running:
+        yield
+        return
+    profile._running.add(metric)
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[metric] += perf_counter() - started
+        profile._running.discard(metric)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.timings["db"] += perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Make ``connection`` report its queries to the current profile.
+
+    Also usable as a ``connection_created`` receiver, so connections
+    opened later (e.g. on the threads serving async views) are covered.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class _ProfiledTemplate:
+    """Wraps a backend template to time its rendering."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return self.template.render(context, request)
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing each top-level render for the
+    request profile. Included templates count towards the page including
+    them.
+    """
+
+    def from_string(self, template_code):
+        return _ProfiledTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _ProfiledTemplate(super().get_template(template_name))
+
+
+class ProfiledSerializerMixin:
+    """
+    Times a DRF serializer's conversion of instances to primitives. With
+    ``many=True`` each row is timed by the child serializer.
+    """
+
+    def to_representation(self, instance):
+        if _current.get() is None:
+            return super().to_representation(instance)
+        with timed("serialize"):
+            return super().to_representation(instance)
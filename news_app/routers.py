@@ -0,0 +1,137 @@
+"""
+routers.py
+
+Database routing between the MySQL primary and its read replicas.
+
+Reads go to the primary unless a view has opted in with ``replica_reads``.
+Only the public, read-only views do, and even there only queries on the
+published content (articles, newsletters, publishers, the search index) are
+sent to a replica; users and sessions always come from the primary, so a
+login is never lost to replication lag.
+
+Reads are pinned back to the primary:
+
+- for the rest of a request once it has written anything, and
+- for ``settings.NEWS_REPLICA_STICKY_SECONDS`` after a user's own POST (or
+  other unsafe request), via a cookie set by ReplicaRoutingMiddleware, so
+  they always see their own changes.
+
+Replica aliases are listed in ``settings.NEWS_REPLICA_DATABASES``; with none
+configured everything uses ``default``.
+
+- PrimaryReplicaRouter: The database router.
+- replica_reads: View decorator allowing replica reads.
+- routing_state: Per-request routing state used by the middleware.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+PRIMARY = "default"
+STICKY_COOKIE = "news_primary_reads"
+
+# Content that public pages read; everything else stays on the primary
+REPLICA_MODELS = frozenset({
+    "news_app.article",
+    "news_app.newsletter",
+    "news_app.publisher",
+    "news_app.searchterm",
+    "news_app.searchposting",
+})
+
+_state = ContextVar("news_app_db_routing", default=None)
+
+
+def replicas():
+    """Return the configured replica aliases."""
+    return list(getattr(settings, "NEWS_REPLICA_DATABASES", []))
+
+
+@contextmanager
+def routing_state(pinned=False):
+    """
+    Give the enclosed code its own routing state.
+
+    Args:
+        pinned (bool): Start with reads pinned to the primary.
+
+    Yields:
+        dict: The state; ``pinned`` is set once anything is written.
+    """
+    token = _state.set({"replica": False, "pinned": pinned})
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def _replica_scope():
+    """Allow replica reads until the block exits."""
+    state = _state.get()
+    if state is None:
+        with routing_state() as state:
+            state["replica"] = True
+            yield
+        return
+    previous = state["replica"]
+    state["replica"] = True
+    try:
+        yield
+    finally:
+        state["replica"] = previous
+
+
+def replica_reads(view):
+    """
+    Allow ``view``'s content reads to be served by a replica.
+
+    Only decorate views that never write and whose output may lag the
+    primary by the replication delay. Works on sync and async views.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with _replica_scope():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with _replica_scope():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Send opted-in content reads to a random replica and everything else,
+    including every write, to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state["replica"] or state["pinned"]:
+            return PRIMARY
+        if model._meta.label_lower not in REPLICA_MODELS:
+            return PRIMARY
+        aliases = replicas()
+        return random.choice(aliases) if aliases else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Read-your-writes within the request
+            state["pinned"] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
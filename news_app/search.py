@@ -0,0 +1,329 @@
+"""
+search.py
+
+Full-text article search backed by a local inverted index.
+
+Published articles are tokenized into SearchTerm / SearchPosting rows: the
+dictionary of terms with their document counts, and one posting per
+(term, article) weighted by how often the term occurs (title occurrences
+count extra). The index is kept current from the Article signals and can be
+rebuilt with the ``build_search_index`` management command.
+
+Terms are casefolded and stripped of accents, matching how MySQL's default
+collation compares the unique term column. Queries are ranked with TF-IDF in
+a single grouped query over the postings of the query terms. Every term must
+match, including each part of a punctuated word like ``covid-19``; a term
+ending in ``*`` matches any indexed term starting with it.
+
+Only the MAX_CANDIDATES articles where the rarest query term weighs most
+are ranked. Postings are indexed by (term, weight), so those candidates are
+read off the front of the index and the work per query is bounded however
+common its terms are; results past the cap are not returned.
+
+- tokenize: Split text into index terms.
+- index_articles / index_article: Add or refresh articles in the index.
+- remove_articles / remove_article: Drop articles from the index.
+- rebuild_index: Re-index every published article from scratch.
+- search: Rank published articles against a query string.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Max, Sum, Value, When
+
+from .cache import GLOBAL_FEED, get_or_build
+from .models import Article, SearchPosting, SearchTerm
+
+TOKEN_RE = re.compile(r"\w+")
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+TITLE_WEIGHT = 3
+MAX_PREFIX_EXPANSION = 50
+MAX_CANDIDATES = 1000
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that "
+    "the this to was were will with".split()
+)
+
+
+def _fold(text):
+    """Casefold ``text`` and strip its accents ("Café" -> "cafe")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Split ``text`` into index terms, dropping stop words and terms too
+    short or too long to be useful.
+
+    Terms are casefolded and stripped of accents, as MySQL's default
+    collation compares them, so spellings it considers equal are one term.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list[str]: Terms in order of appearance, with repeats.
+    """
+    return [
+        token
+        for token in TOKEN_RE.findall(_fold(text))
+        if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH and token not in STOP_WORDS
+    ]
+
+
+def _term_weights(article):
+    """Return a Counter of term -> weight for ``article``."""
+    weights = Counter(tokenize(article.content))
+    for term in tokenize(article.title):
+        weights[term] += TITLE_WEIGHT
+    return weights
+
+
+def _term_ids(terms):
+    """Return {term: id} for ``terms``, creating missing dictionary entries."""
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(term=term) for term in terms], ignore_conflicts=True
+    )
+    ids = dict(SearchTerm.objects.filter(term__in=terms).values_list("term", "id"))
+    # A term the collation equates with another spelling (which folding did
+    # not catch) comes back under that spelling; look those up one by one
+    for term in set(terms) - set(ids):
+        ids[term] = SearchTerm.objects.filter(term=term).values_list("id", flat=True).first()
+    return ids
+
+
+def _adjust_document_counts(deltas):
+    """
+    Apply ``{term_id: delta}`` to the document counts in one UPDATE, with
+    one CASE branch per distinct delta (almost always just +1 and -1).
+    """
+    by_delta = defaultdict(list)
+    for term_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(term_id)
+    if not by_delta:
+        return
+    SearchTerm.objects.filter(id__in=[t for ids in by_delta.values() for t in ids]).update(
+        document_count=F("document_count") + Case(
+            *[When(id__in=term_ids, then=Value(delta)) for delta, term_ids in by_delta.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def _drop_postings(article_ids):
+    """
+    Delete the postings of ``article_ids``.
+
+    Returns:
+        Counter: term_id -> number of the articles that contained it.
+    """
+    postings = SearchPosting.objects.filter(article_id__in=article_ids)
+    previous = Counter(dict(
+        postings.values("term_id").annotate(total=Count("id")).values_list("term_id", "total")
+    ))
+    if previous:
+        postings.delete()
+    return previous
+
+
+def index_articles(articles):
+    """
+    (Re)index ``articles``, replacing any postings they already have.
+
+    The whole batch costs a fixed number of queries however many articles
+    it holds.
+
+    Args:
+        articles (Iterable[Article]): Published articles with title and content loaded.
+    """
+    weights = {article.pk: _term_weights(article) for article in articles}
+    if not weights:
+        return
+    with transaction.atomic():
+        previous = _drop_postings(list(weights))
+        term_ids = _term_ids(list(set().union(*weights.values())))
+        SearchPosting.objects.bulk_create([
+            SearchPosting(term_id=term_ids[term], article_id=article_id, weight=weight)
+            for article_id, counter in weights.items()
+            for term, weight in counter.items()
+        ])
+        current = Counter(term_ids[term] for counter in weights.values() for term in counter)
+        current.subtract(previous)
+        _adjust_document_counts(current)
+
+
+def index_article(article):
+    """
+    (Re)index a single published ``article``.
+    """
+    index_articles([article])
+
+
+def remove_articles(article_ids):
+    """
+    Remove the articles with ``article_ids`` from the index.
+
+    Args:
+        article_ids (Iterable[int]): Articles that are no longer public.
+    """
+    with transaction.atomic():
+        previous = _drop_postings(list(article_ids))
+        _adjust_document_counts({term_id: -total for term_id, total in previous.items()})
+
+
+def remove_article(article):
+    """
+    Remove a single ``article`` from the index.
+    """
+    remove_articles([article.pk])
+
+
+def rebuild_index(batch_size=500):
+    """
+    Drop the index and rebuild it from every published article.
+
+    Articles are streamed in primary-key batches and indexed one batch at a
+    time, so memory use is bounded by ``batch_size``.
+
+    Args:
+        batch_size (int): Articles indexed per batch.
+
+    Returns:
+        int: Number of articles indexed.
+    """
+    SearchPosting.objects.all().delete()
+    SearchTerm.objects.all().delete()
+
+    indexed = 0
+    last_id = 0
+    articles = Article.objects.filter(approved=True, published=True).only("id", "title", "content")
+    while True:
+        batch = list(articles.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not batch:
+            break
+        index_articles(batch)
+        indexed += len(batch)
+        last_id = batch[-1].pk
+    return indexed
+
+
+def _resolve_query(query):
+    """
+    Map each query token to the dictionary terms it matches.
+
+    Returns:
+        list[dict]: One {term_id: document_count} group per query token, or
+        None if some token matches nothing (so no article can match).
+    """
+    groups = []
+    for raw in query.split():
+        # "covid-19" or "budget,vote" hold several tokens; all must match,
+        # and a trailing "*" makes the last one a prefix
+        tokens = tokenize(raw)
+        for index, token in enumerate(tokens):
+            if raw.endswith("*") and index == len(tokens) - 1:
+                # Range scan on the unique term index
+                matches = SearchTerm.objects.filter(
+                    term__gte=token, term__lt=token + "\uffff", document_count__gt=0
+                ).order_by("-document_count")[:MAX_PREFIX_EXPANSION]
+            else:
+                matches = SearchTerm.objects.filter(term=token, document_count__gt=0)
+            group = dict(matches.values_list("id", "document_count"))
+            if not group:
+                return None
+            groups.append(group)
+    return groups
+
+
+def _document_total():
+    # Changes only when the public feed does, so it shares its cache generation.
+    return get_or_build(
+        GLOBAL_FEED,
+        "search:document_total",
+        lambda: Article.objects.filter(approved=True, published=True).count(),
+    )
+
+
+def search(query, limit=20, offset=0, articles=None):
+    """
+    Return published articles matching every term of ``query``, best first.
+
+    At most MAX_CANDIDATES articles are ranked (see the module docstring),
+    so ``offset`` beyond that returns nothing.
+
+    Args:
+        query (str): Space-separated terms; ``term*`` matches by prefix.
+        limit (int): Maximum number of results.
+        offset (int): Number of ranked results to skip.
+        articles (QuerySet | None): Articles to load the results from, e.g.
+            narrowed to the columns a serializer reads; by default every
+            column, with the journalist and publisher joined.
+
+    Returns:
+        list[Article]: Matching articles, each annotated with a ``search_score``.
+    """
+    groups = _resolve_query(query or "")
+    if not groups:
+        return []
+
+    total = _document_total()
+    idf = {
+        term_id: math.log(1 + total / max(document_count, 1))
+        for group in groups
+        for term_id, document_count in group.items()
+    }
+    all_term_ids = list(idf)
+
+    # Only articles containing the rarest query token can match them all;
+    # rank those where it weighs most
+    rarest = min(groups, key=lambda group: sum(group.values()))
+    candidates = list(
+        SearchPosting.objects.filter(term_id__in=list(rarest))
+        .order_by("-weight", "-article_id")
+        .values_list("article_id", flat=True)[:MAX_CANDIDATES]
+    )
+    if not candidates:
+        return []
+
+    matched = {
+        f"matched_{i}": Max(Case(
+            When(term_id__in=list(group), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        for i, group in enumerate(groups)
+    }
+    score = Sum(F("weight") * Case(
+        *[When(term_id=term_id, then=Value(weight)) for term_id, weight in idf.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    ))
+    ranked = list(
+        SearchPosting.objects.filter(term_id__in=all_term_ids, article_id__in=candidates)
+        .values("article_id")
+        .annotate(search_score=score, **matched)
+        .filter(**{name: 1 for name in matched})
+        .order_by("-search_score", "-article_id")
+        .values_list("article_id", "search_score")[offset: offset + limit]
+    )
+
+    if articles is None:
+        articles = Article.objects.select_related("journalist", "publisher")
+    articles = articles.filter(
+        pk__in=[article_id for article_id, _ in ranked], approved=True, published=True
+    ).in_bulk()
+    results = []
+    for article_id, article_score in ranked:
+        article = articles.get(article_id)
+        if article is not None:
+            article.search_score = article_score
+            results.append(article)
+    return results
@@ -3,16 +3,61 @@ serializers.py
 
 This module defines Django REST Framework serializers for the News App.
 
+- SparseFieldsetSerializerMixin: Lets a serializer render only the requested fields.
+  The model serializers also report their time to the request profiler
+  (profiling.ProfiledSerializerMixin).
 - ArticleSerializer: Serializes Article model fields for API endpoints.
+- ArticleSummarySerializer: Compact Article representation for list endpoints.
 - PublisherSerializer: Serializes Publisher model fields for API endpoints.
 - NewsletterSerializer: Serializes Newsletter model fields for API endpoints.
+- BulkArticleIdsSerializer: Validates the article IDs of a bulk moderation request.
 """
 
+from django.utils.text import Truncator
 from rest_framework import serializers
+from .fieldsets import EXCERPT_LENGTH
 from .models import Article, Publisher, Newsletter
+from .moderation import MAX_BULK_IDS
+from .profiling import ProfiledSerializerMixin
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """
+    Accepts a ``fields`` argument listing the fields to render; the others
+    are dropped. Used with fieldsets.SparseFieldsetMixin on the views.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ExcerptField(serializers.CharField):
+    """
+    Read-only field showing the start of an article's content.
+
+    Reads the ``excerpt`` annotation added by fieldsets.narrow_queryset so
+    the full content is not loaded, falling back to ``content`` otherwise.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if hasattr(instance, "excerpt"):
+            return instance.excerpt
+        return instance.content
+
+    def to_representation(self, value):
+        return Truncator(value).chars(EXCERPT_LENGTH)
+
+
+class ArticleSerializer(
+    ProfiledSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Serializer for Article model, used in API endpoints."""
     
     class Meta:
@@ -37,7 +82,35 @@ class ArticleSerializer(serializers.ModelSerializer):
         ]
 
 
-class PublisherSerializer(serializers.ModelSerializer):
+class ArticleSummarySerializer(
+    ProfiledSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    """
+    Compact, read-only Article serializer for list endpoints: an excerpt
+    instead of the full content, plus the author and publisher names.
+    """
+
+    excerpt = ExcerptField()
+    author = serializers.CharField(source="journalist.username", read_only=True, allow_null=True)
+    publisher_name = serializers.CharField(source="publisher.name", read_only=True, allow_null=True)
+
+    class Meta:
+        model = Article
+        fields = [
+            "id",
+            "title",
+            "excerpt",
+            "journalist",
+            "author",
+            "publisher",
+            "publisher_name",
+            "created_at",
+            "published_at",
+        ]
+        read_only_fields = fields
+
+
+class PublisherSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Serializer for Publisher model, used in API endpoints."""
     
     class Meta:
@@ -49,7 +122,7 @@ class PublisherSerializer(serializers.ModelSerializer):
         ]
 
 
-class NewsletterSerializer(serializers.ModelSerializer):
+class NewsletterSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Serializer for Newsletter model, used in API endpoints."""
     
     class Meta:
@@ -61,4 +134,15 @@ class NewsletterSerializer(serializers.ModelSerializer):
             "journalist",
             "created_at",
         ]
-        read_only_fields = ["created_at"]
+        # The author is the journalist creating it
+        read_only_fields = ["journalist", "created_at"]
+
+
+class BulkArticleIdsSerializer(serializers.Serializer):
+    """Serializer for the list of article IDs sent to the bulk moderation endpoints."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BULK_IDS,
+    )
@@ -5,16 +5,65 @@ This module defines Django signal handlers for the News App:
 
 - create_default_groups: Ensures that default user groups and permissions
   exist after migrations.
-- notify_article_approved: Sends email notifications to journalists when
-  their articles are approved.
+- notify_article_approved: Queues an email notification to journalists when
+  their articles are approved (delivered by the send_notifications command).
+- queue_publish_fanout: Queues a FanoutJob when an article is published, so
+  its subscribers are notified by the send_notifications worker.
+- update_search_index / remove_from_search_index: Keep the search index in
+  step with the set of published articles.
+- mute_article_signals: Skip the per-article side effects during bulk
+  operations that apply them once for the whole batch.
+- remember_feed_state / invalidate_feeds_on_*: Bump the cached feed
+  generations whenever an article enters, changes within or leaves a
+  public feed, or a publisher or journalist shown on it is renamed.
+- invalidate_memberships_on_*: Drop cached publisher memberships (see
+  membership.py) when Publisher.members changes or a publisher is deleted.
+- invalidate_newsletter_feeds: Bump the cached newsletter list and archive
+  when a newsletter is saved or deleted.
 """
 
-from django.db.models.signals import post_migrate, post_save
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_migrate, post_save, pre_delete,
+)
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.contrib.auth.models import Group, Permission
 from django.apps import apps
-from .models import Article
+from .cache import (
+    GLOBAL_FEED, NEWSLETTER_FEED, article_feeds, bump_generations, journalist_feed,
+    journalist_newsletters, publisher_feed,
+)
+from .membership import invalidate_memberships
+from .models import Article, CustomUser, FanoutJob, Newsletter, Publisher
+from . import notifications, search
+
+_muted = ContextVar("news_app_article_signals_muted", default=False)
+
+
+@contextmanager
+def mute_article_signals():
+    """
+    Within this block, saving or deleting articles skips the notification,
+    fan-out, search and feed-cache receivers below. Bulk operations use it
+    and perform those side effects once for the whole batch themselves.
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def _unless_muted(handler):
+    """Make ``handler`` a no-op inside mute_article_signals()."""
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _muted.get():
+            return handler(*args, **kwargs)
+    return wrapper
 
 
 @receiver(post_migrate)
@@ -66,17 +115,214 @@ def create_default_groups(sender, **kwargs):
 
 
 @receiver(post_save, sender=Article)
+@_unless_muted
 def notify_article_approved(sender, instance, created, **kwargs):
     """
     Notify the journalist when their article is approved.
-    Only fires when an existing article changes to approved=True.
+    Only fires for existing articles with approved=True; the outbox
+    deduplicates, so later saves of an approved article send nothing new.
     """
     if not created and instance.approved:
-        if instance.journalist and instance.journalist.email:
-            send_mail(
-                subject=f"Your article '{instance.title}' was approved!",
-                message="Congratulations, your article is now live.",
-                from_email="admin@newsapp.com",
-                recipient_list=[instance.journalist.email],
-                fail_silently=True,  # safer in dev (avoid breaking on email failure)
-            )
+        notifications.notify_article_approved(instance)
+
+
+@receiver(post_save, sender=Article)
+@_unless_muted
+def queue_publish_fanout(sender, instance, created, **kwargs):
+    """
+    Queue delivery to subscribers when an article enters the public feed.
+
+    Reads the state recorded by remember_feed_state, so it must stay
+    connected before invalidate_feeds_on_article_save, which overwrites it.
+    """
+    if not (instance.approved and instance.published):
+        return
+    if not created and getattr(instance, "_loaded_feeds", None):
+        return  # Already public before this save
+    FanoutJob.objects.get_or_create(article=instance)
+
+
+# Saves touching none of these fields cannot change the search index
+SEARCH_FIELDS = frozenset({"title", "content", "approved", "published"})
+
+
+@receiver(post_save, sender=Article)
+@_unless_muted
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+    Index published articles on save and drop articles that stop being public.
+
+    Like queue_publish_fanout, this relies on the state recorded by
+    remember_feed_state and must stay connected before the feed invalidation.
+    """
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    after = _public_feeds(instance)
+    if after is None:
+        instance.refresh_from_db(fields=["approved", "published"])
+        after = _public_feeds(instance)
+    if after:
+        search.index_article(instance)
+    elif getattr(instance, "_loaded_feeds", None) != set():
+        # Was public, or its previous state is unknown
+        search.remove_article(instance)
+
+
+@receiver(pre_delete, sender=Article)
+@_unless_muted
+def remove_from_search_index(sender, instance, **kwargs):
+    """
+    Remove a deleted article's postings while keeping document counts right.
+    """
+    search.remove_article(instance)
+
+
+# -----------------------
+# Feed cache invalidation
+# -----------------------
+def _public_feeds(article):
+    """
+    Return the set of feeds ``article`` currently appears in, or None if its
+    state fields were deferred and are unknown without a query.
+    """
+    values = article.__dict__
+    if "approved" not in values or "published" not in values:
+        return None
+    if not (values["approved"] and values["published"]):
+        return set()
+    return article_feeds(values.get("publisher_id"), values.get("journalist_id"))
+
+
+def _all_feeds(article):
+    """Every feed ``article`` could be in, used when its state is unknown."""
+    return article_feeds(article.publisher_id, article.journalist_id)
+
+
+@receiver(post_init, sender=Article)
+def remember_feed_state(sender, instance, **kwargs):
+    """
+    Remember which feeds an article was in when loaded, so that saving it can
+    invalidate a feed it leaves as well as the one it enters.
+    """
+    instance._loaded_feeds = _public_feeds(instance)
+
+
+@receiver(post_save, sender=Article)
+@_unless_muted
+def invalidate_feeds_on_article_save(sender, instance, **kwargs):
+    """
+    Bump the generation of every feed the article was or now is part of.
+    Saving a draft that never reached a feed invalidates nothing.
+    """
+    before = getattr(instance, "_loaded_feeds", None)
+    after = _public_feeds(instance)
+    if before is None or after is None:
+        feeds = _all_feeds(instance) | (before or set())
+    else:
+        feeds = before | after
+    if feeds:
+        bump_generations(*feeds)
+    instance._loaded_feeds = after
+
+
+@receiver(post_delete, sender=Article)
+@_unless_muted
+def invalidate_feeds_on_article_delete(sender, instance, **kwargs):
+    """
+    Bump the generation of the feeds a deleted article was part of.
+    """
+    feeds = getattr(instance, "_loaded_feeds", None)
+    if feeds is None:
+        feeds = _all_feeds(instance)
+    if feeds:
+        bump_generations(*feeds)
+
+
+@receiver(post_save, sender=Publisher)
+def invalidate_feeds_on_publisher_save(sender, instance, created, **kwargs):
+    """
+    Publisher names are shown on feed pages, so a rename invalidates them.
+    """
+    if not created:
+        bump_generations(GLOBAL_FEED, publisher_feed(instance.pk))
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_username(sender, instance, **kwargs):
+    """
+    Remember the username a user was loaded with, so that saving can tell
+    a rename from any other change (e.g. last_login on every login).
+    """
+    instance._loaded_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_feeds_on_user_save(sender, instance, created, **kwargs):
+    """
+    Usernames are shown as the author on feed pages, so renaming a user
+    invalidates every feed their public articles appear in.
+    """
+    username = instance.__dict__.get("username")
+    if created or username == instance._loaded_username:
+        return
+    instance._loaded_username = username
+    publisher_ids = (
+        Article.objects.filter(journalist=instance, approved=True, published=True)
+        .exclude(publisher=None)
+        .values_list("publisher_id", flat=True)
+        .distinct()
+    )
+    bump_generations(
+        GLOBAL_FEED, journalist_feed(instance.pk), *map(publisher_feed, publisher_ids)
+    )
+
+
+# -----------------------
+# Membership cache invalidation
+# -----------------------
+@receiver(m2m_changed, sender=Publisher.members.through)
+def invalidate_memberships_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drop the cached memberships of every user added to or removed from a
+    publisher, from either side of the relation.
+    """
+    if action == "pre_clear" and not reverse:
+        # The cleared members are unknown once post_clear runs
+        instance._cleared_member_ids = list(instance.members.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # user.publishers.add(...): ``instance`` is the user
+        invalidate_memberships([instance.pk], instance)
+    elif action == "post_clear":
+        invalidate_memberships(instance.__dict__.pop("_cleared_member_ids", []))
+    else:
+        invalidate_memberships(pk_set)
+
+
+@receiver(pre_delete, sender=Publisher)
+def invalidate_memberships_on_publisher_delete(sender, instance, **kwargs):
+    """
+    Deleting a publisher removes its memberships without m2m_changed.
+    """
+    invalidate_memberships(instance.members.values_list("id", flat=True))
+
+
+# -----------------------
+# Newsletter feed invalidation
+# -----------------------
+# Saved while a newsletter is being sent; not part of its API representation
+_DELIVERY_FIELDS = frozenset({"last_recipient_id", "sent_at"})
+
+
+@receiver(post_save, sender=Newsletter)
+@receiver(post_delete, sender=Newsletter)
+def invalidate_newsletter_feeds(sender, instance, update_fields=None, **kwargs):
+    """
+    Bump the newsletter list and the journalist's archive, except for the
+    delivery progress saved after every chunk of a send.
+    """
+    if update_fields and set(update_fields) <= _DELIVERY_FIELDS:
+        return
+    bump_generations(NEWSLETTER_FEED, journalist_newsletters(instance.journalist_id))
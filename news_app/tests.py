@@ -6,13 +6,110 @@ This module contains automated tests for the News App, including:
 - Article CRUD operations (create, edit, delete)
 - Article approval and publishing
 - API endpoints for articles and drafts
+- Keyset pagination of the public feeds
+- Index usage of the hot Article queries (EXPLAIN)
+- Query counts of list pages staying flat as rows grow (no N+1)
+- Versioned caching of the published feeds
+- The email notification outbox and its worker
+- Fan-out of published articles to subscribers and followers
+- Personalized reader feeds (materialized timelines)
+- Full-text search and its incremental inverted index
+- Bulk approve / publish / delete of articles
+- Summary list serializer and ?fields= sparse fieldsets
+- Conditional GET (ETag / Last-Modified / 304) on article endpoints
+- Per-request database connection instrumentation
+- Primary / read-replica routing (needs the two databases of test_settings)
+- Async versions of the public article endpoints
+- Request profiling (Server-Timing, profile log lines, cProfile samples)
+- Synthetic dataset generation and the benchmark command
+- Query budgets of every route, enforced at two data sizes
+- Role-scoped, paged dashboard sections and status counts
+- Cached publisher memberships for permission checks
+- Newsletter delivery: chunked, pooled, concurrent and resumable
+- Newsletter API and cached, keyset-paginated journalist archives
+- Cached RSS / Atom syndication feeds
+- Streaming NDJSON / CSV export of the article archive
+- Bulk article import: batched validation, cached lookups, one refresh
 """
 
+import asyncio
+import base64
+import csv
 import json
-from django.test import TestCase
+import pstats
+import re
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.contrib.auth.models import Group
-from .models import CustomUser, Publisher, Article
+from django.contrib.auth.models import Group, Permission
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from .cache import (
+    GLOBAL_FEED, bump_generations, get_generation, journalist_feed, publisher_feed,
+)
+from .export import export_queryset, iter_articles
+from .importer import CachedLookup, import_articles, read_rows
+from .fieldsets import EXCERPT_LENGTH
+from .fanout import fan_out_chunk, queue_silent_jobs, run_pending_jobs, subscriber_queryset
+from .models import (
+    CustomUser, Publisher, Article, FanoutJob, Newsletter, NewsletterDelivery, Notification,
+    SearchPosting, SearchTerm, TimelineEntry,
+)
+from .membership import member_publisher_ids
+from .middleware import DatabaseConnectionStatsMiddleware
+from . import newsletters
+from .notifications import deliver_pending
+from .routers import PrimaryReplicaRouter, STICKY_COOKIE, replica_reads
+from .pagination import FEED_ORDERING, InvalidCursor, KeysetPaginator, NewsletterPaginator
+from .search import search, tokenize
+from .timeline import TimelinePaginator, fallback_queryset
+
+
+class QueryCountAssertionsMixin:
+    """
+    Assertions for pinning how many SQL queries a page costs.
+
+    Use with a TestCase to check that a view issues the same number of
+    queries no matter how many rows it lists.
+    """
+
+    def count_queries(self, func):
+        """Run ``func`` and return the number of queries it executed."""
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context.captured_queries)
+
+    def assertQueriesIndependentOfRows(self, func, add_rows, num=None):
+        """
+        Assert that ``func`` issues the same number of queries before and after
+        ``add_rows`` is called, and optionally that the number equals ``num``.
+
+        Args:
+            func (callable): Performs the request being measured.
+            add_rows (callable): Adds more data for ``func`` to list.
+            num (int | None): Exact number of queries expected.
+        """
+        before = self.count_queries(func)
+        add_rows()
+        with CaptureQueriesContext(connection) as context:
+            func()
+        after = len(context.captured_queries)
+        queries = "\n".join(q["sql"] for q in context.captured_queries)
+        self.assertEqual(
+            before, after,
+            f"Query count grew from {before} to {after} as rows were added:\n{queries}",
+        )
+        if num is not None:
+            self.assertEqual(after, num, f"Expected {num} queries, got {after}:\n{queries}")
 
 
 class ArticleAPITest(TestCase):
@@ -82,6 +179,10 @@ class ArticleAPITest(TestCase):
             is_draft=True,
         )
 
+    def setUp(self):
+        # Feed pages are cached across requests; start every test cold.
+        cache.clear()
+
     # -----------------------
     # Article Creation
     # -----------------------
@@ -209,7 +310,7 @@ class ArticleAPITest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
-        self.assertTrue(any(a["title"] == "Test Article" for a in data))
+        self.assertTrue(any(a["title"] == "Test Article" for a in data["results"]))
 
     def test_api_article_detail(self):
         url = reverse("news_api:api_article_detail", args=[self.article.id])
@@ -231,4 +332,2473 @@ class ArticleAPITest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
-        self.assertTrue(all(a["publisher"] == self.publisher.id for a in data))
+        self.assertTrue(all(a["publisher"] == self.publisher.id for a in data["results"]))
+
+
+class KeysetPaginationTest(TestCase):
+    """
+    TestCase for cursor pagination of the public feeds:
+    - Pages walk forwards and backwards without gaps or duplicates
+    - Articles sharing a publish date, or lacking one, are still reachable
+    - Invalid cursors are rejected
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create_user(
+            username="journalist", password="pass123", role="journalist"
+        )
+        cls.publisher = Publisher.objects.create(name="The Times")
+        base = timezone.now()
+        cls.articles = []
+        for i in range(7):
+            cls.articles.append(Article.objects.create(
+                title=f"Article {i}",
+                content="Body",
+                journalist=cls.journalist,
+                publisher=cls.publisher,
+                approved=True,
+                published=True,
+                # Two articles share each timestamp to exercise the id tie-break
+                published_at=base - timedelta(hours=i // 2),
+            ))
+        # A legacy published article without a publish date sorts last
+        cls.undated = Article.objects.create(
+            title="Undated", content="Body", journalist=cls.journalist,
+            approved=True, published=True,
+        )
+        Article.objects.create(title="Unpublished", content="Body", journalist=cls.journalist)
+
+    def setUp(self):
+        # Feed pages are cached across requests; start every test cold.
+        cache.clear()
+
+    def expected_order(self):
+        dated = sorted(self.articles, key=lambda a: (a.published_at, a.pk), reverse=True)
+        return [a.pk for a in dated] + [self.undated.pk]
+
+    def test_walk_forward_and_back(self):
+        paginator = KeysetPaginator(page_size=3)
+        queryset = Article.objects.filter(approved=True, published=True)
+
+        pages = [paginator.paginate(queryset)]
+        while pages[-1].has_next:
+            pages.append(paginator.paginate(queryset, pages[-1].next_cursor))
+        forward = [a.pk for page in pages for a in page]
+        self.assertEqual(forward, self.expected_order())
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[0].has_previous)
+
+        back = paginator.paginate(queryset, pages[-1].previous_cursor)
+        self.assertEqual([a.pk for a in back], [a.pk for a in pages[1]])
+        first = paginator.paginate(queryset, back.previous_cursor)
+        self.assertEqual([a.pk for a in first], [a.pk for a in pages[0]])
+        self.assertFalse(first.has_previous)
+
+    def test_page_query_count_is_constant(self):
+        paginator = KeysetPaginator(page_size=2)
+        queryset = Article.objects.filter(approved=True, published=True)
+        page = paginator.paginate(queryset)
+        with self.assertNumQueries(1):
+            paginator.paginate(queryset, page.next_cursor)
+
+    def test_api_articles_paginates(self):
+        url = reverse("news_api:api_articles")
+        response = self.client.get(url, {"page_size": 4})
+        data = json.loads(response.content)
+        self.assertEqual(len(data["results"]), 4)
+        self.assertIsNone(data["previous"])
+        self.assertIn("cursor=", data["next"])
+
+        response = self.client.get(data["next"])
+        data = json.loads(response.content)
+        self.assertEqual(
+            [a["id"] for a in data["results"]], self.expected_order()[4:]
+        )
+        self.assertIsNone(data["next"])
+
+    @override_settings(NEWS_FEED_PAGE_SIZE=5)
+    def test_article_list_page_links(self):
+        response = self.client.get(reverse("news_app:article_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["articles"]), 5)
+        self.assertContains(response, "?cursor=")
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("news_api:api_articles"), {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("news_app:article_list"), {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_impossible_date(self):
+        cursor = base64.urlsafe_b64encode(b"p=2020-13-45T00%3A00%3A00&i=1&r=0").decode()
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator.decode_cursor(cursor)
+        for url in [
+            reverse("news_api:api_articles"),
+            reverse("news_app:article_list"),
+            reverse("news_api:api_articles_async"),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 404)
+
+
+class ArticleIndexExplainTest(TestCase):
+    """
+    TestCase asserting that the hot Article queries are served by the
+    composite indexes declared on Article.Meta, using the database's EXPLAIN.
+
+    Query planners pick indexes from table statistics, so the table is seeded
+    with a realistic state mix and analyzed before each plan is inspected.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.publishers = [Publisher.objects.create(name=f"Publisher {i}") for i in range(5)]
+        cls.journalists = [
+            CustomUser.objects.create(username=f"journalist{i}", role="journalist")
+            for i in range(10)
+        ]
+        articles = []
+        for i in range(500):
+            # 80% published, 10% approved awaiting publishing, 10% pending
+            state = i % 10
+            articles.append(Article(
+                title=f"Article {i}",
+                content="Body",
+                journalist=cls.journalists[i % 10],
+                publisher=cls.publishers[i % 5],
+                approved=state != 0,
+                published=state > 1,
+                is_draft=state == 0,
+                published_at=timezone.now() - timedelta(minutes=i) if state > 1 else None,
+            ))
+        Article.objects.bulk_create(articles)
+        cls.journalist = cls.journalists[0]
+        cls.publisher = cls.publishers[0]
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                cursor.execute(f"ANALYZE TABLE {Article._meta.db_table}")
+            else:
+                cursor.execute("ANALYZE")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in plan:\n{plan}")
+
+    def test_public_feed_uses_index(self):
+        queryset = Article.objects.filter(approved=True, published=True).order_by(
+            *FEED_ORDERING
+        )
+        self.assertUsesIndex(queryset, "article_public_feed_idx")
+
+    def test_publisher_feed_uses_index(self):
+        queryset = Article.objects.filter(
+            publisher=self.publisher, approved=True, published=True
+        ).order_by(*FEED_ORDERING)
+        self.assertUsesIndex(queryset, "article_publisher_feed_idx")
+
+    def test_journalist_drafts_use_index(self):
+        queryset = Article.objects.filter(journalist=self.journalist, published=False).order_by(
+            "-created_at"
+        )
+        self.assertUsesIndex(queryset, "article_journalist_draft_idx")
+
+    def test_editor_pending_queue_uses_index(self):
+        queryset = Article.objects.filter(approved=False).order_by("created_at")
+        self.assertUsesIndex(queryset, "article_pending_idx")
+
+
+class QueryCountTest(QueryCountAssertionsMixin, TestCase):
+    """
+    TestCase pinning list pages and the dashboard to a fixed number of queries
+    regardless of how many articles, journalists and publishers they show.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.publisher_user = CustomUser.objects.create(username="publisher", role="publisher")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.publisher.members.add(cls.journalist, cls.editor, cls.publisher_user)
+        cls.add_articles(cls, 2)
+
+    def setUp(self):
+        # Feed pages are cached across requests; start every test cold.
+        cache.clear()
+
+    def add_articles(self, count):
+        """Create ``count`` articles in each state, each with its own author and publisher."""
+        start = Article.objects.count()
+        for i in range(start, start + count):
+            author = CustomUser.objects.create(username=f"author{i}", role="journalist")
+            publisher = Publisher.objects.create(name=f"Publisher {i}")
+            publisher.members.add(author, self.editor)
+            for approved, published in [(True, True), (True, False), (False, False)]:
+                Article.objects.create(
+                    title=f"Article {i}", content="Body", journalist=author,
+                    publisher=publisher, approved=approved, published=published,
+                    published_at=timezone.now() if published else None,
+                )
+            # The logged-in journalist and the reference publisher get rows too
+            Article.objects.create(
+                title=f"Own {i}", content="Body", journalist=self.journalist,
+                publisher=self.publisher, approved=True, published=True,
+                published_at=timezone.now(),
+            )
+
+    def assertFlat(self, url, user=None, num=None):
+        if user:
+            self.client.force_login(user)
+
+        def request():
+            # Both measurements start cold (feed pages, memberships)
+            cache.clear()
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.assertQueriesIndependentOfRows(
+            request,
+            lambda: self.add_articles(5),
+            num=num,
+        )
+
+    def test_article_list(self):
+        self.assertFlat(reverse("news_app:article_list"), num=1)
+
+    def test_api_articles(self):
+        self.assertFlat(reverse("news_api:api_articles"), num=1)
+
+    def test_api_publisher_articles(self):
+        self.assertFlat(
+            reverse("news_api:api_publisher_articles", args=[self.publisher.id]), num=2
+        )
+
+    def test_api_drafts(self):
+        self.assertFlat(reverse("news_api:api_drafts"), self.journalist)
+
+    def test_dashboard_per_role(self):
+        for user in [self.journalist, self.editor, self.reader, self.publisher_user]:
+            with self.subTest(role=user.role):
+                self.assertFlat(reverse("news_app:dashboard"), user)
+
+
+class FeedCacheTest(TestCase):
+    """
+    TestCase for the versioned feed cache:
+    - Repeat reads are served without touching the database
+    - Changes to published articles invalidate exactly the affected feeds
+    - Saving drafts leaves cached feeds untouched
+    - Renaming a journalist invalidates the feeds showing them as author
+    - Pages are keyed on the path and the parameters that shape them only
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.other_publisher = Publisher.objects.create(name="The Post")
+        cls.article = Article.objects.create(
+            title="Cached Article", content="Body", journalist=cls.journalist,
+            publisher=cls.publisher, approved=True, published=True,
+            published_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, url):
+        data = json.loads(self.client.get(url).content)
+        return [a["title"] for a in data["results"]]
+
+    def test_repeat_reads_hit_cache(self):
+        for url in [
+            reverse("news_api:api_articles"),
+            reverse("news_api:api_publisher_articles", args=[self.publisher.id]),
+            reverse("news_app:article_list"),
+        ]:
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_unrelated_params_share_cached_page(self):
+        for url in [
+            reverse("news_api:api_articles"),
+            reverse("news_api:api_publisher_articles", args=[self.publisher.id]),
+            reverse("news_api:api_articles_async"),
+        ]:
+            with self.subTest(url=url):
+                self.client.get(url, {"page_size": 5})
+                with self.assertNumQueries(0):
+                    self.client.get(url, {"page_size": 5, "utm_source": "mail", "_": "123"})
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, {"page_size": 5, "fields": "id"})
+                data = json.loads(response.content)
+                self.assertTrue(queries)
+                self.assertEqual(data["results"], [{"id": self.article.pk}])
+
+    def test_publish_invalidates_global_and_publisher_feed(self):
+        url = reverse("news_api:api_articles")
+        publisher_url = reverse("news_api:api_publisher_articles", args=[self.publisher.id])
+        other_generation = get_generation(publisher_feed(self.other_publisher.id))
+        self.assertEqual(self.titles(url), ["Cached Article"])
+        self.assertEqual(self.titles(publisher_url), ["Cached Article"])
+
+        Article.objects.create(
+            title="Fresh Article", content="Body", journalist=self.journalist,
+            publisher=self.publisher, approved=True, published=True,
+            published_at=timezone.now(),
+        )
+        self.assertEqual(self.titles(url), ["Fresh Article", "Cached Article"])
+        self.assertEqual(self.titles(publisher_url), ["Fresh Article", "Cached Article"])
+        self.assertEqual(
+            get_generation(publisher_feed(self.other_publisher.id)), other_generation
+        )
+
+    def test_unpublish_and_delete_invalidate(self):
+        url = reverse("news_api:api_articles")
+        self.assertEqual(self.titles(url), ["Cached Article"])
+        article = Article.objects.get(pk=self.article.pk)
+        article.published = False
+        article.save()
+        self.assertEqual(self.titles(url), [])
+
+        article.published = True
+        article.save()
+        self.assertEqual(self.titles(url), ["Cached Article"])
+        article.delete()
+        self.assertEqual(self.titles(url), [])
+
+    def test_moving_publisher_invalidates_both_feeds(self):
+        old = get_generation(publisher_feed(self.publisher.id))
+        new = get_generation(publisher_feed(self.other_publisher.id))
+        article = Article.objects.get(pk=self.article.pk)
+        article.publisher = self.other_publisher
+        article.save()
+        self.assertNotEqual(get_generation(publisher_feed(self.publisher.id)), old)
+        self.assertNotEqual(get_generation(publisher_feed(self.other_publisher.id)), new)
+
+    def test_draft_save_keeps_cache(self):
+        generation = get_generation(GLOBAL_FEED)
+        draft = Article.objects.create(title="Draft", content="Body", journalist=self.journalist)
+        draft.title = "Draft v2"
+        draft.save()
+        draft.delete()
+        self.assertEqual(get_generation(GLOBAL_FEED), generation)
+
+    def test_journalist_rename_invalidates_their_feeds(self):
+        url = reverse("news_api:api_publisher_articles", args=[self.publisher.id])
+        self.client.get(url)
+        feeds = [
+            GLOBAL_FEED, journalist_feed(self.journalist.pk), publisher_feed(self.publisher.id),
+        ]
+        generations = {feed: get_generation(feed) for feed in feeds}
+        other = get_generation(publisher_feed(self.other_publisher.id))
+
+        # Other changes, e.g. last_login on every login, keep the cache
+        journalist = CustomUser.objects.get(pk=self.journalist.pk)
+        journalist.last_login = timezone.now()
+        journalist.save()
+        self.assertEqual(get_generation(GLOBAL_FEED), generations[GLOBAL_FEED])
+
+        journalist.username = "renamed"
+        journalist.save()
+        for feed, generation in generations.items():
+            self.assertNotEqual(get_generation(feed), generation, feed)
+        self.assertEqual(get_generation(publisher_feed(self.other_publisher.id)), other)
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(data["results"][0]["author"], "renamed")
+
+
+class NotificationOutboxTest(TestCase):
+    """
+    TestCase for the email outbox:
+    - Approving queues exactly one notification and sends nothing inline
+    - The worker sends batches over one connection and marks rows sent
+    - Failed sends are retried with backoff, then given up on
+    - A mail server outage counts an attempt; no row lock is held while sending
+    - Subjects of long titles are shortened to fit the outbox column
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create_user(
+            username="journalist", password="pass123", role="journalist", email="journo@example.com"
+        )
+        cls.editor = CustomUser.objects.create_user(
+            username="editor", password="pass123", role="editor", email="editor@example.com"
+        )
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.publisher.members.add(cls.journalist, cls.editor)
+        cls.articles = [
+            Article.objects.create(
+                title=f"Pending {i}", content="Body", journalist=cls.journalist,
+                publisher=cls.publisher,
+            )
+            for i in range(3)
+        ]
+
+    def approve(self, article):
+        self.client.force_login(self.editor)
+        return self.client.post(reverse("news_app:article_approve", args=[article.id]))
+
+    def test_approve_queues_single_notification(self):
+        article = self.articles[0]
+        self.approve(article)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Re-approving and editing the approved article do not queue duplicates
+        self.approve(article)
+        article.refresh_from_db()
+        article.title = "Pending 0 (edited)"
+        article.save()
+
+        queued = Notification.objects.filter(article=article)
+        self.assertEqual(queued.count(), 1)
+        self.assertEqual(queued.get().recipient, "journo@example.com")
+        self.assertEqual(queued.get().status, Notification.STATUS_PENDING)
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for article in self.articles:
+            self.approve(article)
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open") as opened:
+            out = StringIO()
+            call_command("send_notifications", "--batch-size", "2", stdout=out)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(opened.call_count, 2)  # one per batch, not one per email
+        self.assertIn("3 sent, 0 failed", out.getvalue())
+        self.assertFalse(Notification.objects.exclude(status=Notification.STATUS_SENT).exists())
+
+        # Nothing left to send on a second run
+        self.assertEqual(deliver_pending(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_send_is_retried_then_given_up(self):
+        self.approve(self.articles[0])
+        notification = Notification.objects.get()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("connection refused"),
+        ):
+            self.assertEqual(deliver_pending(max_attempts=2), (0, 1))
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, Notification.STATUS_PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertIn("connection refused", notification.last_error)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+
+            # Not due yet, so the next run leaves it alone
+            self.assertEqual(deliver_pending(max_attempts=2), (0, 0))
+
+            Notification.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(deliver_pending(max_attempts=2), (0, 1))
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, Notification.STATUS_FAILED)
+
+        self.assertEqual(deliver_pending(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_connection_failure_is_retried(self):
+        self.approve(self.articles[0])
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open",
+            side_effect=OSError("connection refused"),
+        ):
+            self.assertEqual(deliver_pending(), (0, 1))
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, Notification.STATUS_PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn("connection refused", notification.last_error)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+    def test_sends_outside_the_claiming_transaction(self):
+        self.approve(self.articles[0])
+        savepoints = []
+
+        def send_messages(backend, messages):
+            savepoints.append(len(connection.savepoint_ids))
+            claimed = Notification.objects.get()
+            # The claim is committed before sending: counted and leased
+            self.assertEqual(claimed.attempts, 1)
+            self.assertGreater(claimed.next_attempt_at, timezone.now())
+            return len(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages", send_messages
+        ):
+            self.assertEqual(deliver_pending(), (1, 0))
+        # No atomic block of deliver_pending() is open (TestCase has its own)
+        self.assertEqual(savepoints, [len(connection.savepoint_ids)])
+        self.assertEqual(Notification.objects.get().status, Notification.STATUS_SENT)
+
+    def test_long_titles_fit_the_subject(self):
+        article = Article.objects.create(
+            title="x" * 255, content="Body", journalist=self.journalist, publisher=self.publisher,
+        )
+        self.approve(article)
+        subject = Notification.objects.get(article=article).subject
+        self.assertEqual(len(subject), 255)
+        self.assertTrue(subject.endswith("…"))
+
+
+class NewsletterDeliveryTest(TestCase):
+    """
+    TestCase for sending newsletters to followers:
+    - Rendered once, sent once to every follower with an email address
+    - Sent in chunks over a fixed pool of connections
+    - An interrupted send resumes without resending
+    - Failures are recorded and can be retried
+    - A mail server outage closes the opened connections; the worker backs off
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.followers = []
+        for i in range(7):
+            reader = CustomUser.objects.create(
+                username=f"reader{i}", role="reader", email=f"reader{i}@example.com"
+            )
+            reader.subscriptions_journalists.add(cls.journalist)
+            cls.followers.append(reader)
+        no_email = CustomUser.objects.create(username="no-email", role="reader")
+        no_email.subscriptions_journalists.add(cls.journalist)
+        CustomUser.objects.create(username="stranger", role="reader", email="stranger@example.com")
+        cls.newsletter = Newsletter.objects.create(
+            title="Weekly", content="First line\n\nSecond <b>line</b>", journalist=cls.journalist,
+        )
+
+    def send(self, **options):
+        options = {"chunk_size": 3, "concurrency": 2, **options}
+        return newsletters.send_newsletter(self.newsletter, **options)
+
+    def recipients(self):
+        return sorted(message.to[0] for message in mail.outbox)
+
+    def test_sends_to_every_follower_once(self):
+        render = mock.patch(
+            "news_app.newsletters.render_to_string", wraps=newsletters.render_to_string
+        )
+        with render as rendered, \
+                mock.patch("django.core.mail.backends.locmem.EmailBackend.open") as opened:
+            self.assertEqual(self.send(), (7, 0))
+        self.assertEqual(rendered.call_count, 2)  # text and HTML, not per recipient
+        self.assertEqual(opened.call_count, 2)  # one per pooled connection
+        self.assertEqual(self.recipients(), sorted(f.email for f in self.followers))
+
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, "Weekly")
+        self.assertIn("Second <b>line</b>", message.body)
+        self.assertIn("Second &lt;b&gt;line&lt;/b&gt;", message.alternatives[0][0])
+
+        self.newsletter.refresh_from_db()
+        self.assertIsNotNone(self.newsletter.sent_at)
+        self.assertEqual(self.newsletter.last_recipient_id, self.followers[-1].pk)
+        self.assertEqual(
+            NewsletterDelivery.objects.filter(status=NewsletterDelivery.STATUS_SENT).count(), 7
+        )
+
+        # Finished newsletters are not sent again
+        self.assertEqual(self.send(), (0, 0))
+        self.assertEqual(newsletters.send_pending_newsletters(), (0, 0))
+        self.assertEqual(len(mail.outbox), 7)
+
+    def test_interrupted_send_resumes(self):
+        original = newsletters._send_deliveries
+        calls = []
+
+        def crash_on_second_chunk(deliveries, *args):
+            calls.append(len(deliveries))
+            if len(calls) == 2:
+                # Half the chunk went out before the process died
+                original(deliveries[:1], *args)
+                NewsletterDelivery.objects.filter(pk=deliveries[0].pk).update(
+                    status=NewsletterDelivery.STATUS_SENT
+                )
+                raise KeyboardInterrupt
+            return original(deliveries, *args)
+
+        with mock.patch("news_app.newsletters._send_deliveries", crash_on_second_chunk):
+            with self.assertRaises(KeyboardInterrupt):
+                self.send()
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.last_recipient_id, self.followers[2].pk)
+        self.assertIsNone(self.newsletter.sent_at)
+        self.assertEqual(len(mail.outbox), 4)
+
+        self.assertEqual(self.send(), (3, 0))
+        self.assertEqual(self.recipients(), sorted(f.email for f in self.followers))
+
+    def test_failures_are_recorded_and_retried(self):
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("connection refused"),
+        ):
+            self.assertEqual(self.send(), (0, 7))
+        failed = NewsletterDelivery.objects.filter(status=NewsletterDelivery.STATUS_FAILED)
+        self.assertEqual(failed.count(), 7)
+        self.assertIn("connection refused", failed.first().last_error)
+
+        out = StringIO()
+        call_command("send_newsletters", str(self.newsletter.pk), "--retry-failed", stdout=out)
+        self.assertIn("7 sent, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertEqual(NewsletterDelivery.objects.get(recipient=self.followers[0]).attempts, 2)
+
+    def test_command_sends_pending_newsletters(self):
+        out = StringIO()
+        call_command("send_newsletters", "--chunk-size", "4", stdout=out)
+        self.assertIn("7 sent, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 7)
+
+    def test_failed_connection_closes_opened_ones(self):
+        connections = [mock.Mock(), mock.Mock()]
+        connections[1].open.side_effect = OSError("connection refused")
+        with self.assertRaises(OSError):
+            self.send(connection_factory=iter(connections).__next__)
+        connections[0].close.assert_called_once()
+        self.assertFalse(NewsletterDelivery.objects.exists())
+
+    def test_loop_backs_off_after_errors(self):
+        outcomes = [OSError("connection refused"), OSError("connection refused"), (7, 0)]
+        sleeps = []
+
+        def send_pending(**options):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if not outcomes:
+                raise KeyboardInterrupt
+
+        command = "news_app.management.commands.send_newsletters"
+        err = StringIO()
+        with mock.patch(f"{command}.send_pending_newsletters", send_pending), \
+                mock.patch(f"{command}.time.sleep", sleep):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    "send_newsletters", "--loop", "--interval", "2", stdout=StringIO(), stderr=err,
+                )
+        self.assertEqual(sleeps, [2, 4, 2])
+        self.assertIn("connection refused", err.getvalue())
+
+        # Without --loop the error is not swallowed
+        with mock.patch(
+            f"{command}.send_pending_newsletters", side_effect=OSError("connection refused"),
+        ):
+            with self.assertRaises(OSError):
+                call_command("send_newsletters", stdout=StringIO())
+
+
+class NewsletterAPITest(TestCase):
+    """
+    TestCase for the newsletter API:
+    - Journalists write newsletters; others are refused
+    - The list and the per-journalist archives are keyset-paginated
+    - Archive pages are cached and invalidated when a newsletter is saved,
+      but not by the progress of sending it
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create_user(
+            username="journalist", password="pass123", role="journalist"
+        )
+        cls.other = CustomUser.objects.create(username="other", role="journalist")
+        cls.reader = CustomUser.objects.create_user(
+            username="reader", password="pass123", role="reader"
+        )
+        base = timezone.now()
+        for i in range(5):
+            Newsletter.objects.create(
+                title=f"Issue {i}", content="Body", journalist=cls.journalist,
+                created_at=base - timedelta(days=i),
+            )
+        Newsletter.objects.create(title="Other issue", content="Body", journalist=cls.other)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, url, **params):
+        titles = []
+        data = json.loads(self.client.get(url, params).content)
+        while True:
+            titles += [n["title"] for n in data["results"]]
+            if not data["next"]:
+                return titles
+            data = json.loads(self.client.get(data["next"]).content)
+
+    def archive_url(self, journalist=None):
+        journalist = journalist or self.journalist
+        return reverse("news_api:api_journalist_newsletters", args=[journalist.pk])
+
+    def test_create_requires_journalist(self):
+        url = reverse("news_api:api_newsletters")
+        payload = {"title": "Fresh", "content": "Body", "journalist": self.other.pk}
+        self.assertIn(self.client.post(url, payload).status_code, [401, 403])
+
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.post(url, payload).status_code, 403)
+
+        self.client.force_login(self.journalist)
+        response = self.client.post(url, payload)
+        self.assertEqual(response.status_code, 201)
+        newsletter = Newsletter.objects.get(pk=response.json()["id"])
+        self.assertEqual(newsletter.journalist, self.journalist)
+        self.assertIsNone(newsletter.sent_at)  # picked up by send_newsletters
+
+    def test_list_detail_and_archive_pages(self):
+        issues = [f"Issue {i}" for i in range(5)]
+        self.assertEqual(self.titles(self.archive_url(), page_size=2), issues)
+        self.assertEqual(
+            self.titles(reverse("news_api:api_newsletters"), page_size=4), ["Other issue"] + issues
+        )
+
+        newsletter = Newsletter.objects.get(title="Issue 0")
+        response = self.client.get(reverse("news_api:api_newsletter_detail", args=[newsletter.pk]))
+        self.assertEqual(response.json()["title"], "Issue 0")
+
+        self.assertEqual(self.client.get(self.archive_url(self.reader)).status_code, 404)
+        response = self.client.get(self.archive_url(), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+        # Paging backwards returns the same pages
+        paginator = NewsletterPaginator(page_size=2)
+        queryset = Newsletter.objects.filter(journalist=self.journalist)
+        second = paginator.paginate(queryset, paginator.paginate(queryset).next_cursor)
+        back = paginator.paginate(queryset, second.previous_cursor)
+        self.assertEqual([n.title for n in back], issues[:2])
+
+    def test_archive_pages_are_cached_and_invalidated(self):
+        url = self.archive_url()
+        other_url = self.archive_url(self.other)
+        self.titles(url)
+        self.titles(other_url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        # Delivery progress leaves the cache alone
+        newsletter = Newsletter.objects.get(title="Issue 0")
+        newsletter.sent_at = timezone.now()
+        newsletter.save(update_fields=["sent_at"])
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        newsletter.title = "Issue 0 (corrected)"
+        newsletter.save()
+        self.assertEqual(self.titles(url)[0], "Issue 0 (corrected)")
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+        newsletter.delete()
+        self.assertEqual(len(self.titles(url)), 4)
+
+
+class PublishFanoutTest(TestCase):
+    """
+    TestCase for fanning a published article out to subscribers:
+    - Publisher subscribers and journalist followers are both reached, once each
+    - Fan-out runs in resumable chunks
+    - A chunk budget lets the worker send between chunks of one job
+    - Publish fan-outs run before an older silent backfill
+    - Only the transition into the public feed queues a job
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(
+            username="journalist", role="journalist", email="journo@example.com"
+        )
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.publisher.members.add(cls.journalist, cls.editor)
+
+        cls.subscribers = []
+        for i in range(5):
+            reader = CustomUser.objects.create(
+                username=f"reader{i}", role="reader", email=f"reader{i}@example.com"
+            )
+            cls.subscribers.append(reader)
+        # Readers 0-2 subscribe to the publisher, 2-4 follow the journalist
+        for reader in cls.subscribers[:3]:
+            reader.subscriptions_publishers.add(cls.publisher)
+        for reader in cls.subscribers[2:]:
+            reader.subscriptions_journalists.add(cls.journalist)
+        # Subscribed elsewhere, or without an email address
+        other = Publisher.objects.create(name="The Post")
+        outsider = CustomUser.objects.create(username="other", email="other@example.com")
+        outsider.subscriptions_publishers.add(other)
+        CustomUser.objects.create(username="no_email").subscriptions_publishers.add(cls.publisher)
+
+        cls.article = Article.objects.create(
+            title="Breaking", content="Body", journalist=cls.journalist,
+            publisher=cls.publisher, approved=True,
+        )
+
+    def publish(self):
+        self.client.force_login(self.editor)
+        self.client.post(reverse("news_app:article_publish", args=[self.article.id]))
+
+    def test_subscriber_queryset_is_deduplicated(self):
+        ids = sorted(subscriber_queryset(self.article).values_list("username", flat=True))
+        self.assertEqual(ids, ["no_email"] + [f"reader{i}" for i in range(5)])
+
+    def test_publish_queues_job_and_worker_notifies_each_subscriber_once(self):
+        self.publish()
+        self.assertTrue(FanoutJob.objects.filter(article=self.article).exists())
+
+        self.assertEqual(run_pending_jobs(chunk_size=2), 6)
+        recipients = sorted(
+            Notification.objects.filter(event=Notification.EVENT_ARTICLE_PUBLISHED)
+            .values_list("recipient", flat=True)
+        )
+        self.assertEqual(recipients, [f"reader{i}@example.com" for i in range(5)])
+
+        call_command("send_notifications", stdout=StringIO())
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox if m.subject == "New article: Breaking"),
+            recipients,
+        )
+
+    def test_chunks_resume_from_last_user(self):
+        self.publish()
+        job = FanoutJob.objects.select_related("article").get(article=self.article)
+        # Select and audience count, then outbox + timeline inserts and the
+        # progress update inside one savepoint
+        with self.assertNumQueries(7):
+            self.assertEqual(fan_out_chunk(job, chunk_size=2), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.last_user_id, self.subscribers[1].id)
+        self.assertIsNone(job.completed_at)
+
+        run_pending_jobs(chunk_size=2)
+        job.refresh_from_db()
+        self.assertIsNotNone(job.completed_at)
+        self.assertEqual(
+            Notification.objects.filter(
+                article=self.article, event=Notification.EVENT_ARTICLE_PUBLISHED
+            ).count(),
+            5,
+        )
+
+    def test_chunk_budget_interleaves_delivery(self):
+        self.publish()
+        self.assertEqual(run_pending_jobs(chunk_size=2, max_chunks=1), 2)
+        self.assertIsNone(FanoutJob.objects.get(article=self.article).completed_at)
+
+        out = StringIO()
+        call_command(
+            "send_notifications", "--chunk-size", "2", "--max-chunks", "1", stdout=out,
+        )
+        # Each chunk's notifications go out before the next chunk is fanned out
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                "Queued 2 subscriber notifications.", "Sent 5, failed 0.",
+                "Queued 2 subscriber notifications.", "Sent 1, failed 0.",
+                "Done: 6 sent, 0 failed.",
+            ],
+        )
+        self.assertIsNotNone(FanoutJob.objects.get(article=self.article).completed_at)
+        self.assertEqual(
+            len([m for m in mail.outbox if m.subject == "New article: Breaking"]), 5
+        )
+
+    def test_publish_fanout_runs_before_silent_backlog(self):
+        Article.objects.bulk_create([Article(
+            title="Imported", content="Body", journalist=self.journalist,
+            publisher=self.publisher, approved=True, published=True,
+        )])
+        queue_silent_jobs(Article.objects.filter(title="Imported"))
+        self.publish()
+
+        self.assertEqual(run_pending_jobs(chunk_size=10, max_chunks=1), 6)
+        self.assertIsNotNone(FanoutJob.objects.get(article=self.article).completed_at)
+        self.assertIsNone(FanoutJob.objects.get(article__title="Imported").completed_at)
+
+    def test_only_publishing_queues_fanout(self):
+        self.publish()
+        self.publish()
+        article = Article.objects.get(pk=self.article.pk)
+        article.title = "Breaking (updated)"
+        article.save()
+        self.assertEqual(FanoutJob.objects.count(), 1)
+
+        draft = Article.objects.create(title="Draft", content="Body", journalist=self.journalist)
+        draft.save()
+        self.assertFalse(FanoutJob.objects.filter(article=draft).exists())
+
+
+class ReaderFeedTest(TestCase):
+    """
+    TestCase for the personalized reader feed:
+    - Only articles from subscribed publishers and followed journalists appear
+    - Timelines are written by the fan-out and paged by cursor
+    - Articles not materialized into timelines are merged in at read time
+    - Bulk-written articles reach timelines through silent (no email) jobs
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.other_reader = CustomUser.objects.create(username="other", role="reader")
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.freelancer = CustomUser.objects.create(username="freelancer", role="journalist")
+        cls.stranger = CustomUser.objects.create(username="stranger", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+
+        cls.reader.subscriptions_publishers.add(cls.publisher)
+        cls.reader.subscriptions_journalists.add(cls.journalist, cls.freelancer)
+        cls.other_reader.subscriptions_journalists.add(cls.freelancer)
+
+        base = timezone.now()
+        cls.expected = []
+        for i, (journalist, publisher) in enumerate([
+            (cls.journalist, cls.publisher),   # subscribed and followed
+            (cls.freelancer, None),            # followed, independent
+            (cls.stranger, cls.publisher),     # subscribed publisher only
+            (cls.stranger, None),              # neither
+            (cls.journalist, cls.publisher),
+        ]):
+            article = Article.objects.create(
+                title=f"Article {i}", content="Body", journalist=journalist,
+                publisher=publisher, approved=True, published=True,
+                published_at=base - timedelta(hours=i),
+            )
+            if journalist != cls.stranger or publisher:
+                cls.expected.append(article.pk)
+
+    def feed(self, **params):
+        self.client.force_login(self.reader)
+        ids = []
+        data = json.loads(self.client.get(reverse("news_api:api_reader_feed"), params).content)
+        while True:
+            ids += [a["id"] for a in data["results"]]
+            if not data["next"]:
+                return ids
+            data = json.loads(self.client.get(data["next"]).content)
+
+    def test_feed_from_materialized_timeline(self):
+        run_pending_jobs()
+        self.assertEqual(TimelineEntry.objects.filter(reader=self.reader).count(), 4)
+        self.assertEqual(self.feed(page_size=2), self.expected)
+
+        # With every article materialized a page is timeline + fallback lookups
+        paginator = TimelinePaginator(self.reader, page_size=2)
+        with self.assertNumQueries(2):
+            page = paginator.paginate(fallback_queryset(self.reader))
+        back = paginator.paginate(
+            fallback_queryset(self.reader),
+            paginator.paginate(fallback_queryset(self.reader), page.next_cursor).previous_cursor,
+        )
+        self.assertEqual([a.pk for a in back], [a.pk for a in page])
+
+    def test_unfinished_fanout_is_read_on_demand(self):
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(page_size=3), self.expected)
+
+    @override_settings(NEWS_TIMELINE_MAX_FANOUT=1)
+    def test_large_audience_is_read_on_demand(self):
+        run_pending_jobs(chunk_size=1)
+        freelancer_job = FanoutJob.objects.get(article__journalist=self.freelancer)
+        self.assertFalse(freelancer_job.materialize_timeline)
+        self.assertFalse(TimelineEntry.objects.filter(article__journalist=self.freelancer).exists())
+        self.assertEqual(self.feed(page_size=2), self.expected)
+
+    def test_bulk_written_articles_get_silent_jobs(self):
+        run_pending_jobs()
+        Article.objects.bulk_create([Article(
+            title="Bulk", content="Body", journalist=self.journalist, approved=True,
+            published=True, published_at=timezone.now(),
+        )])
+        bulk = Article.objects.get(title="Bulk")
+        # Articles without a job are not searched at read time
+        self.assertNotIn(bulk.pk, self.feed())
+
+        self.assertEqual(queue_silent_jobs(Article.objects.all()), 1)
+        self.assertEqual(self.feed()[0], bulk.pk)
+        run_pending_jobs()
+        self.assertEqual(list(fallback_queryset(self.reader)), [])
+        self.assertEqual(self.feed()[0], bulk.pk)
+        self.assertFalse(Notification.objects.filter(article=bulk).exists())
+
+    def test_unpublished_articles_leave_feed(self):
+        run_pending_jobs()
+        Article.objects.filter(pk=self.expected[0]).update(published=False)
+        self.assertEqual(self.feed(), self.expected[1:])
+
+    def test_feed_requires_login(self):
+        response = self.client.get(reverse("news_api:api_reader_feed"))
+        self.assertIn(response.status_code, [401, 403])
+
+
+class SearchTest(TestCase):
+    """
+    TestCase for article search:
+    - Multi-term queries match every term and rank by relevance
+    - Accents and case fold to one term; punctuated queries keep every token
+    - Prefix queries and the search API
+    - Only the articles where the rarest term weighs most are ranked
+    - The index follows publishing, edits, unpublishing and deletion
+    - The rebuild command reproduces the incrementally maintained index
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.election = cls.make("Election results", "The election count finished overnight.")
+        cls.budget = cls.make("Budget vote", "Parliament debated the budget before the election.")
+        cls.weather = cls.make("Weather", "Storms expected over the weekend.")
+        cls.draft = cls.make("Election draft", "Unpublished election notes.", published=False)
+
+    @classmethod
+    def make(cls, title, content, published=True):
+        return Article.objects.create(
+            title=title, content=content, journalist=cls.journalist, publisher=cls.publisher,
+            approved=published, published=published,
+            published_at=timezone.now() if published else None,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, query):
+        return [article.pk for article in search(query)]
+
+    def document_counts(self):
+        terms = SearchTerm.objects.filter(document_count__gt=0)
+        return dict(terms.values_list("term", "document_count"))
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("The Election's RESULTS, a 2024 x"), ["election", "results", "2024"]
+        )
+
+    def test_ranked_multi_term_queries(self):
+        # The title match outranks the passing mention; drafts are never found
+        self.assertEqual(self.ids("election"), [self.election.pk, self.budget.pk])
+        self.assertEqual(self.ids("budget election"), [self.budget.pk])
+        self.assertEqual(self.ids("election storms"), [])
+        self.assertEqual(self.ids("nonexistent"), [])
+        self.assertEqual(self.ids("the"), [])
+
+    def test_accents_and_case_fold_to_one_term(self):
+        self.assertEqual(
+            tokenize("Café CAFE cafe\u0301 Straße"), ["cafe", "cafe", "cafe", "strasse"]
+        )
+        article = self.make("Café culture", "Le café du coin")
+        self.assertEqual(self.ids("cafe"), [article.pk])
+        self.assertEqual(self.ids("CAFÉ"), [article.pk])
+        self.assertEqual(SearchTerm.objects.get(term="cafe").document_count, 1)
+
+    def test_punctuated_queries_match_every_token(self):
+        covid = self.make("Covid-19 update", "New covid figures")
+        self.make("Covid recovery", "Figures from 2020")
+        self.assertEqual(self.ids("covid-19"), [covid.pk])
+        self.assertEqual(self.ids("budget,vote"), [self.budget.pk])
+        self.assertEqual(self.ids("budget,storms"), [])
+        self.assertEqual(self.ids("election,resul*"), [self.election.pk])
+
+    def test_prefix_queries(self):
+        self.assertEqual(self.ids("elect*"), [self.election.pk, self.budget.pk])
+        self.assertEqual(self.ids("storm* week*"), [self.weather.pk])
+
+    def test_search_query_count_is_flat(self):
+        # Resolve, document total, candidates, rank, load
+        with self.assertNumQueries(5):
+            self.assertEqual(len(search("elect*")), 2)
+
+    def test_ranking_is_capped_to_heaviest_candidates(self):
+        with mock.patch("news_app.search.MAX_CANDIDATES", 1):
+            # The title match weighs most for "election"
+            self.assertEqual(self.ids("election"), [self.election.pk])
+            # "budget" is rarer, and the budget article holds "election" too
+            self.assertEqual(self.ids("election budget"), [self.budget.pk])
+
+    def test_index_follows_article_lifecycle(self):
+        self.draft.approved = self.draft.published = True
+        self.draft.save()
+        self.assertIn(self.draft.pk, self.ids("unpublished"))
+
+        self.weather.title = "Heatwave"
+        self.weather.content = "Sunshine all week."
+        self.weather.save()
+        self.assertEqual(self.ids("storms"), [])
+        self.assertEqual(self.ids("heatwave"), [self.weather.pk])
+
+        self.election.published = False
+        self.election.save()
+        self.assertNotIn(self.election.pk, self.ids("election"))
+
+        self.budget.delete()
+        self.assertEqual(self.ids("budget"), [])
+        self.assertFalse(SearchPosting.objects.filter(article_id=self.budget.pk).exists())
+
+        incremental = self.document_counts()
+        call_command("build_search_index", stdout=StringIO())
+        self.assertEqual(self.document_counts(), incremental)
+
+    def test_search_api(self):
+        response = self.client.get(reverse("news_api:api_article_search"), {"q": "election"})
+        data = json.loads(response.content)
+        self.assertEqual([a["id"] for a in data["results"]], [self.election.pk, self.budget.pk])
+        self.assertIsNone(data["next"])
+        # Summaries, as in the other lists
+        self.assertEqual(data["results"][0]["excerpt"], self.election.content)
+        self.assertEqual(data["results"][0]["author"], "journalist")
+        self.assertNotIn("content", data["results"][0])
+
+        with mock.patch("news_app.api_views.ArticleSearchView.page_size", 1):
+            data = json.loads(self.client.get(
+                reverse("news_api:api_article_search"), {"q": "election"}
+            ).content)
+            self.assertEqual([a["id"] for a in data["results"]], [self.election.pk])
+            data = json.loads(self.client.get(data["next"]).content)
+            self.assertEqual([a["id"] for a in data["results"]], [self.budget.pk])
+            self.assertIsNone(data["next"])
+
+        response = self.client.get(reverse("news_api:api_article_search"), {"q": "x", "page": "0"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_page(self):
+        response = self.client.get(reverse("news_app:article_search"), {"q": "weather"})
+        self.assertContains(response, "Weather")
+        self.assertNotContains(response, "Budget vote")
+
+
+class BulkModerationTest(TestCase):
+    """
+    TestCase for the bulk moderation API:
+    - Permissions come from the user's publisher memberships
+    - Approving and publishing queue emails, fan-out, search and cache updates
+    - The number of queries does not depend on how many articles are moderated
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.journalist = CustomUser.objects.create(
+            username="journalist", role="journalist", email="journalist@example.com"
+        )
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.other_publisher = Publisher.objects.create(name="The Post")
+        cls.publisher.members.add(cls.editor, cls.journalist)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.editor)
+
+    def make(self, count, publisher=None, **fields):
+        return [
+            Article.objects.create(
+                title=f"Bulk {i}", content="Harbour dispatch", journalist=self.journalist,
+                publisher=publisher or self.publisher, **fields,
+            ).pk
+            for i in range(count)
+        ]
+
+    def post(self, name, ids):
+        response = self.client.post(
+            reverse(f"news_api:{name}"), {"ids": ids}, content_type="application/json"
+        )
+        return response.status_code, json.loads(response.content)
+
+    def test_bulk_approve(self):
+        pending = self.make(3)
+        already = self.make(1, approved=True)
+        foreign = self.make(1, publisher=self.other_publisher)
+        status, data = self.post("api_bulk_approve", pending + already + foreign + [999999])
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {
+            "updated": pending, "unchanged": already, "forbidden": foreign, "not_found": [999999],
+        })
+        self.assertEqual(Article.objects.filter(approved=True).count(), 4)
+        self.assertEqual(
+            Notification.objects.filter(event=Notification.EVENT_ARTICLE_APPROVED).count(), 3
+        )
+        # Approved but unpublished articles are not public yet
+        self.assertFalse(FanoutJob.objects.exists())
+
+    def test_bulk_publish_makes_articles_public(self):
+        ids = self.make(3, approved=True)
+        global_generation = get_generation(GLOBAL_FEED)
+        status, data = self.post("api_bulk_publish", ids)
+        self.assertEqual(data["updated"], ids)
+        self.assertNotEqual(get_generation(GLOBAL_FEED), global_generation)
+        self.assertEqual(FanoutJob.objects.filter(article_id__in=ids).count(), 3)
+        self.assertEqual(sorted(a.pk for a in search("harbour")), ids)
+        self.assertFalse(Article.objects.filter(pk__in=ids, published_at__isnull=True).exists())
+
+    def test_bulk_delete(self):
+        ids = self.make(2, approved=True, published=True)
+        foreign = self.make(1, publisher=self.other_publisher)
+        status, data = self.post("api_bulk_delete", ids + foreign)
+        self.assertEqual((data["updated"], data["forbidden"]), (ids, foreign))
+        self.assertEqual(list(Article.objects.values_list("pk", flat=True)), foreign)
+        self.assertEqual(search("harbour"), [])
+        self.assertFalse(SearchTerm.objects.filter(term="harbour", document_count__gt=0).exists())
+
+    def test_query_count_independent_of_batch_size(self):
+        def queries(name, count):
+            ids = self.make(count, approved=(name != "api_bulk_approve"), published=True)
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                self.post(name, ids)
+            return len(context.captured_queries)
+
+        for name in ["api_bulk_approve", "api_bulk_publish", "api_bulk_delete"]:
+            with self.subTest(name):
+                self.assertEqual(queries(name, 2), queries(name, 20))
+
+    def test_role_checks_and_validation(self):
+        ids = self.make(1)
+        self.client.force_login(self.journalist)
+        self.assertEqual(self.post("api_bulk_approve", ids)[1]["forbidden"], ids)
+        self.assertEqual(self.post("api_bulk_approve", [])[0], 400)
+        self.client.logout()
+        self.assertIn(self.post("api_bulk_approve", ids)[0], [401, 403])
+
+
+class SparseFieldsetTest(TestCase):
+    """
+    TestCase for compact list responses:
+    - List endpoints render summaries with an excerpt instead of the content
+    - ?fields= narrows both the JSON and the SQL column list
+    - Unknown fields are rejected
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.article = Article.objects.create(
+            title="Long read", content="word " * 500, journalist=cls.journalist,
+            publisher=cls.publisher, approved=True, published=True, published_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        return response, sql
+
+    def assertContentNotLoaded(self, sql):
+        """Fail if ``sql`` reads the full content column rather than an excerpt of it."""
+        self.assertNotIn('"content"', re.sub(r"SUBSTR\([^)]*\)", "", sql))
+
+    def test_list_renders_summaries(self):
+        response, sql = self.get(reverse("news_api:api_articles"))
+        item = json.loads(response.content)["results"][0]
+        self.assertNotIn("content", item)
+        self.assertEqual(item["author"], "journalist")
+        self.assertEqual(item["publisher_name"], "The Times")
+        self.assertLessEqual(len(item["excerpt"]), EXCERPT_LENGTH)
+        self.assertTrue(item["excerpt"].endswith("…"))
+        # Only the excerpt's prefix of the content is read
+        self.assertContentNotLoaded(sql)
+
+    def test_fields_narrow_json_and_sql(self):
+        response, sql = self.get(reverse("news_api:api_articles"), fields="id,title")
+        self.assertEqual(json.loads(response.content)["results"], [
+            {"id": self.article.pk, "title": "Long read"},
+        ])
+        self.assertNotIn("content", sql)
+        self.assertNotIn("news_app_customuser", sql)
+
+        url = reverse("news_api:api_publisher_articles", args=[self.publisher.pk])
+        response, sql = self.get(url, fields="author")
+        self.assertEqual(json.loads(response.content)["results"], [{"author": "journalist"}])
+        self.assertNotIn('JOIN "news_app_publisher"', sql)
+
+    def test_detail_fields(self):
+        url = reverse("news_api:api_article_detail", args=[self.article.pk])
+        response, sql = self.get(url, fields="title,published")
+        self.assertEqual(json.loads(response.content), {"title": "Long read", "published": True})
+        self.assertNotIn("content", sql)
+
+    def test_reader_feed_fields(self):
+        reader = CustomUser.objects.create(username="reader", role="reader")
+        reader.subscriptions_publishers.add(self.publisher)
+        run_pending_jobs()
+        self.client.force_login(reader)
+        response, sql = self.get(reverse("news_api:api_reader_feed"), fields="id,excerpt")
+        results = json.loads(response.content)["results"]
+        self.assertEqual([a["id"] for a in results], [self.article.pk])
+        self.assertContentNotLoaded(sql)
+
+    def test_unknown_field_rejected(self):
+        response, _ = self.get(reverse("news_api:api_articles"), fields="title,password")
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTest(TestCase):
+    """
+    TestCase for conditional GETs on the article endpoints:
+    - Unchanged resources answer 304 without rendering
+    - Editing an article or its feed invalidates the validators
+    - Renaming an article's journalist invalidates its validators
+    - Personal HTML pages get per-user ETags and no Last-Modified
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.article = Article.objects.create(
+            title="Steady", content="Body", journalist=cls.journalist, publisher=cls.publisher,
+            approved=True, published=True, published_at=timezone.now(),
+        )
+        cls.independent = Article.objects.create(
+            title="Solo", content="Body", journalist=cls.journalist,
+            approved=True, published=True, published_at=timezone.now(),
+        )
+        Article.objects.filter(pk=cls.article.pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+
+    def setUp(self):
+        cache.clear()
+        # The article's owners last changed before it did
+        earlier = timezone.now() - timedelta(days=2)
+        with mock.patch("django.utils.timezone.now", return_value=earlier):
+            bump_generations(publisher_feed(self.publisher.pk), journalist_feed(self.journalist.pk))
+
+    def revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_detail_not_modified(self):
+        url = reverse("news_api:api_article_detail", args=[self.article.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(url, response).status_code, 304)
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.revalidate(url, response, fields="title").status_code, 200)
+
+        self.article.refresh_from_db()
+        self.article.title = "Changed"
+        self.article.save()
+        changed = self.revalidate(url, response)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], response["ETag"])
+
+    def test_journalist_rename_invalidates_detail(self):
+        html_url = reverse("news_app:article_detail", args=[self.independent.pk])
+        self.client.force_login(self.reader)
+        self.client.get(html_url)  # Picks up the CSRF cookie
+        html = self.client.get(html_url)
+        api_url = reverse("news_api:api_article_detail", args=[self.article.pk])
+        api = self.client.get(api_url)
+
+        journalist = CustomUser.objects.get(pk=self.journalist.pk)
+        journalist.username = "renamed"
+        journalist.save()
+        changed = self.revalidate(html_url, html)
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, "renamed")
+        self.assertEqual(self.revalidate(api_url, api).status_code, 200)
+        not_modified = self.client.get(api_url, HTTP_IF_MODIFIED_SINCE=api["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 200)
+
+    def test_missing_article_is_not_conditional(self):
+        url = reverse("news_api:api_article_detail", args=[999999])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH="*").status_code, 404)
+
+    def test_list_not_modified_until_feed_changes(self):
+        url = reverse("news_api:api_articles")
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+        Article.objects.create(
+            title="Fresh", content="Body", journalist=self.journalist, publisher=self.publisher,
+            approved=True, published=True, published_at=timezone.now(),
+        )
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+        publisher_url = reverse("news_api:api_publisher_articles", args=[self.publisher.pk])
+        response = self.client.get(publisher_url)
+        self.assertEqual(self.revalidate(publisher_url, response).status_code, 304)
+
+    def test_html_detail_etag_is_per_user(self):
+        url = reverse("news_app:article_detail", args=[self.article.pk])
+        self.client.force_login(self.reader)
+        self.client.get(url)  # Picks up the CSRF cookie, which is part of the ETag
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("Last-Modified"))
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+        self.client.force_login(self.journalist)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+
+class SyndicationFeedTest(TestCase):
+    """
+    TestCase for the RSS / Atom syndication feeds:
+    - Both formats list the latest public articles, newest first
+    - Publisher and journalist feeds only list their own articles
+    - Repeat and conditional requests are served from the cache
+    - Publishing regenerates the affected feeds; saving drafts does not
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.other_journalist = CustomUser.objects.create(username="columnist", role="journalist")
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.other_publisher = Publisher.objects.create(name="The Post")
+        now = timezone.now()
+        cls.older = Article.objects.create(
+            title="Older Story", content="Body", journalist=cls.journalist, publisher=cls.publisher,
+            approved=True, published=True, published_at=now - timedelta(hours=1),
+        )
+        cls.newer = Article.objects.create(
+            title="Newer Story", content="Body", journalist=cls.other_journalist,
+            publisher=cls.other_publisher, approved=True, published=True, published_at=now,
+        )
+        Article.objects.create(title="Hidden Draft", content="Body", journalist=cls.journalist)
+
+    def setUp(self):
+        cache.clear()
+
+    def url(self, name="syndication_feed", *args, format="rss"):
+        return reverse(f"news_app:{name}", args=[*args, format])
+
+    def test_rss_and_atom(self):
+        rss = self.client.get(self.url())
+        self.assertEqual(rss.status_code, 200)
+        self.assertTrue(rss["Content-Type"].startswith("application/rss+xml"))
+        content = rss.content.decode()
+        self.assertIn("<rss", content)
+        self.assertLess(content.index("Newer Story"), content.index("Older Story"))
+        self.assertNotIn("Hidden Draft", content)
+        self.assertIn(reverse("news_app:article_detail", args=[self.newer.pk]), content)
+
+        atom = self.client.get(self.url(format="atom"))
+        self.assertTrue(atom["Content-Type"].startswith("application/atom+xml"))
+        self.assertIn("<feed", atom.content.decode())
+        self.assertEqual(self.client.get("/feeds/articles.json").status_code, 404)
+
+    def test_scoped_feeds(self):
+        publisher = self.client.get(
+            self.url("publisher_syndication_feed", self.publisher.pk)
+        ).content.decode()
+        self.assertIn("Older Story", publisher)
+        self.assertNotIn("Newer Story", publisher)
+
+        journalist = self.client.get(
+            self.url("journalist_syndication_feed", self.other_journalist.pk, format="atom")
+        ).content.decode()
+        self.assertIn("Newer Story", journalist)
+        self.assertNotIn("Older Story", journalist)
+
+        for url in [
+            self.url("journalist_syndication_feed", self.reader.pk),
+            self.url("publisher_syndication_feed", 999999),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_repeat_and_conditional_reads_hit_cache(self):
+        url = self.url("publisher_syndication_feed", self.publisher.pk)
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, response.content)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_publish_regenerates_affected_feeds(self):
+        url = self.url()
+        journalist_url = self.url("journalist_syndication_feed", self.journalist.pk)
+        other_url = self.url("journalist_syndication_feed", self.other_journalist.pk)
+        self.client.get(url)
+        self.client.get(journalist_url)
+        other = self.client.get(other_url)
+
+        draft = Article.objects.create(title="Breaking", content="Body", journalist=self.journalist)
+        self.assertNotIn("Breaking", self.client.get(url).content.decode())
+
+        draft.approved = draft.published = True
+        draft.publisher = self.publisher
+        draft.published_at = timezone.now()
+        draft.save()
+        self.assertIn("Breaking", self.client.get(url).content.decode())
+        self.assertIn("Breaking", self.client.get(journalist_url).content.decode())
+        self.assertEqual(
+            self.client.get(other_url, HTTP_IF_NONE_MATCH=other["ETag"]).status_code, 304
+        )
+
+
+class ArticleExportTest(TestCase):
+    """
+    TestCase for the streaming article export:
+    - NDJSON and CSV list every published article in ID order
+    - Only staff and users granted the export permission may export
+    - Filtering by publisher and publication date, and resuming after an ID
+    - Rows are read in fixed-size batches (one query per batch)
+    - The export_articles command, including resuming into the same file
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.other_publisher = Publisher.objects.create(name="The Post")
+        start = timezone.now() - timedelta(days=10)
+        cls.articles = [
+            Article.objects.create(
+                title=f"Story {i}", content="Body, with a comma", journalist=cls.journalist,
+                publisher=cls.publisher if i % 2 else cls.other_publisher,
+                approved=True, published=True, published_at=start + timedelta(days=i),
+            )
+            for i in range(5)
+        ]
+        Article.objects.create(title="Hidden Draft", content="Body", journalist=cls.journalist)
+        cls.exporter = CustomUser.objects.create(username="exporter", role="reader")
+        cls.exporter.user_permissions.add(Permission.objects.get(codename="export_article"))
+
+    def setUp(self):
+        self.client.force_login(self.exporter)
+
+    def export(self, **params):
+        response = self.client.get(reverse("news_api:api_article_export"), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def ids(self, **params):
+        return [json.loads(line)["id"] for line in self.export(**params).splitlines()]
+
+    def test_ndjson_and_csv(self):
+        lines = self.export().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [a.pk for a in self.articles])
+        first = json.loads(lines[0])
+        self.assertEqual(first["author"], "journalist")
+        self.assertEqual(first["publisher_name"], "The Post")
+
+        rows = list(csv.DictReader(StringIO(self.export(format="csv"))))
+        self.assertEqual([int(row["id"]) for row in rows], [a.pk for a in self.articles])
+        self.assertEqual(rows[0]["content"], "Body, with a comma")
+
+    def test_export_requires_permission(self):
+        url = reverse("news_api:api_article_export")
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.journalist)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(CustomUser.objects.create(username="staff", is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_filters_and_resume(self):
+        self.assertEqual(
+            self.ids(publisher=self.publisher.pk), [self.articles[1].pk, self.articles[3].pk]
+        )
+        day = timezone.localdate(self.articles[2].published_at).isoformat()
+        self.assertEqual(self.ids(since=day, until=day), [self.articles[2].pk])
+        self.assertEqual(self.ids(after=self.articles[2].pk), [a.pk for a in self.articles[3:]])
+
+        response = self.client.get(
+            reverse("news_api:api_article_export"), {"format": "xml", "since": "yesterday"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(json.loads(response.content)), {"format", "since"})
+
+    def test_rows_are_read_in_batches(self):
+        with self.assertNumQueries(3):
+            rows = list(iter_articles(export_queryset(), chunk_size=2))
+        self.assertEqual([row["id"] for row in rows], [a.pk for a in self.articles])
+
+    def test_command_resumes_into_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/articles.csv"
+            err = StringIO()
+            call_command(
+                "export_articles", "--format", "csv",
+                "--until", self.articles[1].published_at.isoformat(), "-o", path, stderr=err,
+            )
+            self.assertIn("Exported 2 articles", err.getvalue())
+            self.assertIn(f"last ID {self.articles[1].pk}", err.getvalue())
+
+            call_command(
+                "export_articles", "--format", "csv", "--after", str(self.articles[1].pk),
+                "--append", "-o", path, stderr=StringIO(),
+            )
+            with open(path, newline="") as exported:
+                rows = list(csv.DictReader(exported))
+        self.assertEqual([int(row["id"]) for row in rows], [a.pk for a in self.articles])
+
+        out = StringIO()
+        call_command(
+            "export_articles", "--publisher", str(self.publisher.pk), stdout=out, stderr=StringIO(),
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+class ArticleImportTest(TestCase):
+    """
+    TestCase for the bulk article import:
+    - NDJSON and CSV rows become published articles or pending drafts
+    - Invalid rows are rejected with their line number; the rest is imported
+    - Journalist and publisher lookups are cached; queries do not grow with rows
+    - Search index and feed caches are refreshed once; timelines are filled
+      in without notifying anyone
+    - The import_articles command, including dry runs
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="alice", role="journalist")
+        cls.reader = CustomUser.objects.create(username="bob", role="reader")
+        cls.reader.subscriptions_journalists.add(cls.journalist)
+        cls.publisher = Publisher.objects.create(name="The Times")
+
+    def setUp(self):
+        cache.clear()
+
+    def ndjson(self, *rows):
+        return [json.dumps(row) + "\n" for row in rows]
+
+    def rows(self, count, **extra):
+        return self.ndjson(*(
+            {"title": f"Legacy story {i}", "content": "Harbour festival", "journalist": "alice",
+             "published_at": "2020-05-01T10:00:00", **extra}
+            for i in range(count)
+        ))
+
+    def test_imports_published_and_draft_rows(self):
+        feeds = [
+            GLOBAL_FEED, publisher_feed(self.publisher.pk), journalist_feed(self.journalist.pk),
+        ]
+        generations = {feed: get_generation(feed) for feed in feeds}
+        lines = self.ndjson(
+            {"title": "Harbour reopens", "content": "The harbour festival", "journalist": "alice",
+             "publisher": "The Times", "published_at": "2020-05-01"},
+            {"title": "Unfinished", "content": "Notes", "journalist": "alice"},
+        )
+        result = import_articles(read_rows(lines, "ndjson"))
+        self.assertEqual((result.created, result.rejected), (2, []))
+
+        published = Article.objects.get(title="Harbour reopens")
+        self.assertEqual(published.journalist, self.journalist)
+        self.assertEqual(published.publisher, self.publisher)
+        self.assertTrue(published.approved and published.published and not published.is_draft)
+        self.assertEqual(published.created_at, published.published_at)
+        draft = Article.objects.get(title="Unfinished")
+        self.assertFalse(draft.published or draft.approved)
+        self.assertTrue(draft.is_draft)
+
+        self.assertEqual([a.pk for a in search("harbour")], [published.pk])
+        for feed, generation in generations.items():
+            self.assertNotEqual(get_generation(feed), generation, feed)
+        job = FanoutJob.objects.get()
+        self.assertEqual((job.article_id, job.notify), (published.pk, False))
+        self.assertEqual([a.pk for a in fallback_queryset(self.reader)], [published.pk])
+        run_pending_jobs()
+        timeline = TimelineEntry.objects.filter(reader=self.reader)
+        self.assertEqual([entry.article_id for entry in timeline], [published.pk])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_invalid_rows_are_rejected(self):
+        lines = [
+            "title,content,journalist,publisher,published_at\n",
+            "Good story,Body,alice,The Times,2021-01-01\n",
+            ",Body,alice,,\n",
+            "Unknown author,Body,mallory,,\n",
+            "Reader author,Body,bob,,\n",
+            "Unknown publisher,Body,alice,The Post,\n",
+            "Bad date,Body,alice,,someday\n",
+        ]
+        result = import_articles(read_rows(lines, "csv"), batch_size=2)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.rejected], [3, 4, 5, 6, 7])
+        self.assertIn("title", result.rejected[0][1])
+        self.assertIn("No journalist named 'bob'", result.rejected[2][1])
+        self.assertEqual(list(Article.objects.values_list("title", flat=True)), ["Good story"])
+
+        result = import_articles(read_rows(["not json\n", "[1]\n"], "ndjson"))
+        self.assertEqual([number for number, _ in result.rejected], [1, 2])
+
+    def test_lookups_are_cached(self):
+        lookup = CachedLookup(Publisher.objects.all(), "name", "publisher")
+        with self.assertNumQueries(1):
+            lookup.load(["The Times", "The Post"])
+            lookup.load(["The Times", "The Post"])
+            self.assertEqual(lookup.get("The Times"), self.publisher.pk)
+            with self.assertRaises(ValueError):
+                lookup.get("The Post")
+
+    def test_queries_do_not_grow_with_rows(self):
+        counts = []
+        for count in (5, 25):
+            with CaptureQueriesContext(connection) as context:
+                import_articles(read_rows(self.rows(count), "ndjson"), batch_size=50)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = f"{directory.name}/legacy.ndjson"
+        with open(path, "w") as legacy:
+            legacy.writelines(self.rows(3) + self.ndjson({"title": "No author", "content": "Body"}))
+        out, err = StringIO(), StringIO()
+        call_command("import_articles", path, "--dry-run", stdout=out, stderr=err)
+        self.assertIn("Validated 3 articles, rejected 1", out.getvalue())
+        self.assertIn(":4: journalist: This field is required.", err.getvalue())
+        self.assertFalse(Article.objects.exists())
+
+        out = StringIO()
+        call_command(
+            "import_articles", path, "--journalist", "alice", "--publisher", str(self.publisher.pk),
+            "--batch-size", "2", stdout=out, stderr=StringIO(),
+        )
+        self.assertIn("Imported 4 articles, rejected 0", out.getvalue())
+        self.assertEqual(Article.objects.filter(publisher=self.publisher).count(), 4)
+
+        with self.assertRaises(CommandError):
+            call_command("import_articles", path, "--publisher", "Nobody", stdout=StringIO())
+
+
+@override_settings(NEWS_DB_CONNECTION_STATS=True)
+class DatabaseConnectionStatsTest(TestCase):
+    """
+    TestCase for the connection instrumentation middleware:
+    - Reused connections report 0 opened
+    - Connections opened during a request are counted for that request only
+    """
+    def test_reused_connection_reports_zero(self):
+        response = self.client.get(reverse("news_api:api_articles"))
+        self.assertEqual(response["X-DB-Connections-Opened"], "0")
+
+    def test_opened_connections_are_counted(self):
+        def reconnecting_view(request):
+            connection_created.send(sender=connection.__class__, connection=connection)
+            return HttpResponse()
+
+        middleware = DatabaseConnectionStatsMiddleware(reconnecting_view)
+        request = RequestFactory().get("/")
+        self.assertEqual(middleware(request)["X-DB-Connections-Opened"], "1")
+        # Connections opened outside a request are not attributed to one
+        connection_created.send(sender=connection.__class__, connection=connection)
+        self.assertEqual(
+            middleware(RequestFactory().get("/"))["X-DB-Connections-Opened"], "1"
+        )
+
+    @override_settings(NEWS_DB_CONNECTION_STATS=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("news_api:api_articles"))
+        self.assertFalse(response.has_header("X-DB-Connections-Opened"))
+
+
+@override_settings(NEWS_REPLICA_DATABASES=["replica"])
+class ReplicaRoutingTest(TestCase):
+    """
+    TestCase for primary/replica routing, run against two separate databases
+    (news_project.test_settings). Articles exist on the primary only, so a
+    response that lists them was read from the primary.
+    """
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.article = Article.objects.create(
+            title="On the primary", content="Body", journalist=cls.journalist,
+            approved=True, published=True, published_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def listed_ids(self):
+        data = json.loads(self.client.get(reverse("news_api:api_articles")).content)
+        return [a["id"] for a in data["results"]]
+
+    def test_public_reads_use_replica(self):
+        self.assertEqual(self.listed_ids(), [])
+        response = self.client.get(reverse("news_api:api_article_detail", args=[self.article.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_users_and_private_views_use_primary(self):
+        self.client.force_login(self.journalist)
+        # The session and user still load from the primary on a replica view
+        response = self.client.get(reverse("news_app:article_list"))
+        self.assertContains(response, "Welcome, journalist")
+        self.assertNotContains(response, "On the primary")
+
+        Article.objects.create(title="Draft", content="Body", journalist=self.journalist)
+        data = json.loads(self.client.get(reverse("news_api:api_drafts")).content)
+        self.assertEqual([a["title"] for a in data], ["Draft"])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        self.client.force_login(self.journalist)
+        response = self.client.post(
+            reverse("news_api:api_draft_create"), {"title": "New", "content": "Body"}
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.listed_ids(), [self.article.pk])
+
+        self.client.cookies.pop(STICKY_COOKIE)
+        cache.clear()
+        self.assertEqual(self.listed_ids(), [])
+
+    def test_feed_pages_not_cached_while_replicas_catch_up(self):
+        # The feed changed just now, so the replica page is served uncached
+        self.assertEqual(self.listed_ids(), [])
+        with self.settings(NEWS_REPLICA_DATABASES=[]):
+            self.assertEqual(self.listed_ids(), [self.article.pk])
+
+        cache.clear()
+        with self.settings(NEWS_REPLICA_STICKY_SECONDS=0):
+            self.assertEqual(self.listed_ids(), [])
+        with self.settings(NEWS_REPLICA_DATABASES=[]):
+            self.assertEqual(self.listed_ids(), [])  # Cached once caught up
+
+    def test_write_pins_rest_of_request(self):
+        router = PrimaryReplicaRouter()
+
+        @replica_reads
+        def view():
+            before = router.db_for_read(Article)
+            router.db_for_write(Article)
+            return before, router.db_for_read(Article), router.db_for_read(CustomUser)
+
+        self.assertEqual(view(), ("replica", "default", "default"))
+        self.assertEqual(router.db_for_read(Article), "default")
+
+    def test_async_views_use_replica(self):
+        data = json.loads(self.client.get(reverse("news_api:api_articles_async")).content)
+        self.assertEqual(data["results"], [])
+        response = self.client.get(
+            reverse("news_api:api_article_detail_async", args=[self.article.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncViewsTest(TestCase):
+    """
+    TestCase for the async public article endpoints:
+    - Same results and pagination as the DRF endpoints
+    - ?fields= selection and its validation
+    - 404 for missing articles, publishers and bad cursors
+    - Conditional GETs answer 304
+    - The cache is never called synchronously on the event loop
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        now = timezone.now()
+        cls.articles = [
+            Article.objects.create(
+                title=f"Story {i}", content="Body " * 100, journalist=cls.journalist,
+                publisher=cls.publisher if i % 2 else None,
+                approved=True, published=True, published_at=now - timedelta(minutes=i),
+            )
+            for i in range(5)
+        ]
+        Article.objects.create(title="Draft", content="Body", journalist=cls.journalist)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def assertSamePages(self, sync_url, async_url, **params):
+        sync_page = self.get_json(sync_url, **params)
+        async_page = self.get_json(async_url, **params)
+        self.assertEqual(async_page["results"], sync_page["results"])
+        return sync_page, async_page
+
+    def test_list_matches_sync_endpoint(self):
+        sync_page, async_page = self.assertSamePages(
+            reverse("news_api:api_articles"), reverse("news_api:api_articles_async"), page_size=2
+        )
+        self.assertIn("/async/articles/", async_page["next"])
+        while async_page["next"]:
+            sync_page = json.loads(self.client.get(sync_page["next"]).content)
+            async_page = json.loads(self.client.get(async_page["next"]).content)
+            self.assertEqual(async_page["results"], sync_page["results"])
+            self.assertIsNotNone(async_page["previous"])
+
+    def test_publisher_list_matches_sync_endpoint(self):
+        self.assertSamePages(
+            reverse("news_api:api_publisher_articles", args=[self.publisher.pk]),
+            reverse("news_api:api_publisher_articles_async", args=[self.publisher.pk]),
+        )
+        missing = reverse("news_api:api_publisher_articles_async", args=[999999])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_detail_matches_sync_endpoint(self):
+        pk = self.articles[0].pk
+        sync_url = reverse("news_api:api_article_detail", args=[pk])
+        async_url = reverse("news_api:api_article_detail_async", args=[pk])
+        self.assertEqual(self.get_json(async_url), self.get_json(sync_url))
+        self.assertEqual(
+            self.get_json(async_url, fields="id,title"), {"id": pk, "title": "Story 0"}
+        )
+
+    def test_fields_narrow_list(self):
+        url = reverse("news_api:api_articles_async")
+        data = self.get_json(url, fields="id,author")
+        self.assertEqual(set(data["results"][0]), {"id", "author"})
+        self.assertEqual(self.client.get(url, {"fields": "password"}).status_code, 400)
+
+    def test_not_found(self):
+        draft = Article.objects.get(title="Draft")
+        url = reverse("news_api:api_article_detail_async", args=[draft.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(reverse("news_api:api_articles_async"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        Article.objects.filter(pk=self.articles[0].pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        for url in (
+            reverse("news_api:api_articles_async"),
+            reverse("news_api:api_article_detail_async", args=[self.articles[0].pk]),
+        ):
+            response = self.client.get(url)
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(revalidated.status_code, 304)
+
+    def test_read_only(self):
+        response = self.client.post(reverse("news_api:api_articles_async"))
+        self.assertEqual(response.status_code, 405)
+
+    def test_cache_calls_stay_off_the_event_loop(self):
+        on_loop = []
+
+        def watch(method):
+            def call(backend, *args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(method.__name__)
+                except RuntimeError:
+                    pass
+                return method(backend, *args, **kwargs)
+            return call
+
+        backend = type(caches["default"])
+        with mock.patch.multiple(
+            backend, get=watch(backend.get), set=watch(backend.set), add=watch(backend.add),
+        ):
+            url = reverse("news_api:api_articles_async")
+            self.get_json(url)
+            self.get_json(url)  # Served from the cache
+            self.get_json(reverse("news_api:api_article_detail_async", args=[self.articles[1].pk]))
+        self.assertEqual(on_loop, [])
+
+
+@override_settings(NEWS_PROFILING=True, NEWS_PROFILING_SAMPLE_RATE=0)
+class RequestProfilingTest(TestCase):
+    """
+    TestCase for the request profiling middleware:
+    - Server-Timing reports total, SQL, template and serializer time
+    - One structured log line per request
+    - Sampled requests are dumped as cProfile stats
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        Article.objects.create(
+            title="Timed", content="Body", journalist=cls.journalist,
+            approved=True, published=True, published_at=timezone.now(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def server_timing(self, response):
+        timings = {}
+        for entry in response["Server-Timing"].split(", "):
+            name, *params = entry.split(";")
+            timings[name] = dict(param.split("=", 1) for param in params)
+        return timings
+
+    def test_html_page_timings(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("news_app:article_list"))
+        timings = self.server_timing(response)
+        self.assertEqual(set(timings), {"total", "db", "template", "serialize"})
+        self.assertEqual(timings["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertGreater(float(timings["template"]["dur"]), 0)
+        self.assertEqual(float(timings["serialize"]["dur"]), 0)
+
+    def test_api_logs_structured_line(self):
+        with self.assertLogs("news_app.profiling", "INFO") as logs:
+            response = self.client.get(reverse("news_api:api_articles"))
+        self.assertGreater(float(self.server_timing(response)["serialize"]["dur"]), 0)
+        record = logs.records[0].profile
+        self.assertEqual(record["path"], reverse("news_api:api_articles"))
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertIn("queries=", logs.records[0].getMessage())
+
+    def test_async_view_timings(self):
+        response = self.client.get(reverse("news_api:api_articles_async"))
+        self.assertNotEqual(self.server_timing(response)["db"]["desc"], '"0 queries"')
+
+    def test_sampled_requests_dump_cprofile(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            with self.settings(NEWS_PROFILING_SAMPLE_RATE=1, NEWS_PROFILING_DIR=profile_dir):
+                with self.assertLogs("news_app.profiling", "INFO") as logs:
+                    self.client.get(reverse("news_api:api_articles"))
+            dump = logs.records[0].profile["cprofile"]
+            self.assertTrue(dump.startswith(profile_dir))
+            self.assertGreater(pstats.Stats(dump).total_calls, 0)
+
+    @override_settings(NEWS_PROFILING=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("news_api:api_articles"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class BenchmarkCommandsTest(TestCase):
+    """
+    TestCase for the generate_dataset and run_benchmarks commands:
+    - Every role, publishers, memberships, subscriptions and articles in
+      every state are generated
+    - Every scenario runs against the generated data and is written as JSON
+    - Moderation scenarios leave the data unchanged
+    """
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "generate_dataset", users=200, publishers=5, articles=300,
+            subscriptions=2, follows=2, batch_size=50, index=True, stdout=StringIO(),
+        )
+
+    def test_dataset_shape(self):
+        roles = set(CustomUser.objects.values_list("role", flat=True))
+        self.assertEqual(roles, {"reader", "journalist", "editor", "publisher"})
+        self.assertEqual(Article.objects.count(), 300)
+        self.assertTrue(Article.objects.filter(approved=True, published=True).exists())
+        self.assertTrue(Article.objects.filter(approved=False).exists())
+        self.assertTrue(Publisher.objects.filter(members__role="editor").exists())
+        reader = CustomUser.objects.filter(role="reader").first()
+        self.assertEqual(reader.subscriptions_publishers.count(), 2)
+        self.assertEqual(reader.subscriptions_journalists.count(), 2)
+
+    def test_run_benchmarks_writes_results(self):
+        pending = Article.objects.filter(approved=False).count()
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "run_benchmarks", iterations=1, warmup=0, output=output.name, stdout=StringIO(),
+            )
+            results = json.load(output)
+        self.assertEqual(results["dataset"]["articles"], 300)
+        self.assertTrue({
+            "article_list", "publisher_feed", "dashboard_reader", "dashboard_journalist",
+            "dashboard_editor", "dashboard_publisher", "drafts_api", "search",
+            "search_two_terms", "approve", "publish",
+        } <= set(results["scenarios"]))
+        for name, result in results["scenarios"].items():
+            self.assertLess(result["status"], 400, name)
+        self.assertEqual(Article.objects.filter(approved=False).count(), pending)
+
+
+class DashboardTest(TestCase):
+    """
+    TestCase for the role-scoped dashboard:
+    - Editors see their publishers' articles and independent pending ones
+    - Publishers see their approved, unpublished articles
+    - Sections are paged and the status counts come from one aggregate
+    - Readers get their personal feed, or the latest articles while it is empty
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.owner = CustomUser.objects.create(username="owner", role="publisher")
+        cls.journalist = CustomUser.objects.create(username="journalist", role="journalist")
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.rival = Publisher.objects.create(name="The Rival")
+        cls.publisher.members.add(cls.editor, cls.owner, cls.journalist)
+
+        def create(title, publisher, approved=False, published=False):
+            return Article.objects.create(
+                title=title, content="Body", journalist=cls.journalist, publisher=publisher,
+                approved=approved, published=published,
+                published_at=timezone.now() if published else None,
+            )
+
+        cls.pending = create("Pending", cls.publisher)
+        cls.approved = create("Approved", cls.publisher, approved=True)
+        cls.published = create("Published", cls.publisher, approved=True, published=True)
+        cls.independent = create("Independent", None)
+        cls.independent_published = create(
+            "Independent published", None, approved=True, published=True
+        )
+        cls.rival_pending = create("Rival", cls.rival)
+
+    def setUp(self):
+        cache.clear()
+
+    def dashboard(self, user, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse("news_app:dashboard"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_editor_sees_own_publishers_and_independent_pending(self):
+        context = self.dashboard(self.editor)
+        self.assertEqual(
+            {a.pk for a in context["all_articles"]},
+            {self.pending.pk, self.approved.pk, self.published.pk, self.independent.pk},
+        )
+        self.assertEqual(
+            context["counts"],
+            {"total": 4, "pending": 2, "awaiting_publication": 1, "published": 1},
+        )
+
+    def test_publisher_sees_articles_awaiting_publication(self):
+        context = self.dashboard(self.owner)
+        self.assertEqual([a.pk for a in context["approved_articles"]], [self.approved.pk])
+        self.assertEqual(context["counts"]["total"], 3)
+
+    @override_settings(NEWS_DASHBOARD_PAGE_SIZE=3)
+    def test_sections_are_paged(self):
+        first = self.dashboard(self.editor)["all_articles"]
+        self.assertEqual(len(first), 3)
+        self.assertTrue(first.has_next)
+        self.assertFalse(first.has_previous)
+
+        second = self.dashboard(self.editor, articles_page=2)["all_articles"]
+        self.assertEqual(len(second), 1)
+        self.assertFalse(second.has_next)
+        self.assertEqual(second.previous_query, "articles_page=1")
+        self.assertFalse({a.pk for a in first} & {a.pk for a in second})
+
+        response = self.client.get(reverse("news_app:dashboard"))
+        self.assertContains(response, f'href="?{first.next_query}"')
+
+    def test_reader_falls_back_to_latest_articles(self):
+        context = self.dashboard(self.reader)
+        feed = context["published_articles"]
+        self.assertFalse(feed.personal)
+        self.assertEqual(
+            {a.pk for a in feed}, {self.published.pk, self.independent_published.pk}
+        )
+        self.assertNotIn("counts", context)
+
+    def test_reader_sees_personal_feed(self):
+        self.reader.subscriptions_publishers.add(self.publisher)
+        feed = self.dashboard(self.reader)["published_articles"]
+        self.assertTrue(feed.personal)
+        self.assertEqual([a.pk for a in feed], [self.published.pk])
+
+        latest = self.dashboard(self.reader, feed="latest")["published_articles"]
+        self.assertFalse(latest.personal)
+        self.assertEqual(len(latest), 2)
+
+    def test_invalid_feed_cursor_is_404(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse("news_app:dashboard"), {"feed_cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
+class MembershipCacheTest(TestCase):
+    """
+    TestCase for the cached publisher memberships:
+    - Lookups are cached per request and across requests
+    - Adding, removing and clearing members (from either side) and deleting
+      a publisher invalidate the affected users
+    - Permission checks cost no queries once memberships are cached
+    - Without a shared cache, memberships are only cached per request
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.other = CustomUser.objects.create(username="other", role="editor")
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.rival = Publisher.objects.create(name="The Rival")
+        cls.publisher.members.add(cls.editor, cls.other)
+        cls.article = Article.objects.create(
+            title="Pending", content="Body", journalist=cls.other, publisher=cls.publisher,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, user):
+        # A fresh instance, as every request loads
+        return member_publisher_ids(CustomUser.objects.get(pk=user.pk))
+
+    def test_lookups_are_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(member_publisher_ids(self.editor), {self.publisher.pk})
+            self.assertEqual(member_publisher_ids(self.editor), {self.publisher.pk})
+        fresh = CustomUser.objects.get(pk=self.editor.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.publisher.has_member(fresh))
+            self.assertFalse(self.rival.has_member(fresh))
+            self.assertTrue(self.article.can_publish(fresh))
+
+    def test_changes_invalidate_members(self):
+        self.ids(self.editor)
+        self.rival.members.add(self.editor)
+        self.assertEqual(self.ids(self.editor), {self.publisher.pk, self.rival.pk})
+
+        self.editor.publishers.remove(self.publisher)
+        self.assertEqual(member_publisher_ids(self.editor), {self.rival.pk})
+
+        self.ids(self.other)
+        self.publisher.members.clear()
+        self.assertEqual(self.ids(self.other), set())
+
+        self.rival.delete()
+        self.assertEqual(self.ids(self.editor), set())
+
+    def test_views_check_cached_memberships(self):
+        self.client.force_login(self.editor)
+        url = reverse("news_app:article_approve", args=[self.article.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        self.assertFalse([q for q in context.captured_queries if "publisher_members" in q["sql"]])
+
+        self.publisher.members.remove(self.editor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    @override_settings(NEWS_CACHE_SHARED=False)
+    def test_per_process_cache_is_not_used_across_requests(self):
+        self.assertEqual(self.ids(self.editor), {self.publisher.pk})
+        # A removal whose invalidation this process never sees (made by
+        # another process) still takes effect on the next request
+        Publisher.members.through.objects.filter(customuser_id=self.editor.pk).delete()
+        self.assertEqual(self.ids(self.editor), set())
+
+
+class Endpoint:
+    """
+    How QueryBudgetTest requests one URL.
+
+    Args:
+        budget (int): Most queries the request may issue, at any data size.
+        method (str): HTTP method.
+        user (str | None): Attribute of the test holding the user to log in as.
+        args (callable | None): ``args(test)`` returns the URL arguments,
+            creating fresh rows for requests that change them.
+        data (callable | None): ``data(test)`` returns the request body or
+            query parameters.
+        json (bool): Send ``data`` as JSON.
+    """
+
+    def __init__(self, budget, method="get", user=None, args=None, data=None, json=False):
+        self.budget = budget
+        self.method = method
+        self.user = user
+        self.args = args
+        self.data = data
+        self.json = json
+
+
+def _fresh(test, count=None, **state):
+    """Create ``count`` (default: the test's scale) fresh articles in ``state``."""
+    defaults = {"journalist": test.journalist, "publisher": test.publisher}
+    return [
+        Article.objects.create(title=f"Fresh {i}", content="Body", **{**defaults, **state})
+        for i in range(count or test.scale)
+    ]
+
+
+def _fresh_pk(**state):
+    return lambda test: [_fresh(test, 1, **state)[0].pk]
+
+
+def _fresh_ids(**state):
+    return lambda test: {"ids": [article.pk for article in _fresh(test, **state)]}
+
+
+PUBLIC = {"approved": True, "published": True}
+
+# Every named route of news_app/urls.py and api_urls.py, with its budget
+QUERY_BUDGETS = {
+    # Public pages
+    "news_app:article_list": Endpoint(1),
+    "news_app:article_search": Endpoint(5, data=lambda test: {"q": "article"}),
+    "news_app:article_detail": Endpoint(6, user="reader", args=lambda test: [test.article.pk]),
+    "news_app:register": Endpoint(0),
+    "news_app:login": Endpoint(0),
+    "news_app:logout": Endpoint(4, method="post", user="reader"),
+    "news_app:dashboard": Endpoint(5, user="editor"),
+    "news_app:syndication_feed": Endpoint(1, args=lambda test: ["rss"]),
+    "news_app:publisher_syndication_feed": Endpoint(
+        2, args=lambda test: [test.publisher.pk, "atom"],
+    ),
+    "news_app:journalist_syndication_feed": Endpoint(
+        2, args=lambda test: [test.journalist.pk, "rss"],
+    ),
+    # Article actions
+    "news_app:create_article": Endpoint(
+        5, method="post", user="journalist",
+        data=lambda test: {
+            "title": "New article", "content": "Body", "publisher": test.publisher.pk,
+        },
+    ),
+    "news_app:article_edit": Endpoint(
+        7, method="post", user="journalist", args=_fresh_pk(),
+        data=lambda test: {"title": "Edited", "content": "Body", "publisher": test.publisher.pk},
+    ),
+    "news_app:article_delete": Endpoint(12, method="post", user="journalist", args=_fresh_pk()),
+    "news_app:article_approve": Endpoint(
+        18, method="post", user="editor", args=_fresh_pk(published=True)
+    ),
+    "news_app:article_publish": Endpoint(
+        18, method="post", user="publisher_user", args=_fresh_pk(approved=True)
+    ),
+    "news_app:publish_independent_article": Endpoint(
+        17, method="post", user="journalist", args=_fresh_pk(approved=True, publisher=None)
+    ),
+    # API
+    "news_api:api_articles": Endpoint(1),
+    "news_api:api_article_detail": Endpoint(2, args=lambda test: [test.article.pk]),
+    "news_api:api_publisher_articles": Endpoint(2, args=lambda test: [test.publisher.pk]),
+    "news_api:api_articles_async": Endpoint(1),
+    "news_api:api_article_detail_async": Endpoint(2, args=lambda test: [test.article.pk]),
+    "news_api:api_publisher_articles_async": Endpoint(2, args=lambda test: [test.publisher.pk]),
+    "news_api:api_article_search": Endpoint(5, data=lambda test: {"q": "article"}),
+    "news_api:api_reader_feed": Endpoint(4, user="reader"),
+    "news_api:api_drafts": Endpoint(3, user="journalist"),
+    "news_api:api_draft_create": Endpoint(
+        3, method="post", user="journalist", json=True,
+        data=lambda test: {"title": "New", "content": "Body"},
+    ),
+    "news_api:api_draft_update": Endpoint(3, user="journalist", args=_fresh_pk()),
+    "news_api:api_article_export": Endpoint(
+        5, user="exporter", data=lambda test: {"format": "csv"},
+    ),
+    "news_api:api_bulk_approve": Endpoint(
+        16, method="post", user="editor", json=True, data=_fresh_ids(published=True),
+    ),
+    "news_api:api_bulk_publish": Endpoint(
+        15, method="post", user="editor", json=True, data=_fresh_ids(approved=True),
+    ),
+    "news_api:api_bulk_delete": Endpoint(
+        15, method="post", user="editor", json=True, data=_fresh_ids(),
+    ),
+    "news_api:api_newsletters": Endpoint(1),
+    "news_api:api_newsletter_detail": Endpoint(1, args=lambda test: [test.newsletter.pk]),
+    "news_api:api_journalist_newsletters": Endpoint(2, args=lambda test: [test.journalist.pk]),
+}
+
+
+class QueryBudgetTest(TestCase):
+    """
+    TestCase enforcing query budgets on every URL of the app:
+    - Every named route declares a budget in QUERY_BUDGETS
+    - Each is requested at two data sizes (and, for bulk actions, two batch
+      sizes) and must issue the same number of queries at both
+    - That number must be within the route's budget
+    Requests run with an empty cache, so cached pages cannot hide queries.
+    """
+    GROWTH = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create(
+            username="journalist", role="journalist", email="j@example.com"
+        )
+        cls.editor = CustomUser.objects.create(username="editor", role="editor")
+        cls.reader = CustomUser.objects.create(username="reader", role="reader")
+        cls.publisher_user = CustomUser.objects.create(username="publisher", role="publisher")
+        cls.exporter = CustomUser.objects.create(username="exporter", role="reader")
+        cls.exporter.user_permissions.add(Permission.objects.get(codename="export_article"))
+        cls.publisher = Publisher.objects.create(name="The Times")
+        cls.publisher.members.add(cls.journalist, cls.editor, cls.publisher_user)
+        cls.reader.subscriptions_publishers.add(cls.publisher)
+        cls.reader.subscriptions_journalists.add(cls.journalist)
+        cls.article = Article.objects.create(
+            title="Budget article", content="Body", journalist=cls.journalist,
+            publisher=cls.publisher, published_at=timezone.now(), **PUBLIC,
+        )
+        cls.newsletter = Newsletter.objects.create(
+            title="Budget newsletter", content="Body", journalist=cls.journalist
+        )
+        cls.scale = 2
+        cls.add_rows(cls, cls.scale)
+
+    def add_rows(self, count):
+        """
+        Add ``count`` of everything the pages list or check: articles in
+        every state and newsletters by new and existing authors, publishers
+        and their members, and readers subscribed to and following the test
+        users.
+        """
+        start = CustomUser.objects.count()
+        for i in range(start, start + count):
+            author = CustomUser.objects.create(username=f"author{i}", role="journalist")
+            reader = CustomUser.objects.create(username=f"reader{i}", role="reader")
+            publisher = Publisher.objects.create(name=f"Publisher {i}")
+            publisher.members.add(author, self.editor)
+            member = CustomUser.objects.create(username=f"member{i}", role="editor")
+            self.publisher.members.add(member)
+            reader.subscriptions_publishers.add(self.publisher, publisher)
+            reader.subscriptions_journalists.add(self.journalist, author)
+            self.reader.subscriptions_publishers.add(publisher)
+            self.reader.subscriptions_journalists.add(author)
+            for journalist, owner in [(author, publisher), (self.journalist, self.publisher)]:
+                Newsletter.objects.create(
+                    title=f"Newsletter {i}", content="Body", journalist=journalist
+                )
+                for approved, published in [
+                    (True, True), (True, False), (False, False), (False, True),
+                ]:
+                    Article.objects.create(
+                        title=f"Article {i}", content="Body article", journalist=journalist,
+                        publisher=owner, approved=approved, published=published,
+                        published_at=timezone.now() if published else None,
+                    )
+
+    def request(self, name, endpoint):
+        """Request ``name`` as ``endpoint`` describes; return the query count and SQL."""
+        cache.clear()
+        self.client.logout()
+        if endpoint.user:
+            self.client.force_login(getattr(self, endpoint.user))
+        url = reverse(name, args=endpoint.args(self) if endpoint.args else None)
+        data = endpoint.data(self) if endpoint.data else None
+        kwargs = {"content_type": "application/json"} if endpoint.json else {}
+        if endpoint.json:
+            data = json.dumps(data)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, endpoint.method)(url, data, **kwargs)
+            if response.streaming:
+                # Streamed rows are read as the body is consumed
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f"{name} answered {response.status_code}")
+        return len(context.captured_queries), [q["sql"] for q in context.captured_queries]
+
+    def test_every_route_has_a_budget(self):
+        from . import api_urls, urls
+
+        routes = {
+            f"{module.app_name}:{pattern.name}"
+            for module in (urls, api_urls)
+            for pattern in module.urlpatterns
+            if getattr(pattern, "name", None)
+        }
+        self.assertEqual(routes - set(QUERY_BUDGETS), set(), "Routes without a query budget")
+        self.assertEqual(set(QUERY_BUDGETS) - routes, set(), "Budgets for unknown routes")
+
+    def test_query_budgets(self):
+        small = {name: self.request(name, endpoint) for name, endpoint in QUERY_BUDGETS.items()}
+        self.add_rows(self.GROWTH)
+        self.scale += self.GROWTH
+        for name, endpoint in QUERY_BUDGETS.items():
+            with self.subTest(route=name):
+                before, _ = small[name]
+                after, queries = self.request(name, endpoint)
+                sql = "\n".join(queries)
+                self.assertEqual(
+                    before, after, f"{name}: queries grew from {before} to {after}:\n{sql}"
+                )
+                self.assertLessEqual(
+                    after, endpoint.budget,
+                    f"{name}: {after} queries, budget {endpoint.budget}:\n{sql}",
+                )
@@ -0,0 +1,121 @@
+"""
+timeline.py
+
+Personalized per-reader feeds.
+
+A reader's feed holds the published articles of the publishers they subscribe
+to and the journalists they follow. It is computed on write: the publish
+fan-out (fanout.py) copies each article into its audience's TimelineEntry
+rows, so a page of the feed is one ordered range scan of the reader's index.
+Articles that were not copied, because their audience was too large or the
+fan-out has not finished yet, are merged in at read time from the Article
+table instead.
+
+- fallback_queryset: Public articles from a reader's sources not yet in their timeline.
+- TimelinePaginator: Keyset paginator over a reader's timeline plus the fallback.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+
+from .models import Article, FanoutJob, TimelineEntry
+from .pagination import KeysetPaginator
+
+TIMELINE_ORDERING = (F("published_at").desc(nulls_last=True), F("article_id").desc())
+TIMELINE_ORDERING_REVERSED = (F("published_at").asc(nulls_first=True), F("article_id").asc())
+
+
+def fallback_queryset(reader):
+    """
+    Return public articles from ``reader``'s sources that are read on demand.
+
+    These are articles whose fan-out skipped timeline materialization or has
+    not completed yet. They are selected through their FanoutJob rows, so
+    only that small set is searched; every public article has a job (older
+    and bulk-written ones get one from a migration, queue_silent_jobs() or
+    the bulk commands).
+
+    Args:
+        reader (CustomUser): The reader whose feed is being built.
+
+    Returns:
+        QuerySet: Articles with journalist and publisher loaded.
+    """
+    User = get_user_model()
+    publisher_ids = User.subscriptions_publishers.through.objects.filter(
+        customuser_id=reader.pk
+    ).values("publisher_id")
+    journalist_ids = User.subscriptions_journalists.through.objects.filter(
+        from_customuser_id=reader.pk
+    ).values("to_customuser_id")
+    return (
+        Article.objects.filter(approved=True, published=True)
+        .filter(id__in=FanoutJob.objects.filter(
+            Q(materialize_timeline=False) | Q(completed_at__isnull=True)
+        ).values("article_id"))
+        .filter(Q(publisher_id__in=publisher_ids) | Q(journalist_id__in=journalist_ids))
+        .select_related("journalist", "publisher")
+    )
+
+
+class TimelinePaginator(KeysetPaginator):
+    """
+    Page through one reader's materialized timeline, merged with the
+    queryset given to paginate() (normally fallback_queryset(reader)).
+
+    Args:
+        reader (CustomUser): The reader whose feed is paged.
+        page_size (int): Number of articles per page.
+        articles (QuerySet | None): Queryset the timeline's articles are
+            loaded through, e.g. one narrowed to a sparse fieldset. By
+            default they are joined onto the timeline rows in one query.
+    """
+
+    def __init__(self, reader, page_size=None, articles=None):
+        super().__init__(page_size)
+        self.reader = reader
+        self.articles = articles
+
+    @staticmethod
+    def cursor_key(article):
+        # Timeline rows carry their own copy of the publish date; order and
+        # build cursors from it so the keyset stays consistent with the index.
+        return getattr(article, "timeline_published_at", article.published_at), article.pk
+
+    def fetch(self, queryset, boundary, reverse, limit):
+        entries = TimelineEntry.objects.filter(
+            reader=self.reader, article__approved=True, article__published=True
+        ).select_related("article__journalist", "article__publisher")
+        if boundary is not None:
+            condition = (
+                self._before(*boundary, id_field="article_id")
+                if reverse
+                else self._after(*boundary, id_field="article_id")
+            )
+            entries = entries.filter(condition)
+        ordering = TIMELINE_ORDERING_REVERSED if reverse else TIMELINE_ORDERING
+
+        entries = entries.order_by(*ordering)[:limit]
+        rows = {}
+        if self.articles is None:
+            for entry in entries:
+                entry.article.timeline_published_at = entry.published_at
+                rows[entry.article_id] = entry.article
+        else:
+            dates = dict(entries.values_list("article_id", "published_at"))
+            articles = self.articles.in_bulk(list(dates))
+            for article_id, published_at in dates.items():
+                if article_id in articles:
+                    articles[article_id].timeline_published_at = published_at
+                    rows[article_id] = articles[article_id]
+        for article in super().fetch(queryset, boundary, reverse, limit):
+            rows.setdefault(article.pk, article)
+
+        return sorted(rows.values(), key=self._sort_key, reverse=not reverse)[:limit]
+
+    def _sort_key(self, article):
+        """Python equivalent of the SQL feed ordering (undated rows last)."""
+        published_at, pk = self.cursor_key(article)
+        if published_at is None:
+            return (0, pk)
+        return (1, published_at, pk)
@@ -2,25 +2,43 @@
 urls.py
 
 This module defines all URL patterns for the News App, including:
-- Public views (article list and detail)
+- Public views (article list, search and detail)
 - Journalist actions (create, edit, delete articles)
 - Editor actions (approve articles)
 - Publisher actions (publish articles)
 - User authentication (register, login, logout)
 - Dashboard
+- RSS / Atom syndication feeds (global, per publisher, per journalist)
 - API endpoints
 """
 
-from django.urls import path, include
+from django.urls import path, include, register_converter
 from django.contrib.auth import views as auth_views
 from . import views
 
 app_name = "news_app"
 
+
+class FeedFormatConverter:
+    """Matches the syndication feed formats, ``rss`` and ``atom``."""
+    regex = "rss|atom"
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+register_converter(FeedFormatConverter, "feedformat")
+
 urlpatterns = [
     # Home page: list of approved articles
     path("", views.article_list, name="article_list"),
     
+    # Search published articles
+    path("search/", views.article_search, name="article_search"),
+
     # Article detail page
     path("article/<int:pk>/", views.article_detail, name="article_detail"),
     
@@ -42,6 +60,19 @@ urlpatterns = [
     
     # User dashboard
     path("dashboard/", views.dashboard, name="dashboard"),
+
+    # Syndication feeds: /feeds/articles.rss, /feeds/publishers/1/articles.atom, ...
+    path("feeds/articles.<feedformat:format>", views.syndication_feed, name="syndication_feed"),
+    path(
+        "feeds/publishers/<int:pk>/articles.<feedformat:format>",
+        views.publisher_syndication_feed,
+        name="publisher_syndication_feed",
+    ),
+    path(
+        "feeds/journalists/<int:pk>/articles.<feedformat:format>",
+        views.journalist_syndication_feed,
+        name="journalist_syndication_feed",
+    ),
     
     # User registration
     path("register/", views.register, name="register"),
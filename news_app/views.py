@@ -6,7 +6,8 @@ This module contains all the view functions for the News App, including:
 - Dashboard views based on user roles
 - Article CRUD operations (create, edit, delete)
 - Article approval and publishing workflows
-- Public views for listing and viewing articles
+- Public views for listing, searching and viewing articles
+- RSS / Atom syndication feeds
 - API endpoints for retrieving articles
 """
 
@@ -15,15 +16,23 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.models import Group
 from django.contrib import messages
-from django.http import HttpResponseForbidden
-from django.core.mail import send_mail
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.utils.timezone import now
+from django.views.decorators.http import condition, require_safe
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from .forms import CustomUserCreationForm, ArticleForm
-from .models import Article, Publisher
+from .cache import GLOBAL_FEED, get_or_build, journalist_feed, page_variant, publisher_feed
+from .conditional import article_etag, article_last_modified, feed_etag, feed_last_modified
+from .dashboard import dashboard_context
+from .feeds import ArticleFeed, JournalistArticleFeed, PublisherArticleFeed, render_feed
+from .membership import is_member
+from . import search
+from .models import Article
+from .pagination import ArticleCursorPagination, InvalidCursor, KeysetPaginator
+from .routers import replica_reads
 from .serializers import ArticleSerializer
 
 
@@ -69,30 +78,21 @@ def dashboard(request):
     """
     Display the dashboard page according to the user's role.
 
+    Each role's sections are scoped to what the user can act on and paged
+    (see dashboard.py), so the page costs the same however many articles
+    exist.
+
     Args:
         request (HttpRequest): The HTTP request object.
 
     Returns:
         HttpResponse: Renders the dashboard template with user-specific data.
     """
-    user = request.user
-    role = user.role
-
-    my_articles = Article.objects.filter(journalist=user) if role == "journalist" else None
-    pending_articles = Article.objects.filter(approved=False) if role == "editor" else None
-    approved_articles = Article.objects.filter(approved=True, published=False) if role == "publisher" else None
-    published_articles = Article.objects.filter(approved=True, published=True) if role == "reader" else None
-
-    return render(request, "news_app/dashboard.html", {
-        "is_journalist": role == "journalist",
-        "is_editor": role == "editor",
-        "is_reader": role == "reader",
-        "is_publisher": role == "publisher",
-        "my_articles": my_articles,
-        "pending_articles": pending_articles,
-        "approved_articles": approved_articles,
-        "published_articles": published_articles,
-    })
+    try:
+        context = dashboard_context(request)
+    except InvalidCursor:
+        raise Http404("Invalid cursor.")
+    return render(request, "news_app/dashboard.html", context)
 
 
 # -----------------------
@@ -196,21 +196,15 @@ def article_approve(request, pk):
 
     article = get_object_or_404(Article, pk=pk)
 
-    if article.publisher and request.user not in article.publisher.members.all():
+    if article.publisher_id and not is_member(request.user, article.publisher_id):
         return HttpResponseForbidden("You must be an editor of this publisher to approve.")
 
     if request.method == "POST":
         if not article.approved:
             article.approved = True
             article.is_draft = False
+            # The approval email is queued by the post_save signal
             article.save()
-            send_mail(
-                subject=f"Your article '{article.title}' was approved!",
-                message="Congratulations! Your article has been approved by an editor.",
-                from_email="admin@news.com",
-                recipient_list=[article.journalist.email],
-                fail_silently=True,
-            )
             messages.success(request, f"Article '{article.title}' approved successfully.")
         else:
             messages.info(request, "Article is already approved.")
@@ -236,8 +230,9 @@ def article_publish(request, pk):
     """
     article = get_object_or_404(Article, pk=pk)
 
-    if article.publisher:
-        if request.user.role in ["publisher", "editor"] and request.user not in article.publisher.members.all():
+    if article.publisher_id:
+        acts_for_publisher = request.user.role in ["publisher", "editor"]
+        if acts_for_publisher and not is_member(request.user, article.publisher_id):
             return HttpResponseForbidden("You must be a member/editor of this publisher to publish.")
     else:
         if request.user != article.journalist:
@@ -285,9 +280,14 @@ def publish_independent_article(request, pk):
 # -----------------------
 # Public Views
 # -----------------------
+@replica_reads
+@condition(etag_func=feed_etag(GLOBAL_FEED, personal=True))
 def article_list(request):
     """
-    Display a list of approved and published articles.
+    Display one page of approved and published articles, newest first.
+
+    Pages are selected with the opaque ``?cursor=`` query parameter and served
+    from the feed cache until an article in the feed changes.
 
     Args:
         request (HttpRequest): The HTTP request object.
@@ -295,11 +295,40 @@ def article_list(request):
     Returns:
         HttpResponse: Renders article list page.
     """
-    articles = Article.objects.filter(approved=True, published=True).order_by("-created_at")
-    return render(request, "news_app/article_list.html", {"articles": articles})
+    articles = Article.objects.filter(approved=True, published=True).select_related(
+        "journalist", "publisher"
+    )
+    cursor = request.GET.get("cursor")
+    paginator = KeysetPaginator()
+    try:
+        page = get_or_build(
+            GLOBAL_FEED,
+            f"article_list:{paginator.page_size}:{cursor}",
+            lambda: paginator.paginate(articles, cursor),
+        )
+    except InvalidCursor:
+        raise Http404("Invalid cursor.")
+    return render(request, "news_app/article_list.html", {"articles": page, "page": page})
+
+
+@replica_reads
+def article_search(request):
+    """
+    Display published articles matching the ``?q=`` search terms, best first.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: Renders search results page.
+    """
+    query = request.GET.get("q", "").strip()
+    articles = search.search(query, limit=20) if query else []
+    return render(request, "news_app/search.html", {"articles": articles, "query": query})
 
 
 @login_required
+@condition(etag_func=article_etag(public_only=False, personal=True))
 def article_detail(request, pk):
     """
     Display a single article. Readers cannot view unpublished articles.
@@ -319,25 +348,115 @@ def article_detail(request, pk):
     return render(request, "news_app/article_detail.html", {"article": article})
 
 
+# -----------------------
+# Syndication Feeds
+# -----------------------
+def _feed_response(feed):
+    return HttpResponse(feed["content"], content_type=feed["content_type"])
+
+
+def _publisher_feed_name(request, pk, format):
+    return publisher_feed(pk)
+
+
+def _journalist_feed_name(request, pk, format):
+    return journalist_feed(pk)
+
+
+@require_safe
+@replica_reads
+@condition(etag_func=feed_etag(GLOBAL_FEED), last_modified_func=feed_last_modified(GLOBAL_FEED))
+def syndication_feed(request, format):
+    """
+    RSS or Atom feed of the latest published articles, served from the
+    cache until an article in the feed changes.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        format (str): "rss" or "atom".
+
+    Returns:
+        HttpResponse: The feed XML.
+    """
+    return _feed_response(render_feed(ArticleFeed, GLOBAL_FEED, request, format))
+
+
+@require_safe
+@replica_reads
+@condition(
+    etag_func=feed_etag(_publisher_feed_name),
+    last_modified_func=feed_last_modified(_publisher_feed_name),
+)
+def publisher_syndication_feed(request, pk, format):
+    """
+    RSS or Atom feed of a publisher's latest published articles.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): Primary key of the publisher.
+        format (str): "rss" or "atom".
+
+    Returns:
+        HttpResponse: The feed XML.
+    """
+    return _feed_response(
+        render_feed(PublisherArticleFeed, publisher_feed(pk), request, format, pk=pk)
+    )
+
+
+@require_safe
+@replica_reads
+@condition(
+    etag_func=feed_etag(_journalist_feed_name),
+    last_modified_func=feed_last_modified(_journalist_feed_name),
+)
+def journalist_syndication_feed(request, pk, format):
+    """
+    RSS or Atom feed of a journalist's latest published articles.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pk (int): Primary key of the journalist.
+        format (str): "rss" or "atom".
+
+    Returns:
+        HttpResponse: The feed XML.
+    """
+    return _feed_response(
+        render_feed(JournalistArticleFeed, journalist_feed(pk), request, format, pk=pk)
+    )
+
+
 # -----------------------
 # API Endpoints
 # -----------------------
+@replica_reads
+@condition(etag_func=feed_etag(GLOBAL_FEED), last_modified_func=feed_last_modified(GLOBAL_FEED))
 @api_view(["GET"])
 def api_articles(request):
     """
-    API endpoint to list all approved and published articles.
+    API endpoint to list approved and published articles, one cursor page at a time.
 
     Args:
         request (HttpRequest): The HTTP request object.
 
     Returns:
-        Response: Serialized list of articles.
+        Response: Serialized page of articles with next/previous links.
     """
-    articles = Article.objects.filter(approved=True, published=True).order_by("-created_at")
-    serializer = ArticleSerializer(articles, many=True)
-    return Response(serializer.data)
+    def build():
+        articles = Article.objects.filter(approved=True, published=True).select_related(
+            "journalist", "publisher"
+        )
+        paginator = ArticleCursorPagination()
+        page = paginator.paginate_queryset(articles, request)
+        serializer = ArticleSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
+
+    return Response(get_or_build(GLOBAL_FEED, page_variant(request), build))
 
 
+@replica_reads
+@condition(etag_func=article_etag(), last_modified_func=article_last_modified())
 @api_view(["GET"])
 def api_article_detail(request, pk):
     """
@@ -0,0 +1,28 @@
+"""
+Test settings for news_project.
+
+Runs the test suite without MySQL, on two local SQLite databases: ``default``
+plays the primary and ``replica`` a read replica, so the primary/replica
+routing can be tested with real, separate databases. Replica routing is off
+unless a test enables it with ``NEWS_REPLICA_DATABASES=["replica"]``.
+
+Usage:
+    python manage.py test --settings=news_project.test_settings
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "primary.sqlite3",
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica.sqlite3",
+    },
+}
+NEWS_REPLICA_DATABASES = []
+# The suite runs in one process, so its local-memory cache is shared
+NEWS_CACHE_SHARED = True